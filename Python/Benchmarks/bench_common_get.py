@@ -0,0 +1,97 @@
+import os, sys, time, argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Common import Common, CaseInsensitiveDict
+
+# Reads a dozen fields from every record of a GetRecords page and a few paths from every attribute of a GetAttributes
+# response, with the key scanning Common.Get used to do, with Common.Get on plain dictionaries and on CaseInsensitiveDict.
+
+def make_records(count: int) -> list[dict] :
+    return [ {
+        "Code" : f"{index:08d}",
+        "Name" : f"Customer {index}",
+        "Description" : "Lorem ipsum dolor sit amet, consectetur adipiscing elit",
+        "Address1" : f"{index} Main Street",
+        "City" : "Raleigh",
+        "State" : "NC",
+        "PostalCode" : "27601",
+        "Country" : "US",
+        "CreditLimit" : index * 1.5,
+        "IsActive" : index % 2 == 0,
+        "ParentCustomer" : f"{index // 10:08d}",
+        "LastOrderDate" : "2025-06-15T12:34:56Z",
+        "EnterUserName" : "admin",
+        "EnterDTM" : "2025-01-01T00:00:00Z",
+        "LastChgUserName" : "admin",
+        "LastChgDTM" : "2025-06-15T12:34:56Z",
+        "$LastChgDataTransactionID" : index
+    } for index in range(count) ]
+
+def make_attributes(count: int) -> list[dict] :
+    return [ {
+        "Identifier" : { "Id" : f"{index:08x}-0000-0000-0000-000000000000", "Name" : f"Attribute{index}", "InternalId" : index },
+        "EntityId" : { "Id" : "00000000-0000-0000-0000-000000000001", "Name" : "Customer", "InternalId" : 1 },
+        "AttributeType" : 1,
+        "DataType" : 1,
+        "DataTypeInformation" : 100,
+        "DisplayWidth" : 100,
+        "IsRequired" : False,
+        "IsSystem" : False
+    } for index in range(count) ]
+
+def legacy_get(node, name: str, default = None) :
+    """Common.Get before the lower-case index, kept to compare against."""
+    if node is None : return default
+    name = name.replace("/", ".").replace("\\", ".")
+    if "." in name :
+        for name in name.split(".") : node = legacy_get(node, name)
+        return node if node != None else default
+    for key in node.keys() :
+        if key.lower() == name.lower() : return node[key]
+    return default
+
+RECORD_FIELDS = [ "Code", "Name", "City", "State", "PostalCode", "Country", "CreditLimit", "IsActive", "ParentCustomer", "LastOrderDate", "LastChgDTM", "$LastChgDataTransactionID" ]
+ATTRIBUTE_PATHS = [ "Identifier.Name", "Identifier.Id", "EntityId.Name", "DataType", "AttributeType", "IsRequired" ]
+
+def read(get, nodes: list[dict], names: list[str]) -> None :
+    for node in nodes :
+        for name in names : get(node, name)
+
+def measure(function, repeat: int) -> float :
+    best = None
+    for _ in range(repeat) :
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark case-insensitive field access on records and attributes.")
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records read.")
+    parser.add_argument("--attributes", type=int, default=20_000, help="Number of attributes read.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs, the best is reported.")
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    attributes = make_attributes(args.attributes)
+    wrappedRecords = CaseInsensitiveDict.from_Json(records)
+    wrappedAttributes = CaseInsensitiveDict.from_Json(attributes)
+    lowerFields = [ name.lower() for name in RECORD_FIELDS ]
+    lowerPaths = [ path.lower() for path in ATTRIBUTE_PATHS ]
+    print(f"{args.records} records x {len(RECORD_FIELDS)} fields, {args.attributes} attributes x {len(ATTRIBUTE_PATHS)} paths")
+
+    cases = [
+        ("legacy scan", legacy_get, records, attributes),
+        ("Common.Get dict", Common.Get, records, attributes),
+        ("Common.Get CaseInsensitiveDict", Common.Get, wrappedRecords, wrappedAttributes)
+    ]
+    for label, get, recordNodes, attributeNodes in cases :
+        exact = measure(lambda : read(get, recordNodes, RECORD_FIELDS), args.repeat)
+        other = measure(lambda : read(get, recordNodes, lowerFields), args.repeat)
+        paths = measure(lambda : read(get, attributeNodes, ATTRIBUTE_PATHS), args.repeat)
+        lowerPathTime = measure(lambda : read(get, attributeNodes, lowerPaths), args.repeat)
+        print(f"{label:32} records {exact * 1000:8.1f} ms  lower-case {other * 1000:8.1f} ms   attributes {paths * 1000:8.1f} ms  lower-case {lowerPathTime * 1000:8.1f} ms")
+
+    converted = measure(lambda : CaseInsensitiveDict.from_Json(records), 1)
+    print(f"CaseInsensitiveDict.from_Json of the records takes {converted * 1000:.1f} ms")
@@ -0,0 +1,45 @@
+import os, sys, gc, time, argparse, tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Common import Common
+from Profisee.Restful.Codec import JsonCodec
+from Profisee.Restful.CompactRecord import RecordSchema
+from bench_common_get import make_records
+
+# Memory held by a decoded GetRecords snapshot as dictionaries and as CompactRecords sharing one RecordSchema, with and
+# without interning, measured with tracemalloc, and the cost of reading a field from each.
+
+def traced(build) -> tuple :
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (value, current, elapsed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the memory of records held as dictionaries and as CompactRecords.")
+    parser.add_argument("--count", type=int, default=200_000, help="Number of records in the snapshot.")
+    parser.add_argument("--intern-limit", type=int, default=10_000, help="Most distinct strings interned per attribute.")
+    parser.add_argument("--codec", default=None, help="Codec decoding the pages, one of orjson, msgspec or json. Defaults to the fastest installed.")
+    args = parser.parse_args()
+
+    codec = JsonCodec(args.codec)
+    page = codec.Encode({ "data" : make_records(args.count), "totalRecords" : args.count })
+    print(f"{args.count} records of {len(make_records(1)[0])} attributes decoded with {codec.Name}, page is {len(page) / 1_000_000:.1f} MB")
+
+    records, dictBytes, dictTime = traced(lambda : codec.Decode(page)["data"])
+    del records
+    print(f"{'dict':28} {dictBytes / 1_000_000:8.1f} MB  {dictBytes / args.count:6.0f} bytes/record  decode {dictTime * 1000:8.1f} ms")
+    for label, internLimit in (("CompactRecord", 0), (f"CompactRecord interned {args.intern_limit}", args.intern_limit)) :
+        schema = RecordSchema(intern_limit = internLimit)
+        compact, compactBytes, compactTime = traced(lambda : schema.PackAll(codec.Decode(page)["data"]))
+        print(f"{label:28} {compactBytes / 1_000_000:8.1f} MB  {compactBytes / args.count:6.0f} bytes/record  decode and pack {compactTime * 1000:8.1f} ms  {1 - compactBytes / dictBytes:4.0%} less")
+
+    records = codec.Decode(page)["data"]
+    for label, nodes in (("dict", records), ("CompactRecord", compact)) :
+        started = time.perf_counter()
+        for node in nodes : Common.Get(node, "PostalCode")
+        print(f"Common.Get on {label:14} {(time.perf_counter() - started) * 1000:8.1f} ms")
@@ -0,0 +1,44 @@
+import os, sys, time, random, argparse, tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "UnitTests")))
+from Profisee.Restful.API import API
+from Profisee.Restful.EntitySnapshot import SnapshotStore
+from Profisee.Restful.GetOptions import GetOptions
+from bench_common_get import make_records
+from fake_profisee import FakeProfiseeServer
+
+# Pulls an entity from the in-process fake instance into a snapshot once, then measures what a process that finds the
+# snapshot fresh pays instead: opening the memory-mapped file and looking records up by Code.
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark entity snapshots against pulling the entity from the API.")
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records in the entity.")
+    parser.add_argument("--lookups", type=int, default=10_000, help="Number of Get calls by Code.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory :
+        store = SnapshotStore(directory)
+        with FakeProfiseeServer({ "Customer" : make_records(args.records) }) as server :
+            with API(server.Url, "client-id") as api :
+                options = GetOptions()
+                options.PageSize = 1000
+                started = time.perf_counter()
+                store.Refresh(api, "Customer", options).Close()
+                pullTime = time.perf_counter() - started
+
+                started = time.perf_counter()
+                snapshot = store.Open(api, "Customer")
+                openTime = time.perf_counter() - started
+
+        codes = [ f"{random.randrange(args.records):08d}" for _ in range(args.lookups) ]
+        started = time.perf_counter()
+        for code in codes : snapshot.Get(code)
+        lookupTime = time.perf_counter() - started
+        size = os.path.getsize(store.GetPath("Customer"))
+        snapshot.Close()
+
+    print(f"{args.records} records, snapshot of {size / 1_000_000:.1f} MB")
+    print(f"{'pull from API and write':26} {pullTime * 1000:10.1f} ms")
+    print(f"{'open fresh snapshot':26} {openTime * 1000:10.3f} ms  {pullTime / openTime:8.0f}x faster")
+    print(f"{'Get by Code':26} {lookupTime / args.lookups * 1_000_000:10.1f} us per record")
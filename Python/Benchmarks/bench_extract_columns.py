@@ -0,0 +1,47 @@
+import os, sys, time, argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Common import Common
+from bench_common_get import make_records, make_attributes, measure
+
+# Pulls the same paths out of every record and attribute with Common.Get per cell, with compiled accessors and with
+# Common.ExtractColumns, as lists and as NumPy arrays when NumPy is installed.
+
+RECORD_PATHS = [ "Code", "Name", "City", "PostalCode", "CreditLimit", "IsActive", "LastChgDTM", "$LastChgDataTransactionID" ]
+ATTRIBUTE_PATHS = [ "Identifier.Name", "DomainEntityId.Name", "SortOrder", "AttributeType", "DataType", "DataTypeInformation" ]
+
+def per_cell(nodes: list[dict], paths: list[str]) -> dict :
+    return { path : [ Common.Get(node, path) for node in nodes ] for path in paths }
+
+def accessors(nodes: list[dict], paths: list[str]) -> dict :
+    return { path : [ accessor(node) for node in nodes ] for path, accessor in ((path, Common.Accessor(path)) for path in paths) }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark column extraction from records and attributes.")
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records read.")
+    parser.add_argument("--attributes", type=int, default=100_000, help="Number of attributes read.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs, the best is reported.")
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    attributes = make_attributes(args.attributes)
+    for attribute in attributes :
+        attribute["DomainEntityId"] = None
+        attribute["SortOrder"] = Common.Get(attribute, "Identifier.InternalId")
+    print(f"{args.records} records x {len(RECORD_PATHS)} paths, {args.attributes} attributes x {len(ATTRIBUTE_PATHS)} paths")
+
+    cases = [
+        ("Common.Get per cell", per_cell),
+        ("Common.Accessor", accessors),
+        ("ExtractColumns lists", lambda nodes, paths : Common.ExtractColumns(nodes, paths, as_arrays = False))
+    ]
+    try :
+        import numpy
+        cases.append(("ExtractColumns arrays", lambda nodes, paths : Common.ExtractColumns(nodes, paths, as_arrays = True)))
+    except ImportError :
+        print("NumPy not installed, arrays skipped")
+
+    for label, extract in cases :
+        recordTime = measure(lambda : extract(records, RECORD_PATHS), args.repeat)
+        attributeTime = measure(lambda : extract(attributes, ATTRIBUTE_PATHS), args.repeat)
+        print(f"{label:24} records {recordTime * 1000:8.1f} ms   attributes {attributeTime * 1000:8.1f} ms")
@@ -0,0 +1,38 @@
+import os, sys, time, argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "UnitTests")))
+from Profisee.Restful.API import API
+from fake_profisee import FakeProfiseeServer
+
+# Looks up the same codes with one GetRecord call per code and with GetRecordsByCodes, against the in-process fake
+# instance with a simulated round-trip latency.
+
+def make_records(count: int) -> list[dict] :
+    return [ { "Code" : f"{index:08d}", "Name" : f"Customer {index}", "City" : "Raleigh" } for index in range(count) ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark GetRecordsByCodes against a GetRecord loop.")
+    parser.add_argument("--records", type=int, default=5_000, help="Number of records in the entity.")
+    parser.add_argument("--codes", type=int, default=300, help="Number of codes to look up.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated seconds per request.")
+    parser.add_argument("--workers", type=int, default=4, help="Chunks fetched at once by GetRecordsByCodes.")
+    args = parser.parse_args()
+
+    codes = [ f"{index:08d}" for index in range(0, args.records, max(1, args.records // args.codes)) ][:args.codes]
+    with FakeProfiseeServer({ "Customer" : make_records(args.records) }, latency = args.latency) as server :
+        with API(server.Url, "client-id", pool_maxsize = args.workers) as api :
+            started = time.perf_counter()
+            looped = { code : api.GetRecord("Customer", code) for code in codes }
+            loop_time = time.perf_counter() - started
+            loop_requests = len(server.Requests)
+
+            server.Requests.clear()
+            started = time.perf_counter()
+            batched = api.GetRecordsByCodes("Customer", codes, max_workers = args.workers)
+            batch_time = time.perf_counter() - started
+
+    assert looped == batched
+    print(f"{len(codes)} codes, {args.latency * 1000:.0f} ms latency")
+    print(f"GetRecord loop      {loop_time:8.2f} s  {loop_requests:6} requests")
+    print(f"GetRecordsByCodes   {batch_time:8.2f} s  {len(server.Requests):6} requests  {loop_time / batch_time:6.1f}x faster")
@@ -0,0 +1,53 @@
+import os, sys, time, argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.Codec import JsonCodec
+
+# Encodes a MergeRecords payload and decodes a GetRecords page of the same size with every installed codec.
+
+def make_records(count: int) -> list[dict] :
+    return [ {
+        "Code" : f"{index:08d}",
+        "Name" : f"Customer {index}",
+        "Description" : "Lorem ipsum dolor sit amet, consectetur adipiscing elit",
+        "Address1" : f"{index} Main Street",
+        "City" : "Raleigh",
+        "State" : "NC",
+        "PostalCode" : "27601",
+        "Country" : "US",
+        "CreditLimit" : index * 1.5,
+        "IsActive" : index % 2 == 0,
+        "ParentCustomer" : f"{index // 10:08d}",
+        "LastOrderDate" : "2025-06-15T12:34:56Z",
+        "EnterDTM" : "2025-01-01T00:00:00Z",
+        "LastChgDTM" : "2025-06-15T12:34:56Z"
+    } for index in range(count) ]
+
+def measure(function, repeat: int) -> float :
+    best = None
+    for _ in range(repeat) :
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the JSON codecs on bulk record payloads.")
+    parser.add_argument("--count", type=int, default=50_000, help="Number of records in the payload and page.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs, the best is reported.")
+    args = parser.parse_args()
+
+    records = make_records(args.count)
+    page = JsonCodec("json").Encode({ "data" : records, "totalRecords" : len(records) })
+    print(f"{args.count} records, page is {len(page) / 1_000_000:.1f} MB")
+
+    for name in JsonCodec.NAMES :
+        try :
+            codec = JsonCodec(name)
+        except ImportError :
+            print(f"{name:8} not installed")
+            continue
+        encode = measure(lambda : codec.Encode(records), args.repeat)
+        decode = measure(lambda : codec.Decode(page), args.repeat)
+        print(f"{name:8} MergeRecords encode {encode * 1000:8.1f} ms   GetRecords decode {decode * 1000:8.1f} ms")
@@ -0,0 +1,62 @@
+import os, sys, gc, time, argparse, tracemalloc
+from collections import defaultdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.RecordBatch import RecordBatch
+from bench_common_get import make_records, measure
+
+# Memory held by an entity snapshot as decoded dictionaries and as a columnar RecordBatch, measured with tracemalloc, and
+# the time of filtering and grouping it in Python loops and with the RecordBatch helpers.
+
+ATTRIBUTES = [
+    { "Identifier" : { "Name" : "City" }, "DataType" : 1 },
+    { "Identifier" : { "Name" : "State" }, "DataType" : 1 },
+    { "Identifier" : { "Name" : "CreditLimit" }, "DataType" : 2 },
+    { "Identifier" : { "Name" : "LastOrderDate" }, "DataType" : 4 }
+]
+CITIES = [ "Raleigh", "Durham", "Cary", "Chapel Hill", "Apex" ]
+
+def traced(build) -> tuple :
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (value, current)
+
+def build_records(count: int) -> list[dict] :
+    records = make_records(count)
+    for index, record in enumerate(records) : record["City"] = CITIES[index % len(CITIES)]
+    return records
+
+def group_dicts(records: list[dict]) -> dict :
+    groups = defaultdict(lambda : [ 0, 0.0 ])
+    for record in records :
+        if record["CreditLimit"] is None or record["CreditLimit"] < 1000 : continue
+        group = groups[record["City"]]
+        group[0] += 1
+        group[1] += record["CreditLimit"]
+    return groups
+
+def group_batch(batch: RecordBatch) -> RecordBatch :
+    return batch.Filter(batch["CreditLimit"].Values >= 1000).GroupBy("City", { "CreditLimit" : "sum" })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark a snapshot held as dictionaries and as a RecordBatch.")
+    parser.add_argument("--count", type=int, default=500_000, help="Number of records in the snapshot.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs, the best is reported.")
+    args = parser.parse_args()
+
+    records, dictBytes = traced(lambda : build_records(args.count))
+    names = [ "Code", "City", "State", "CreditLimit", "LastOrderDate" ]
+    started = time.perf_counter()
+    batch, batchBytes = traced(lambda : RecordBatch.from_Records(records, ATTRIBUTES, names = names))
+    print(f"{args.count} records, RecordBatch of {len(names)} columns built in {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"{'dict':12} {dictBytes / 1_000_000:8.1f} MB all attributes")
+    print(f"{'RecordBatch':12} {batchBytes / 1_000_000:8.1f} MB {len(names)} columns, {batch.NBytes / 1_000_000:.1f} MB of arrays")
+
+    dictTime = measure(lambda : group_dicts(records), args.repeat)
+    batchTime = measure(lambda : group_batch(batch), args.repeat)
+    print(f"{'filter and group by City':28} dict {dictTime * 1000:8.1f} ms   RecordBatch {batchTime * 1000:8.1f} ms   {dictTime / batchTime:5.1f}x")
+    sliceTime = measure(lambda : batch.Slice(args.count // 4, args.count // 2), args.repeat)
+    print(f"{'slice a quarter':28} dict {measure(lambda : records[args.count // 4 : args.count // 2], args.repeat) * 1000:8.1f} ms   RecordBatch {sliceTime * 1000:8.3f} ms")
@@ -0,0 +1,43 @@
+import os, sys, time, inspect, argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+
+# Measures the per-call overhead of selecting a ResponseHandler in CheckResponse, comparing the previous
+# inspect.stack() caller lookup against the explicit endpoint descriptor passed down from each API method.
+
+class SimulatedResponse :
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+        self.content = b'{"data": []}'
+        self.text = self.content.decode()
+
+class CallerInspectionAPI(API) :
+    """Reproduces the dispatch used before endpoint descriptors were passed to CheckResponse."""
+    def GetResponseHandler(self, endpoint: str, status_code: int) :
+        caller_name = inspect.stack()[1].function
+
+        if (caller_name, status_code) in self.ResponseHandlers :
+            return self.ResponseHandlers[(caller_name, status_code)]
+        elif (None, status_code) in self.ResponseHandlers :
+            return self.ResponseHandlers[(None, status_code)]
+        return None
+
+def run(api: API, responses: list[SimulatedResponse]) -> float :
+    start = time.perf_counter()
+    for response in responses :
+        api.CheckResponse(response, "UnmatchRecords")
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ResponseHandlers dispatch.")
+    parser.add_argument("--count", type=int, default=100_000, help="Number of simulated responses.")
+    args = parser.parse_args()
+
+    responses = [ SimulatedResponse(status_code) for status_code in (200, 204, 400, 404) ] * (args.count // 4)
+
+    for name, api in [ ("inspect.stack()", CallerInspectionAPI("http://localhost/profisee", "client-id")),
+                       ("endpoint descriptor", API("http://localhost/profisee", "client-id")) ] :
+        elapsed = run(api, responses)
+        print(f"{name:20} {len(responses):>8} responses {elapsed:8.3f}s {elapsed / len(responses) * 1_000_000:10.2f} us/call")
+        api.close()
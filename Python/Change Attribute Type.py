@@ -34,9 +34,9 @@ else :
     # B) Copy data from old Attribute to New Attribute
     updated_records = []
     getOptions = Restful.GetOptions()
-    getOptions.PageSize = 10000 # More than enough to handle Store_Store records - Need to do this in pages for larger data sets
+    getOptions.PageSize = 1000
 
-    for record in api.GetRecords(entity_name, getOptions) :
+    for record in api.IterRecords(entity_name, getOptions) : # Walks every page, fetching the next ones in the background
         updated_records.append({
             "Code" : Common.Get(record, "Code"),
             temp_attribute_name : Common.Get(record, attribute_name) # Any transformation will happen here. ie Trim etc...
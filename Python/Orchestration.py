@@ -8,6 +8,10 @@ from functools import wraps
 import urllib.parse
 
 from Profisee.Restful import API, Entity, Attribute
+from Profisee.Restful.RetryPolicy import RetryPolicy, CircuitBreaker
+from Profisee.Restful.RateLimiter import RateLimiter
+from Profisee.Restful.ResponseCache import ResponseCache
+from Profisee.Restful.RecordCache import RecordCache
 from Profisee.Restful import GetOptions
 from Profisee.Common import Common
 from Profisee.Restful.Enums import AttributeType, AttributeDataType, ProcessActions, get_enum_from_string
@@ -123,7 +127,8 @@ class Orchestration:
             else:
                 self.LogToProfisee(orchestration_code, orchestration_step_code, "INFO", f"Skipping disabled orchestration step '{orchestration_step_code}' '{strategy_name}'.")
 
-        if threaded: map(lambda thread: thread.join(), threads) # Wait for all threads to complete
+        if threaded: # Wait for all threads to complete
+            for thread in threads: thread.join()
 
         if overall_error := any(Common.Get(result, "Error", False) for result in self.results):
             self.LogToProfisee(orchestration_code, None, "ERROR", f"Orchestration '{orchestration_code}' completed with errors.")
@@ -193,16 +198,17 @@ class Orchestration:
             }
         
         response = self.API.RunConnectBatch(strategy_name, Common.Get(parameters, "Filter"))
+        result = self.API.LastResult # Read before logging, LogToProfisee makes its own calls
         is_error = False
         error_was_ignored = False
         
-        if self.API.StatusCode != 200:
+        if result.StatusCode != 200:
             if self.can_ignore_error(response) :
                 error_was_ignored = True
-                self.LogToProfisee(orchestration_code, orchestration_step_code, "WARNING", f"Started Connect Batch for strategy '{strategy_name}'. StatusCode: {self.API.StatusCode}, Response: {self.API.LastResponse.text}")
+                self.LogToProfisee(orchestration_code, orchestration_step_code, "WARNING", f"Started Connect Batch for strategy '{strategy_name}'. StatusCode: {result.StatusCode}, Response: {result.Text}")
             else :
                 is_error = True
-                self.LogToProfisee(orchestration_code, orchestration_step_code, "ERROR", f"Failed to start Connect Batch for strategy '{strategy_name}'. StatusCode: {self.API.StatusCode}, Response: {self.API.LastResponse.text}")
+                self.LogToProfisee(orchestration_code, orchestration_step_code, "ERROR", f"Failed to start Connect Batch for strategy '{strategy_name}'. StatusCode: {result.StatusCode}, Response: {result.Text}")
             
         return {
             "Error": is_error,
@@ -221,12 +227,13 @@ class Orchestration:
         
         process_action = get_enum_from_string(ProcessActions, Common.Get(parameters, "ProcessAction", "MatchingOnly"))    
         response = self.API.ProcessMatchingActions(strategy_name, process_action)
+        result = self.API.LastResult # Read before logging, LogToProfisee makes its own calls
 
-        if self.API.StatusCode != 200:
-            self.LogToProfisee(orchestration_code, orchestration_step_code, "ERROR", f"Failed to start Matching for strategy '{strategy_name}'. StatusCode: {self.API.StatusCode}, Response: {self.API.LastResponse.text}")
+        if result.StatusCode != 200:
+            self.LogToProfisee(orchestration_code, orchestration_step_code, "ERROR", f"Failed to start Matching for strategy '{strategy_name}'. StatusCode: {result.StatusCode}, Response: {result.Text}")
             
         return {
-            "Error": self.API.StatusCode != 200,
+            "Error": result.StatusCode != 200,
             "response": response
         }
 
@@ -401,33 +408,34 @@ if __name__ == "__main__":
     client_id = Common.Get(settings, "ClientId", None)
     verify_ssl = Common.Get(settings, "VerifySSL", True)
 
-    api = API(profisee_url, client_id, verify_ssl)
+    with API(profisee_url, client_id, verify_ssl, retry_policy=RetryPolicy(), circuit_breaker=CircuitBreaker(), rate_limiter=RateLimiter.from_Settings(settings),
+             response_cache=ResponseCache.from_Settings(settings), record_cache=RecordCache.from_Settings(settings)) as api:
     
-    if args.test:
-        print(f"Testing connection to ProfiseeUrl '{profisee_url}' with ClientId '{client_id}' and VerifySSL '{verify_ssl}'")
-        result = api.GetEntities()
-        if api.StatusCode == 200:
-            print(f"Connection successful. StatusCode: {api.StatusCode}, Found: {len(result)} entities.")
-            sys.exit(0)
-        else:
-            print(f"Connection failed. StatusCode: {api.StatusCode}, Response: {api.LastResponse.text}")
-            sys.exit(1)
+        if args.test:
+            print(f"Testing connection to ProfiseeUrl '{profisee_url}' with ClientId '{client_id}' and VerifySSL '{verify_ssl}'")
+            result = api.GetEntities()
+            if api.StatusCode == 200:
+                print(f"Connection successful. StatusCode: {api.StatusCode}, Found: {len(result)} entities.")
+                sys.exit(0)
+            else:
+                print(f"Connection failed. StatusCode: {api.StatusCode}, Response: {api.LastResponse.text}")
+                sys.exit(1)
     
-    if args.bootstrap:
-        print("Bootstrapping the Orchestration entities...")
-        result = Orchestration.BootstrapOrchestrationEntities(api, orchestration_entity_name)
-        sys.exit(0)
+        if args.bootstrap:
+            print("Bootstrapping the Orchestration entities...")
+            result = Orchestration.BootstrapOrchestrationEntities(api, orchestration_entity_name)
+            sys.exit(0)
                 
                 
-    if not args.name:
-        print("You must provide the name of the orchestration to run using --name")
-        sys.exit(1)
+        if not args.name:
+            print("You must provide the name of the orchestration to run using --name")
+            sys.exit(1)
 
-    orchestration = Orchestration(api, orchestration_entity_name)
-    orchestration.what_if = args.whatif
-    result = orchestration.orchestrate(args.name)
-    print(result)
+        orchestration = Orchestration(api, orchestration_entity_name)
+        orchestration.what_if = args.whatif
+        result = orchestration.orchestrate(args.name)
+        print(result)
     
-    if Common.Get(result, "Error", False):
-        sys.exit(1)
-    sys.exit(0)
\ No newline at end of file
+        if Common.Get(result, "Error", False):
+            sys.exit(1)
+        sys.exit(0)
\ No newline at end of file
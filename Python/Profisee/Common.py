@@ -1,4 +1,4 @@
-import uuid, logging
+import uuid, logging, functools, operator
 from functools import wraps
 
 from more_itertools import strip
@@ -33,58 +33,276 @@ class Common() :
         return out
 
     @staticmethod
-    def __first(iterable, condition = lambda default : True) :
-        """Returns first element from iterable.
+    @functools.lru_cache(maxsize = 4096)
+    def SplitPath(name: str) -> tuple[str, ...] :
+        """Returns the parts of a path like Identifier.Name or Identifier/Name, cached as the same paths are used over and over."""
+        return tuple(name.replace("/", ".").replace("\\", ".").split("."))
 
-        Args:
-            iterable (_type_): Iterable that will searched for condition.
-            condition (lambda): lambda function for element to pass. Defaults to lambda default:True.
-
-        Returns:
-            element: Element if condition found or None.
-        """
-        for item in iterable :
-            if condition(item) : return item
+    @staticmethod
+    def FindKey(node, name: str) :
+        """Returns the key of node that matches name ignoring case, or None. Exact matches and CaseInsensitiveDict are O(1)."""
+        if isinstance(node, CaseInsensitiveDict) : return node.Index.get(name.lower())
+        if name in node : return name
+        lowered = name.lower()
+        for key in node.keys() :
+            if key.lower() == lowered : return key
         return None
-        
+
     @staticmethod
     def Set(node, name, value) :
-        """_summary_
+        """Sets a value, replacing the value of a key that matches name ignoring case.
 
         Args:
-            node (_type_): _description_
-            name (_type_): _description_
-            value (_type_): _description_
+            node (dictionary): Dictionary to set the value in, nothing is done when None.
+            name (string): Key to set.
+            value (Any): Value to set.
         """
-        if node != None :
-            key = Common.__first(node.keys(), lambda k : k.lower() == name.lower())
-            if key != None : node[key] = value
-            else           : node[name] = value
-        
+        if node is None : return
+        if isinstance(node, CaseInsensitiveDict) :
+            node[name] = value
+            return
+        key = Common.FindKey(node, name)
+        node[key if key is not None else name] = value
+
     @staticmethod
     def Get(node, name: str, default: Any = None) -> Any :
-        """_summary_
+        """Gets a value by key ignoring case, following paths like Identifier.Name into nested dictionaries.
+
+        Args:
+            node (dictionary): Dictionary to get the value from.
+            name (string): Key or path separated by ., / or \\.
+            default (Any, optional): Value returned when the key is missing or the value is None. Defaults to None.
+
+        Returns:
+            Any: value found or default.
+        """
+        if node is None : return default
+        if isinstance(node, CaseInsensitiveDict) :
+            key = node.Index.get(name.lower())
+            if key is not None : return dict.__getitem__(node, key)
+        elif name in node :
+            return node[name] # Exact match, the usual case
+
+        parts = Common.SplitPath(name)
+        if len(parts) == 1 :
+            if isinstance(node, CaseInsensitiveDict) : return default
+            key = Common.FindKey(node, name)
+            return node[key] if key is not None else default
+        for part in parts :
+            if node is None : return default
+            key = Common.FindKey(node, part)
+            node = node[key] if key is not None else None
+        return node if node is not None else default
+
+    @staticmethod
+    @functools.lru_cache(maxsize = 1024)
+    def Accessor(path: str) :
+        """Returns Common.Get compiled for one path, a function (node, default = None) returning what Common.Get would.
+
+        The path is split once and the key casing found in the first node is tried first on the next ones, so reading the
+        same path from many records costs one dictionary lookup per level. The same function is returned for the same path.
+        """
+        parts = Common.SplitPath(path)
+        keys = list(parts) # Key casing last found at each level
+
+        def resolve(node, level: int) :
+            key = Common.FindKey(node, parts[level]) if hasattr(node, "keys") else None
+            if key is not None : keys[level] = key
+            return key
+
+        if len(parts) == 1 :
+            def accessor(node, default: Any = None) -> Any :
+                try :
+                    return node[keys[0]]
+                except KeyError :
+                    key = resolve(node, 0)
+                    return node[key] if key is not None else default
+                except TypeError :
+                    if node is None : return default
+                    raise
+        else :
+            def accessor(node, default: Any = None) -> Any :
+                if node is None : return default
+                if path in node : return node[path] # A key that has dots in it
+                for level in range(len(keys)) :
+                    if node is None : return default
+                    try :
+                        node = node[keys[level]]
+                    except (KeyError, TypeError) :
+                        key = resolve(node, level)
+                        if key is None : return default
+                        node = node[key]
+                return node if node is not None else default
+        accessor.Path = path
+        accessor.Keys = keys
+        return accessor
+
+    @staticmethod
+    def ExtractColumns(records: list, paths: list[str], as_arrays: bool = None) -> dict[str, Any] :
+        """Reads the values of paths from every record, a column at a time.
 
         Args:
-            node (_type_): _description_
-            name (_type_): _description_
+            records (list): Records or any other dictionaries, ie the response of GetAttributes.
+            paths (list): Keys or paths like Identifier.Name, matched ignoring case as by Common.Get.
+            as_arrays (bool, optional): Return NumPy arrays instead of lists. Defaults to None, arrays when NumPy is installed.
+
+        Raises:
+            ImportError: as_arrays is True and NumPy is not installed.
 
         Returns:
-            _type_: _description_
+            dictionary: column of values, in the order of records, keyed by path.
         """
-        # if node != None :
-        #     key = Common.__first(node.keys(), lambda k : k.lower() == name.lower())
-        #     if key != None : return node[key]
-        # return default 
-    
-        if node is None: return default
-
-        name = name.replace("/", ".").replace("\\", ".")
-
-        if "." in name:
-            for name in name.split("."):
-                node = Common.Get(node, name)
-            return node if node != None else default         
-        else:    
-            key = Common.__first(node.keys(), lambda k: k.lower() == name.lower())
-            return node[key] if key!= None else default
\ No newline at end of file
+        if not isinstance(records, list) : records = list(records)
+        columns = []
+        for path in paths :
+            accessor = Common.Accessor(path)
+            if records : accessor(records[0]) # Learns the key casing
+            try : # Every record has the keys with the same casing, the usual case, read in C by itemgetter
+                column = records
+                for key in accessor.Keys : column = list(map(operator.itemgetter(key), column))
+            except (KeyError, TypeError, IndexError) :
+                column = [ accessor(record) for record in records ]
+            columns.append(column)
+
+        if as_arrays is None :
+            try :
+                import numpy
+                as_arrays = True
+            except ImportError :
+                as_arrays = False
+        if as_arrays : columns = [ Common.ToArray(column) for column in columns ]
+        return dict(zip(paths, columns))
+
+    @staticmethod
+    def ToArray(values: list) :
+        """Returns a column as a NumPy array: bool, int64 or float64 when every value fits, None being NaN in a float column,
+        otherwise an object array holding the values as they are."""
+        import numpy
+        types = set(map(type, values))
+        try :
+            if types and types <= { bool } : return numpy.array(values, dtype = numpy.bool_)
+            if types and types <= { int } : return numpy.array(values, dtype = numpy.int64)
+            if types and types <= { int, float, type(None) } and types & { float, int } :
+                return numpy.array([ numpy.nan if value is None else value for value in values ], dtype = numpy.float64)
+        except OverflowError : # Integers beyond int64
+            pass
+        return numpy.fromiter(values, dtype = object, count = len(values))
+
+class CaseInsensitiveDict(dict) :
+    """Dictionary whose keys are matched ignoring case through a lower-case index kept next to the keys.
+
+    Keys keep the case they were first set with, so the dictionary encodes to the same JSON as a plain one. Common.Get and
+    Common.Set look keys up in the index instead of scanning them, which matters when the same records are read many times.
+    Records of an entity all have the same keys, so dictionaries built with the same keys share one index until one of
+    them adds or removes a key.
+    """
+    __slots__ = ("Index", "SharedIndex")
+    Indexes = {} # tuple of keys -> index shared by the dictionaries built with those keys
+    MAX_SHARED_INDEXES = 1024
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__()
+        self.Index = {} # lower-case key -> key
+        self.SharedIndex = False
+        if args or kwargs : self.update(*args, **kwargs)
+
+    @classmethod
+    def from_Json(cls, value: Any) -> Any :
+        """Returns value with every dictionary in it, at any depth, turned into a CaseInsensitiveDict."""
+        if isinstance(value, dict) : return cls({ key : cls.from_Json(item) if isinstance(item, (dict, list)) else item for key, item in value.items() })
+        if isinstance(value, list) : return [ cls.from_Json(item) if isinstance(item, (dict, list)) else item for item in value ]
+        return value
+
+    @staticmethod
+    def GetSharedIndex(keys: tuple) -> dict :
+        """Returns the index for a set of keys, or None when some keys are not strings or differ only by case."""
+        index = CaseInsensitiveDict.Indexes.get(keys)
+        if index is None :
+            if not all(isinstance(key, str) for key in keys) : return None
+            index = { key.lower() : key for key in keys }
+            if len(index) != len(keys) : return None
+            if len(CaseInsensitiveDict.Indexes) >= CaseInsensitiveDict.MAX_SHARED_INDEXES : CaseInsensitiveDict.Indexes.clear()
+            CaseInsensitiveDict.Indexes[keys] = index
+        return index
+
+    def OwnIndex(self) -> dict :
+        """Returns the index after copying it if it is shared, before it is changed."""
+        if self.SharedIndex :
+            self.Index = dict(self.Index)
+            self.SharedIndex = False
+        return self.Index
+
+    def GetKey(self, name: str) :
+        """Returns the key stored for name, or None."""
+        return self.Index.get(name.lower()) if isinstance(name, str) else (name if dict.__contains__(self, name) else None)
+
+    def __getitem__(self, name) :
+        try :
+            return dict.__getitem__(self, name)
+        except KeyError :
+            key = self.GetKey(name)
+            if key is None : raise
+            return dict.__getitem__(self, key)
+
+    def __setitem__(self, name, value) -> None :
+        key = self.GetKey(name)
+        if key is None :
+            key = name
+            if isinstance(name, str) : self.OwnIndex()[name.lower()] = name
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, name) -> None :
+        key = self.GetKey(name)
+        if key is None : raise KeyError(name)
+        dict.__delitem__(self, key)
+        if isinstance(key, str) : del self.OwnIndex()[key.lower()]
+
+    def __contains__(self, name) -> bool :
+        return dict.__contains__(self, name) or self.GetKey(name) is not None
+
+    def __reduce__(self) :
+        return (self.__class__, (dict(self),))
+
+    def get(self, name, default = None) :
+        key = self.GetKey(name)
+        return dict.__getitem__(self, key) if key is not None else default
+
+    def pop(self, name, *default) :
+        key = self.GetKey(name)
+        if key is None :
+            if default : return default[0]
+            raise KeyError(name)
+        if isinstance(key, str) : del self.OwnIndex()[key.lower()]
+        return dict.pop(self, key)
+
+    def popitem(self) :
+        key, value = dict.popitem(self)
+        if isinstance(key, str) : del self.OwnIndex()[key.lower()]
+        return (key, value)
+
+    def setdefault(self, name, default = None) :
+        key = self.GetKey(name)
+        if key is not None : return dict.__getitem__(self, key)
+        self[name] = default
+        return default
+
+    def update(self, *args, **kwargs) -> None :
+        items = dict(*args, **kwargs)
+        if not self and (index := CaseInsensitiveDict.GetSharedIndex(tuple(items))) is not None :
+            dict.update(self, items)
+            self.Index = index
+            self.SharedIndex = True
+            return
+        for key, value in items.items() : self[key] = value
+
+    def __ior__(self, other) :
+        self.update(other)
+        return self
+
+    def clear(self) -> None :
+        dict.clear(self)
+        self.Index = {}
+        self.SharedIndex = False
+
+    def copy(self) :
+        return self.__class__(self)
@@ -1,37 +1,133 @@
-import requests, inspect, logging
-import urllib3
+import requests, logging, time, gzip
+import urllib3, urllib.parse, contextvars, copy, queue, threading, collections, concurrent.futures
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
 from typing import Any, Dict
 
 from Profisee.Restful.GetOptions import GetOptions
-from Profisee.Common import Common
+from Profisee.Restful.APIResult import APIResult, APIError, ConsistencyError
+from Profisee.Restful.Codec import JsonCodec, default_codec
+from Profisee.Restful.JsonStream import JsonStream
+from Profisee.Restful.RetryPolicy import RetryPolicy, CircuitBreaker
+from Profisee.Restful.RateLimiter import RateLimiter
+from Profisee.Restful.ResponseCache import ResponseCache, CacheEntry
+from Profisee.Restful.RecordCache import RecordCache
+from Profisee.Restful.BulkWriter import BulkWriter, BulkReport
+from Profisee.Restful.RecordDiff import RecordDiff
+from Profisee.Common import Common, CaseInsensitiveDict
 from Profisee.Restful.Enums import ProcessActions, MatchingStatus, RequestOperation, WorkflowInstanceStatus
 
 class API() :
     """Class to handle requests and responses from the Profisee Restful API.
     """
-    def __init__(self, profisee_url, client_id, verify_ssl = True) -> None:
+    def __init__(self, profisee_url, client_id, verify_ssl = True, pool_connections = 10, pool_maxsize = 10, pool_block = False, keep_alive = True,
+                 retry_policy: RetryPolicy = None, circuit_breaker: CircuitBreaker = None, rate_limiter: RateLimiter = None, codec: JsonCodec = None,
+                 compression: bool = False, compression_threshold: int = 65536, response_cache: ResponseCache = None,
+                 record_cache: RecordCache = None) -> None:
         """Constructor for Restful API. Sets connection and response handlers.
 
         Args:
             profiseeUrl (string): URL to Profisee instance.
             clientId (string): Client ID to access Profisee instance.
+            verify_ssl (bool, optional): Verify the SSL certificate of the instance. Defaults to True.
+            pool_connections (int, optional): Number of per-host connection pools to keep. Defaults to 10.
+            pool_maxsize (int, optional): Maximum number of connections kept open per host. Defaults to 10.
+            pool_block (bool, optional): Block when all pool_maxsize connections to a host are in use instead of opening extra ones. Defaults to False.
+            keep_alive (bool, optional): Reuse connections between calls. Defaults to True.
+            retry_policy (RetryPolicy, optional): Policy for retrying throttled and failed calls. Defaults to None, no retries.
+            circuit_breaker (CircuitBreaker, optional): Fails calls fast while the instance is down. Defaults to None.
+            rate_limiter (RateLimiter, optional): Client side rate and max-in-flight limits per endpoint family. Defaults to None.
+            codec (JsonCodec, optional): Codec for request and response bodies. Defaults to None, the fastest one installed.
+            compression (bool, optional): Ask for gzip/deflate responses and gzip request bodies. The instance has to accept
+                                          gzip request bodies. Defaults to False.
+            compression_threshold (int, optional): Smallest request body in bytes that is gzipped. Defaults to 65536.
+            response_cache (ResponseCache, optional): Cache for the metadata endpoints. Defaults to None.
+            record_cache (RecordCache, optional): Read-through cache for GetRecord. Defaults to None.
         """
         self.ProfiseeUrl = profisee_url
         self.ClientId = client_id
         self.SetResponseHandlers()
         self.VerifySSL = verify_ssl
-        self.LastResponse = None
-        self.StatusCode = None
+        self.KeepAlive = keep_alive
+        self.RetryPolicy = retry_policy
+        self.CircuitBreaker = circuit_breaker
+        self.RateLimiter = rate_limiter
+        self.Codec = codec if codec is not None else default_codec
+        self.Compression = compression
+        self.CompressionThreshold = compression_threshold
+        self.ResponseCache = response_cache
+        self.RecordCache = record_cache
+        # LastResult and the errors set by the ResponseHandlers are kept per thread and per asyncio task so one API can be shared.
+        self._LastResult = contextvars.ContextVar(f"LastResult_{id(self)}", default = None)
+        self._Errors = contextvars.ContextVar(f"Errors_{id(self)}", default = None)
         
         if self.VerifySSL == False : urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         if not self.ProfiseeUrl.endswith("/") : self.ProfiseeUrl += "/" # Ensure that the URL ends with a /
+
+        self.Session = self.CreateSession(pool_connections, pool_maxsize, pool_block)
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.close()
+
+    def CreateSession(self, pool_connections: int, pool_maxsize: int, pool_block: bool) -> requests.Session :
+        """Creates the pooled session that all calls are sent through so connections to the instance are reused.
+
+        Args:
+            pool_connections (int): Number of per-host connection pools to keep.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            pool_block (bool): Block when the per-host limit is reached instead of opening extra connections.
+
+        Returns:
+            requests.Session: Session with the pooled adapter mounted for http and https.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections = pool_connections, pool_maxsize = pool_maxsize, pool_block = pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.verify = self.VerifySSL
+        # requests asks for gzip and deflate on its own, without compression ask for plain bodies so responses do not change.
+        if not self.Compression : session.headers["Accept-Encoding"] = "identity"
+        return session
+
+    def close(self) -> None :
+        """Closes the session and all pooled connections. The API can not be used after it is closed."""
+        self.Session.close()
                 
+    @property
+    def LastResult(self) -> APIResult :
+        """Result of the last call made by the current thread or asyncio task."""
+        return self._LastResult.get()
+
+    @property
+    def LastResponse(self) :
+        """Raw response of the last call made by the current thread or asyncio task. Kept for compatibility, use LastResult."""
+        return self.LastResult.Response if self.LastResult is not None else None
+
+    @property
+    def StatusCode(self) -> int :
+        """Status code of the last call made by the current thread or asyncio task. Kept for compatibility, use LastResult."""
+        return self.LastResult.StatusCode if self.LastResult is not None else None
+
+    @property
+    def errors(self) :
+        return self._Errors.get()
+
+    @errors.setter
+    def errors(self, value) :
+        self._Errors.set(value)
+
     def IsSuccessStatusCode(self) -> bool :
         return self.StatusCode >= 200 and self.StatusCode < 300
         
     def SetResponseHandlers(self) :
-        """Creates the ResponseHandlers that is used to handle the responses for the different status_codes."""
+        """Creates the ResponseHandlers that is used to handle the responses for the different status_codes.
+        
+        Handlers are keyed on (endpoint, status_code) where endpoint is the descriptor each API method passes to CallAPI. A key with
+        an endpoint of None is the default handler for that status_code.
+        """
         self.ResponseHandlers = {
             ("UnmatchRecords", 204) : lambda response : self.SuccessHandler(response, "Success - records unmatched"),
             ("UpdateMatchingStrategy", 204) : lambda response : self.SuccessHandler(response, "Success - Successfully updated the continuous matching setting of the matching strategy."),
@@ -52,34 +148,56 @@ class API() :
         Returns:
             dictionary : Header objects to be used in the requests.
         """
-        return {
+        headers = {
             "Content-Type" : "application/json",
-            "x-api-key" : self.ClientId
+            "x-api-key" : self.ClientId,
+            "Connection" : "keep-alive" if self.KeepAlive else "close"
         }
+        if self.Compression : headers["Accept-Encoding"] = "gzip, deflate"
+        return headers
         
-    def CheckResponse(self, response) -> Any:
+    def GetResponseHandler(self, endpoint: str, status_code: int) :
+        """Returns the handler for the endpoint and status_code, falling back to the default handler for the status_code.
+
+        Args:
+            endpoint (string): Name of the API method that made the call.
+            status_code (int): Status code of the response.
+
+        Returns:
+            function: ResponseHandler or None if there is none for the status_code.
+        """
+        return self.ResponseHandlers.get((endpoint, status_code)) or self.ResponseHandlers.get((None, status_code))
+
+    def CheckResponse(self, response, endpoint: str = None, started: float = None, request_operation: RequestOperation = None) -> Any:
         """Checks response against ResponseHandlers and creates modified response as needed.
 
         Args:
             response (dictionary) : response dictionary from requests.
+            endpoint (string, optional) : Name of the API method that made the call. Used to find endpoint specific handlers. Defaults to None.
+            started (float, optional) : time.perf_counter() value from when the request was sent, used for the elapsed time. Defaults to None.
+            request_operation (RequestOperation, optional) : HTTP method that was used. Defaults to None.
 
         Returns:
             dictionary : modified response object based on ResponseHandler.
         """
-        logging.getLogger().debug(f"response : statusCode = {response.status_code} text = '{response.text}'")
-        self.LastResponse = response
-        self.StatusCode = response.status_code
-        caller_name = inspect.stack()[1].function
-        
-        if (caller_name, response.status_code) in self.ResponseHandlers :
-            returnValue = self.ResponseHandlers[(caller_name, response.status_code)](response)
-        elif (None, response.status_code) in self.ResponseHandlers :
-            returnValue = self.ResponseHandlers[(None, response.status_code)](response)
+        logger = logging.getLogger()
+        if logger.isEnabledFor(logging.DEBUG) : logger.debug(f"response : statusCode = {response.status_code} text = '{response.text}'")
+        self.errors = None
+        result = APIResult(endpoint, request_operation, getattr(response, "url", None), response, None, None, 0.0, self.Codec)
+        self._LastResult.set(result)
+
+        handler = self.GetResponseHandler(endpoint, response.status_code)
+        if handler is not None :
+            returnValue = handler(response)
         else :
             returnValue = {
                 "Error" : f"Unknown statusCode '{response.status_code}'"
             }
-        logging.getLogger().debug(f"returnValue = '{returnValue}'")
+        if logger.isEnabledFor(logging.DEBUG) : logger.debug(f"returnValue = '{returnValue}'")
+
+        result.Data = returnValue
+        result.Errors = self.errors
+        result.Elapsed = time.perf_counter() - started if started is not None else 0.0
         return returnValue
 
     # Response Handlers
@@ -108,7 +226,7 @@ class API() :
         Returns:
             dictionary: modified response with the data from original response
         """
-        json = self.LastResponse.json()
+        json = self.LastResult.Body # Decoded once by the codec and kept on the result
         self.errors = Common.Get(json, "errors", None)
         return json['data'] if Common.Get(json, "data") != None else json
 
@@ -130,29 +248,172 @@ class API() :
         }
         
     @Common.LogFunction
-    def CallAPI(self, requestOperation : RequestOperation, url: str, json: dict[str, Any] = None) -> dict[str, Any]:
-        """_summary_
+    def CallAPI(self, requestOperation : RequestOperation, url: str, json: dict[str, Any] = None, endpoint: str = None) -> dict[str, Any]:
+        """Sends the request and returns what the ResponseHandler made of the response. The full result is available as LastResult.
 
         Args:
-            requestOperation (RequestOperation): _description_
-            url (_type_): _description_
-            json (_type_, optional): _description_. Defaults to None.
+            requestOperation (RequestOperation): HTTP method to use.
+            url (string): URL relative to the Profisee instance.
+            json (dictionary, optional): Body to send as JSON. Defaults to None.
+            endpoint (string, optional): Name of the calling API method, used to select the ResponseHandlers. Defaults to None.
 
         Returns:
             dictionary : modified response object based on call to CheckResponse().
         """
+        return self.SendRequest(requestOperation, url, json, endpoint).Data
+
+    def SendRequest(self, requestOperation : RequestOperation, url: str, json: dict[str, Any] = None, endpoint: str = None, stream: bool = False) -> APIResult:
+        """Sends the request through the pooled session, retrying as allowed by the RetryPolicy, and checks the final
+        response against the ResponseHandlers.
+
+        Args:
+            requestOperation (RequestOperation): HTTP method to use.
+            url (string): URL relative to the Profisee instance.
+            json (dictionary, optional): Body to send as JSON. Defaults to None.
+            endpoint (string, optional): Name of the calling API method, used to select the ResponseHandlers. Defaults to None.
+            stream (bool, optional): Leave the body of a successful response unread for the caller to stream from
+                                     result.Response, the ResponseHandlers are not run. Defaults to False.
+
+        Returns:
+            APIResult : status, data, errors, timing, retries and queueing delay of this call.
+        """
+        path = url
         url = urljoin(self.ProfiseeUrl, url)
+        started = time.perf_counter()
+        body = self.Codec.Encode(json) if json is not None else None # Encoded and compressed once and reused by any retries
+        request_bytes = len(body) if body is not None else 0
+        headers = self.GetHeaders()
+        if self.Compression and body is not None and len(body) >= self.CompressionThreshold :
+            body = gzip.compress(body, compresslevel = 6)
+            headers["Content-Encoding"] = "gzip"
+        cache_entry = None
+        if self.ResponseCache is not None and requestOperation == RequestOperation.Get and self.ResponseCache.IsCacheable(endpoint) :
+            cache_entry, fresh = self.ResponseCache.Lookup(url, endpoint, self.ClientId)
+            if fresh : return self.CachedResult(cache_entry, endpoint, requestOperation, started)
+            if cache_entry is not None : headers.update(cache_entry.ValidationHeaders())
+        attempt = 0
+        backoff_time = 0.0
+        queue_time = 0.0
+        held = False # The in-flight slot stays taken by a streamed response until its body is read
+
+        while True :
+            if self.CircuitBreaker is not None : self.CircuitBreaker.BeforeCall()
+            try :
+                if self.RateLimiter is not None : queue_time += self.RateLimiter.Acquire(path)
+            except BaseException :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.CancelCall()
+                raise
+            try :
+                response = self.Send(requestOperation, url, body, stream, headers)
+            except (requests.ConnectionError, requests.Timeout) as exception :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.RecordResult(None)
+                if self.RetryPolicy is None or not self.RetryPolicy.ShouldRetry(requestOperation, endpoint, attempt) : raise
+                delay = self.RetryPolicy.GetBackoff(attempt)
+                logging.getLogger().warning(f"{endpoint} failed with '{exception}', retry {attempt + 1} in {delay:.2f}s")
+            except requests.RequestException :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.RecordResult(None)
+                raise
+            except BaseException : # Not an outcome of the instance, the circuit must still not wait on this call
+                if self.CircuitBreaker is not None : self.CircuitBreaker.CancelCall()
+                raise
+            else :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.RecordResult(response.status_code)
+                if self.RetryPolicy is None or not self.RetryPolicy.ShouldRetry(requestOperation, endpoint, attempt, response.status_code) :
+                    if stream and self.RateLimiter is not None and response.status_code >= 200 and response.status_code < 300 :
+                        held = self.ReleaseOnClose(response, path)
+                    break
+                delay = self.RetryPolicy.GetBackoff(attempt, response.headers.get("Retry-After"))
+                logging.getLogger().warning(f"{endpoint} returned {response.status_code}, retry {attempt + 1} in {delay:.2f}s")
+                response.close()
+            finally :
+                if self.RateLimiter is not None and not held : self.RateLimiter.Release(path)
+            time.sleep(delay)
+            backoff_time += delay
+            attempt += 1
+
+        if stream and response.status_code >= 200 and response.status_code < 300 :
+            result = APIResult(endpoint, requestOperation, url, response, None, None, time.perf_counter() - started, self.Codec)
+            self._LastResult.set(result)
+        else :
+            handled = self.ResponseCache.Update(url, endpoint, response, cache_entry, self.ClientId) if self.ResponseCache is not None else response
+            self.CheckResponse(handled, endpoint, started, requestOperation)
+            result = self.LastResult
+            result.Cached = handled is not response
+        result.Retries = attempt
+        result.BackoffTime = backoff_time
+        result.QueueTime = queue_time
+        result.RequestBytes = request_bytes
+        result.RequestWireBytes = len(body) if body is not None else 0
+        if not stream :
+            result.ResponseBytes = len(handled.content)
+            result.ResponseWireBytes = response.raw.tell()
+        if self.RecordCache is not None and requestOperation != RequestOperation.Get : self.RecordCache.InvalidateFor(endpoint, path, json)
+        return result
+
+    def ReleaseOnClose(self, response: requests.Response, path: str) -> bool :
+        """Makes closing a streamed response free its RateLimiter in-flight slot, so the slot covers the reading of the body
+        and not only the headers. StreamRecords closes the response once the records are read or the generator is closed.
+
+        Returns:
+            bool: True, the slot is now released by the response.
+        """
+        close = response.close
+        released = threading.Event()
+        def release() :
+            try :
+                close()
+            finally :
+                if not released.is_set() :
+                    released.set()
+                    self.RateLimiter.Release(path)
+        response.close = release
+        return True
+
+    def CachedResult(self, entry: CacheEntry, endpoint: str, requestOperation: RequestOperation, started: float) -> APIResult:
+        """Answers a call from a fresh ResponseCache entry without sending a request.
+
+        Args:
+            entry (CacheEntry): Entry to answer from.
+            endpoint (string): Name of the calling API method, used to select the ResponseHandlers.
+            requestOperation (RequestOperation): HTTP method of the call.
+            started (float): time.perf_counter() value from when the call started.
+
+        Returns:
+            APIResult : result of the ResponseHandlers run on the cached response.
+        """
+        response = entry.Response()
+        self.CheckResponse(response, endpoint, started, requestOperation)
+        result = self.LastResult
+        result.Cached = True
+        result.ResponseBytes = len(response.content)
+        result.ResponseWireBytes = 0
+        return result
+
+    def Send(self, requestOperation : RequestOperation, url: str, body: bytes = None, stream: bool = False, headers: dict[str, str] = None) -> requests.Response:
+        """Sends a single request through the pooled session.
+
+        Args:
+            requestOperation (RequestOperation): HTTP method to use.
+            url (string): Full URL of the request.
+            body (bytes, optional): JSON body already encoded by the codec. Defaults to None.
+            stream (bool, optional): Do not read the body of the response. Defaults to False.
+            headers (dictionary, optional): Headers to send. Defaults to None, GetHeaders().
+
+        Returns:
+            requests.Response: Response from the instance.
+        """
+        if headers is None : headers = self.GetHeaders()
         match requestOperation :
             case RequestOperation.Get :
-                return self.CheckResponse(requests.get(url, json = json, headers = self.GetHeaders(), verify = self.VerifySSL))
+                return self.Session.get(url, data = body, headers = headers, verify = self.VerifySSL, stream = stream)
             case RequestOperation.Put :
-                return self.CheckResponse(requests.put(url, json = json, headers = self.GetHeaders(), verify = self.VerifySSL))
+                return self.Session.put(url, data = body, headers = headers, verify = self.VerifySSL, stream = stream)
             case RequestOperation.Post :
-                return self.CheckResponse(requests.post(url, json = json, headers = self.GetHeaders(), verify = self.VerifySSL)) 
+                return self.Session.post(url, data = body, headers = headers, verify = self.VerifySSL, stream = stream)
             case RequestOperation.Patch :
-                return self.CheckResponse(requests.patch(url, json = json, headers = self.GetHeaders(), verify = self.VerifySSL))
+                return self.Session.patch(url, data = body, headers = headers, verify = self.VerifySSL, stream = stream)
             case RequestOperation.Delete :
-                return self.CheckResponse(requests.delete(url, json = json, headers = self.GetHeaders(), verify = self.VerifySSL))
+                return self.Session.delete(url, data = body, headers = headers, verify = self.VerifySSL, stream = stream)
 
 # Helper Methods
     def ChangeAttributeName(self, entityName, oldAttributeName, newAttributeName) :
@@ -167,22 +428,22 @@ class API() :
 #############################################################################    @Common.LogFunction
     @Common.LogFunction
     def GetAddressVerificationStrategies(self) -> list[dict[str, Any]]:
-        return self.CallAPI(RequestOperation.Get, "rest/v1/AddressVerificationStrategies")
+        return self.CallAPI(RequestOperation.Get, "rest/v1/AddressVerificationStrategies", endpoint = "GetAddressVerificationStrategies")
     @Common.LogFunction
     def GetAddressVerificationStrategy(self, strategyName) -> dict[str, Any]:
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/AddressVerificationStrategies/{strategyName}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/AddressVerificationStrategies/{strategyName}", endpoint = "GetAddressVerificationStrategy")
     @Common.LogFunction
     def GetAddressVerificationStrategyAttributes(self, strategyName, recordCode) :
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/AddressVerificationStrategies/{strategyName}/address?recordCode={recordCode}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/AddressVerificationStrategies/{strategyName}/address?recordCode={recordCode}", endpoint = "GetAddressVerificationStrategyAttributes")
     @Common.LogFunction
     def StartAddressVerificationStrategy(self, strategyName, body) :
-        return self.CallAPI(RequestOperation.Post, f"rest/v1/AddressVerificationStrategies/{strategyName}/job", json = body)
+        return self.CallAPI(RequestOperation.Post, f"rest/v1/AddressVerificationStrategies/{strategyName}/job", json = body, endpoint = "StartAddressVerificationStrategy")
     @Common.LogFunction
     def StartAddressVerificationStrategy(self, strategyName, records) :
-        return self.CallAPI(RequestOperation.Post, f"rest/v1/AddressVerificationStrategies/{strategyName}/records", json = records)
+        return self.CallAPI(RequestOperation.Post, f"rest/v1/AddressVerificationStrategies/{strategyName}/records", json = records, endpoint = "StartAddressVerificationStrategy")
     @Common.LogFunction
     def StopAddressVerificationStrategy(self, strategyName) :
-        return self.CallAPI(RequestOperation.Put, f"rest/v1/AddressVerificationStrategies/{strategyName}/job/cancel")
+        return self.CallAPI(RequestOperation.Put, f"rest/v1/AddressVerificationStrategies/{strategyName}/job/cancel", endpoint = "StopAddressVerificationStrategy")
 
 #############################################################################        
 # Attributes
@@ -190,12 +451,12 @@ class API() :
     @Common.LogFunction
     def GetAttributes(self, entity_name: str = None) -> Dict[str, Any]:
         if entity_name is None :
-            return self.CallAPI(RequestOperation.Get, "rest/v1/Attributes")
+            return self.CallAPI(RequestOperation.Get, "rest/v1/Attributes", endpoint = "GetAttributes")
         else :
-            return self.CallAPI(RequestOperation.Get, f"rest/v1/Entities/{entity_name}/attributes")
+            return self.CallAPI(RequestOperation.Get, f"rest/v1/Entities/{entity_name}/attributes", endpoint = "GetAttributes")
     @Common.LogFunction       
     def GetAttribute(self, entity_name:str, attribute_name:str) -> Dict[str, Any]:
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/Entities/{entity_name}/attributes/{attribute_name}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/Entities/{entity_name}/attributes/{attribute_name}", endpoint = "GetAttribute")
     @Common.LogFunction
     def CreateAttribute(self, attribute: Dict[str, Any]) -> Dict[str, Any]:
         """_summary_
@@ -206,7 +467,7 @@ class API() :
         Returns:
             dictionary: Attribute creation information
         """
-        return self.CallAPI(RequestOperation.Post, "rest/v1/Attributes", json = [attribute])
+        return self.CallAPI(RequestOperation.Post, "rest/v1/Attributes", json = [attribute], endpoint = "CreateAttribute")
 
     @Common.LogFunction
     def CreateAttributes(self, attributes: list[Dict[str, Any]]) -> Dict[str, Any]:
@@ -228,7 +489,7 @@ class API() :
         
     @Common.LogFunction
     def UpdateAttributes(self, attributes) :
-        return self.CallAPI(RequestOperation.Put, "rest/v1/Attributes", json = attributes)
+        return self.CallAPI(RequestOperation.Put, "rest/v1/Attributes", json = attributes, endpoint = "UpdateAttributes")
 
     @Common.LogFunction
     def DeleteAttributes(self, attributeNames) :
@@ -244,7 +505,7 @@ class API() :
 # Auth
 #############################################################################
     def GetAuthenticationURL(self) :
-        return self.CallAPI(RequestOperation.Get, "rest/v1/Auth")
+        return self.CallAPI(RequestOperation.Get, "rest/v1/Auth", endpoint = "GetAuthenticationURL")
 
 #############################################################################
 ## Connect
@@ -254,10 +515,10 @@ class API() :
             "FilterExpression" : filter if filter is not None else "",
             "Codes" : record_codes if record_codes is not None else [ ]
         }
-        return self.CallAPI(RequestOperation.Post, f"rest/v1/Connect/Strategies/{strategy_name}/Batch", json = body)
+        return self.CallAPI(RequestOperation.Post, f"rest/v1/Connect/Strategies/{strategy_name}/Batch", json = body, endpoint = "RunConnectBatch")
 
     def RunConnectImmediate(self, strategy_name:str, record_codes: list[str]) -> dict[str, Any]:
-        return self.CallAPI(RequestOperation.Post, f"rest/v1/Connect/Strategies/{strategy_name}/Immediate", json = record_codes)
+        return self.CallAPI(RequestOperation.Post, f"rest/v1/Connect/Strategies/{strategy_name}/Immediate", json = record_codes, endpoint = "RunConnectImmediate")
 
     # Come back to this one...
 
@@ -293,13 +554,13 @@ class API() :
         Returns:
             dictionary: List of entities from Profisee instance.
         """
-        return self.CallAPI(RequestOperation.Get, "rest/v1/Entities")
+        return self.CallAPI(RequestOperation.Get, "rest/v1/Entities", endpoint = "GetEntities")
 
     def GetEntity(self, entityName) :
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/Entities/{entityName}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/Entities/{entityName}", endpoint = "GetEntity")
 
     def CreateEntity(self, entity) :
-        self.CallAPI(RequestOperation.Post, "rest/v1/Entities", json = [entity])
+        self.CallAPI(RequestOperation.Post, "rest/v1/Entities", json = [entity], endpoint = "CreateEntity")
     
     def UpdateEntity(self, entity) :
         raise NotImplementedError("UpdateEntity not implemented yet...")    
@@ -319,7 +580,7 @@ class API() :
         Returns:
             dictionary: deletion information.
         """
-        return self.CallAPI(RequestOperation.Delete, f"rest/v1/Entities/{entityName}")
+        return self.CallAPI(RequestOperation.Delete, f"rest/v1/Entities/{entityName}", endpoint = "DeleteEntity")
     
     @Common.LogFunction
     def DeleteEntities(self, entityNames:list[str]) -> dict[str, Any]:
@@ -331,7 +592,7 @@ class API() :
         Returns:
             dictionary: deletion information.
         """
-        return self.CallAPI(RequestOperation.Delete, "rest/v1/Entities?Entities=" + ",".join(entityNames))
+        return self.CallAPI(RequestOperation.Delete, "rest/v1/Entities?Entities=" + ",".join(entityNames), endpoint = "DeleteEntities")
 
 
 #############################################################################
@@ -387,7 +648,7 @@ class API() :
         Returns:
             dictionary: List of log events.
         """
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/LogEvents?PageNumber={pageNumber}&PageSize={pageSize}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/LogEvents?PageNumber={pageNumber}&PageSize={pageSize}", endpoint = "GetLogEvents")
 
 #############################################################################
 # # Matching
@@ -399,7 +660,7 @@ class API() :
         Returns:
             dictionary: List of matching strategies.
         """
-        return self.CallAPI(RequestOperation.Get, "rest/v1/Matching")
+        return self.CallAPI(RequestOperation.Get, "rest/v1/Matching", endpoint = "GetMatchingStrategies")
 
     def GetMatches(self, strategyName, record_codes) :
         pass
@@ -415,11 +676,11 @@ class API() :
             case ProcessActions.SurvivorshipOnly : actions = { "actions" : [ "SurvivorshipOnly" ] }
             case ProcessActions.ClearPriorResults : actions = { "actions" : [ "ClearPriorResults", "ClearMatchingResults" ] }
             case ProcessActions.ClearAllPriorResults : actions = { "actions" : [ "ClearAllPriorResults", "ClearMatchingResults" ] }
-        return self.CallAPI(RequestOperation.Post, f"rest/v1/Matching/{strategyName}/processActions", json = actions)
+        return self.CallAPI(RequestOperation.Post, f"rest/v1/Matching/{strategyName}/processActions", json = actions, endpoint = "ProcessMatchingActions")
     
     @Common.LogFunction
     def RestartMatchingSequence(self, strategyName, value) :
-        return self.CallAPI(RequestOperation.Post, f"rest/v1/Matching/{strategyName}/restartSequence?Value={value}")
+        return self.CallAPI(RequestOperation.Post, f"rest/v1/Matching/{strategyName}/restartSequence?Value={value}", endpoint = "RestartMatchingSequence")
         
     def Survivorship(self) :
         pass
@@ -432,11 +693,11 @@ class API() :
         
     def UpdateMatchingStrategy(self, strategyName, matchingStatus : MatchingStatus) :
         status = { "continuousMatchingSetting" : matchingStatus.value }
-        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Matching/{strategyName}", json = status)
+        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Matching/{strategyName}", json = status, endpoint = "UpdateMatchingStrategy")
     
     @Common.LogFunction        
     def UnmatchRecords(self, strategyName, record_codes) :
-        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Matching/{strategyName}/unmatchRecords", json = { "record_codes" : record_codes })
+        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Matching/{strategyName}/unmatchRecords", json = { "record_codes" : record_codes }, endpoint = "UnmatchRecords")
 
 #############################################################################
 ## Monitor
@@ -445,7 +706,7 @@ class API() :
         if (getOptions is None) : 
             getOptions = GetOptions()
             getOptions.OrderBy = "[StartedTime] desc"
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/Monitor/activities?{getOptions.QueryString()}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/Monitor/activities?{getOptions.QueryString()}", endpoint = "GetMonitorActivities")
     
     def GetMonitorActivity(self, activityCode) :
         raise NotImplementedError("GetMonitorActivity not implemented yet...")        
@@ -487,7 +748,7 @@ class API() :
 
     @Common.LogFunction
     def GetRecord(self, entityName, recordCode) :
-        """Calls GetRecords to get specific record from instance.
+        """Calls GetRecords to get specific record from instance, answering from the RecordCache when there is one.
 
         Args:
             entityName (string): Entity name to get record from.
@@ -496,16 +757,330 @@ class API() :
         Returns:
             dictionary: record
         """
+        cacheable = self.RecordCache is not None and self.RecordCache.IsCacheable(entityName)
+        if cacheable :
+            found, record = self.RecordCache.Get(entityName, recordCode)
+            if found : return record
+            generation = self.RecordCache.Generation(entityName) # Taken before the fetch, a write meanwhile keeps the record out
         data = self.GetRecords(entityName, GetOptions(f"[Code] eq '{recordCode}'"))
-        return data[0] if len(data) > 0 else None
-    
+        record = data[0] if len(data) > 0 else None
+        if cacheable and self.LastResult.IsSuccessStatusCode() : self.RecordCache.Put(entityName, recordCode, record, generation)
+        return record
+
+    def GetRecordsByCodes(self, entityName, codes: list[str], attributes: list[str] = None, max_workers: int = 4, max_url_length: int = 2000) -> dict[str, Any] :
+        """Gets many records by Code with a few calls instead of one GetRecord per code.
+
+        The codes are packed into [Code] eq '...' or ... filters, split so each URL stays within max_url_length, and the
+        chunks are fetched concurrently.
+
+        Args:
+            entityName (string): Entity name.
+            codes (list): Record codes to get.
+            attributes (list, optional): Attributes to return, Code is always included. Defaults to None, all attributes.
+            max_workers (int, optional): Chunks fetched at once. Defaults to 4.
+            max_url_length (int, optional): Longest URL to send. Defaults to 2000.
+
+        Raises:
+            APIError: The instance returned an error status code for a chunk.
+
+        Returns:
+            dictionary: record keyed by each code in codes, None for the codes that were not found.
+        """
+        chunks = self.GetCodeFilters(entityName, codes, attributes, max_url_length)
+        if not chunks : return {}
+        with concurrent.futures.ThreadPoolExecutor(min(max_workers, len(chunks)), thread_name_prefix = f"GetRecordsByCodes-{entityName}") as executor :
+            pages = list(executor.map(lambda getOptions : self.GetPage(entityName, getOptions), chunks))
+        return API.CollectByCode(codes, pages)
+
+    def GetCodeFilters(self, entityName, codes: list[str], attributes: list[str] = None, max_url_length: int = 2000) -> list[GetOptions] :
+        """Returns the GetOptions for GetRecordsByCodes, one per chunk of codes whose URL fits in max_url_length."""
+        template = GetOptions()
+        if attributes : template.Attributes = list(attributes) + ([] if "Code" in attributes else [ "Code" ])
+        url = urljoin(self.ProfiseeUrl, f"rest/v1/Records/{entityName}?{template.QueryString()}")
+        budget = max_url_length - len(url) - len("&Filter=&PageSize=000000")
+        terms = [ f"[Code] eq {GetOptions.Quote(code)}" for code in dict.fromkeys(codes) ]
+        separator = " or "
+        chunks = []
+        for chunk in API.ChunkByLength(terms, lambda term : len(urllib.parse.quote(term)), budget, len(urllib.parse.quote(separator))) :
+            getOptions = copy.copy(template)
+            getOptions.Filter = separator.join(chunk)
+            getOptions.PageSize = len(chunk)
+            chunks.append(getOptions)
+        return chunks
+
+    @staticmethod
+    def CollectByCode(codes: list[str], pages: list[list[dict[str, Any]]]) -> dict[str, Any] :
+        """Returns the records in pages keyed by the code in codes they match, case insensitively, and None for missing codes."""
+        records = dict.fromkeys(codes)
+        lowered = { str(code).lower() : code for code in records }
+        for page in pages :
+            for record in page :
+                code = Common.Get(record, "Code")
+                key = code if code in records else lowered.get(str(code).lower())
+                if key is not None : records[key] = record
+        return records
+
+    @staticmethod
+    def ChunkByLength(items: list, length, budget: int, separator_length: int = 0) -> list[list] :
+        """Splits items into chunks whose total length(item), plus separator_length between items, stays within budget.
+        An item longer than budget gets a chunk of its own."""
+        chunks = []
+        chunk = []
+        used = 0
+        for item in items :
+            size = length(item)
+            if chunk and used + separator_length + size > budget :
+                chunks.append(chunk)
+                chunk = []
+                used = 0
+            used += size + (separator_length if chunk else 0)
+            chunk.append(item)
+        if chunk : chunks.append(chunk)
+        return chunks
+
     @Common.LogFunction
-    def GetRecords(self, entityName, getOptions : GetOptions = None) :
+    def GetRecords(self, entityName, getOptions : GetOptions = None, stream: bool = False) :
+        """Gets a page of records from an entity.
+
+        Args:
+            entityName (string): Entity name.
+            getOptions (GetOptions, optional): Filter, paging and attribute options. Defaults to None.
+            stream (bool, optional): Return a generator that decodes the records one at a time while the page downloads,
+                                     instead of the decoded list. See StreamRecords. Defaults to False.
+
+        Returns:
+            list: records, the whole response for CountsOnly, or a generator of records when streaming.
+        """
         if (getOptions is None): getOptions = GetOptions()
+        if stream and not getOptions.CountsOnly : return self.StreamRecords(entityName, getOptions)
         
-        response = self.CallAPI(RequestOperation.Get, f"rest/v1/Records/{entityName}?{getOptions.QueryString()}")                
-        return self.LastResponse.json() if getOptions.CountsOnly else response
-    
+        response = self.CallAPI(RequestOperation.Get, f"rest/v1/Records/{entityName}?{getOptions.QueryString()}", endpoint = "GetRecords")                
+        return self.LastResult.Body if getOptions.CountsOnly else response
+
+    def StreamRecords(self, entityName, getOptions : GetOptions = None, chunk_size: int = 65536) :
+        """Generator that yields the records of a page as they are decoded from the response stream.
+
+        Memory use is bounded by one record and one chunk instead of the whole page, and the first records are yielded before
+        the page has finished downloading. The request is sent on the first call to next().
+
+        Args:
+            entityName (string): Entity name.
+            getOptions (GetOptions, optional): Filter, paging and attribute options. Defaults to None.
+            chunk_size (int, optional): Bytes read from the response at a time. Defaults to 65536.
+
+        Raises:
+            APIError: The instance returned an error status code.
+
+        Yields:
+            dictionary: record
+        """
+        if (getOptions is None): getOptions = GetOptions()
+
+        result = self.SendRequest(RequestOperation.Get, f"rest/v1/Records/{entityName}?{getOptions.QueryString()}", endpoint = "GetRecords", stream = True)
+        if not result.IsSuccessStatusCode() : raise APIError(result)
+        with result.Response as response :
+            result.ResponseBytes = 0
+            def chunks() :
+                for chunk in response.iter_content(chunk_size) :
+                    result.ResponseBytes += len(chunk)
+                    yield chunk
+            records = JsonStream(chunks(), "data", response.encoding or "utf-8")
+            yield from (map(CaseInsensitiveDict.from_Json, records) if getattr(self.Codec, "CaseInsensitive", False) else records)
+            result.ResponseWireBytes = response.raw.tell()
+
+    def GetPage(self, entityName, getOptions : GetOptions) -> list[dict[str, Any]] :
+        """Gets one page of records for the record iterators.
+
+        Args:
+            entityName (string): Entity name.
+            getOptions (GetOptions): Filter, paging and attribute options.
+
+        Raises:
+            APIError: The instance returned an error status code.
+
+        Returns:
+            list: records, empty when the page is past the last record.
+        """
+        result = self.SendRequest(RequestOperation.Get, f"rest/v1/Records/{entityName}?{getOptions.QueryString()}", endpoint = "GetRecords")
+        if not result.IsSuccessStatusCode() : raise APIError(result)
+        return result.Data if isinstance(result.Data, list) else []
+
+    def IterRecords(self, entityName, getOptions : GetOptions = None, prefetch: int = 2) :
+        """Generator that yields every record matching getOptions, walking the pages from getOptions.PageNumber.
+
+        The next pages are fetched by a background thread while the caller works through the current one, so the network
+        latency of each page overlaps with the processing of the previous one. The walk stops after an empty or short page.
+
+        Args:
+            entityName (string): Entity name.
+            getOptions (GetOptions, optional): Filter, order, page size and attribute options. It is not modified. Defaults to None.
+            prefetch (int, optional): Pages fetched ahead of the caller. 0 fetches each page when it is needed. Defaults to 2.
+
+        Raises:
+            APIError: The instance returned an error status code for a page.
+
+        Yields:
+            dictionary: record
+        """
+        getOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        if prefetch <= 0 :
+            while True :
+                page = self.GetPage(entityName, getOptions)
+                yield from page
+                if len(page) < getOptions.PageSize : return
+                getOptions.PageNumber += 1
+
+        pages = queue.Queue(maxsize = prefetch)
+        stop = threading.Event()
+
+        def put(item) -> bool :
+            while not stop.is_set() :
+                try :
+                    pages.put(item, timeout = 0.1)
+                    return True
+                except queue.Full :
+                    pass
+            return False
+
+        def fetch() :
+            pageOptions = copy.copy(getOptions)
+            while True :
+                try :
+                    page = self.GetPage(entityName, pageOptions)
+                except Exception as exception :
+                    put(exception)
+                    return
+                if not put(page) : return
+                if len(page) < pageOptions.PageSize :
+                    put(None)
+                    return
+                pageOptions = copy.copy(pageOptions)
+                pageOptions.PageNumber += 1
+
+        worker = threading.Thread(target = fetch, name = f"IterRecords-{entityName}", daemon = True)
+        worker.start()
+        try :
+            while True :
+                page = pages.get()
+                if page is None : return
+                if isinstance(page, Exception) : raise page
+                yield from page
+        finally :
+            stop.set() # Also stops the worker when the caller abandons the generator
+
+    def IterRecordsByCode(self, entityName, getOptions : GetOptions = None, after: str = None) :
+        """Generator that yields every record matching getOptions in [Code] order using keyset pagination.
+
+        Each page asks for the records with a Code after the last one returned instead of a PageNumber, so deep pages are as
+        fast as the first and records that are inserted or deleted during the scan do not shift the pages. The Code of the
+        last record processed is a cursor, pass it as after to resume an interrupted scan.
+
+        Args:
+            entityName (string): Entity name.
+            getOptions (GetOptions, optional): Filter, page size and attribute options. OrderBy and PageNumber are ignored and
+                                               it is not modified. Defaults to None.
+            after (string, optional): Only return records with a Code after this one. Defaults to None, from the start.
+
+        Raises:
+            APIError: The instance returned an error status code for a page.
+
+        Yields:
+            dictionary: record
+        """
+        getOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        filter = getOptions.Filter
+        getOptions.OrderBy = "[Code]"
+        getOptions.PageNumber = 1
+        if getOptions.Attributes and "Code" not in getOptions.Attributes : getOptions.Attributes = getOptions.Attributes + [ "Code" ] # The cursor
+        while True :
+            if after is not None :
+                getOptions.Filter = f"[Code] gt {GetOptions.Quote(after)}" + (f" and ({filter})" if filter != "" else "")
+            page = self.GetPage(entityName, getOptions)
+            yield from page
+            if len(page) < getOptions.PageSize : return
+            after = Common.Get(page[-1], "Code")
+
+    def CountRecords(self, entityName, getOptions : GetOptions = None) -> int :
+        """Returns the number of records matching the filter of getOptions using a CountsOnly query.
+
+        Raises:
+            APIError: The instance returned an error status code.
+        """
+        countOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        countOptions.CountsOnly = True
+        countOptions.PageNumber = 1
+        body = self.GetRecords(entityName, countOptions)
+        if not self.LastResult.IsSuccessStatusCode() : raise APIError(self.LastResult)
+        return int(Common.Get(body, "totalRecords", 0))
+
+    def IterRecordsParallel(self, entityName, getOptions : GetOptions = None, max_workers: int = 4, ordered: bool = True, check_consistency: bool = True) :
+        """Generator that yields every record matching getOptions, fetching the pages concurrently.
+
+        The number of pages is planned from a CountsOnly query and at most 2 * max_workers pages are requested or waiting to
+        be yielded at once. The records are ordered by [Code] when getOptions has no OrderBy so the pages are stable.
+
+        Args:
+            entityName (string): Entity name.
+            getOptions (GetOptions, optional): Filter, order, page size and attribute options. It is not modified. Defaults to None.
+            max_workers (int, optional): Pages fetched at once. Defaults to 4.
+            ordered (bool, optional): Yield the pages in page order, otherwise as each page arrives. Defaults to True.
+            check_consistency (bool, optional): Count the records again at the end and check that no record was missed or
+                                                returned twice. Defaults to True.
+
+        Raises:
+            APIError: The instance returned an error status code.
+            ConsistencyError: The records changed during the scan.
+
+        Yields:
+            dictionary: record
+        """
+        getOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        if getOptions.OrderBy == "" : getOptions.OrderBy = "[Code]"
+        total = self.CountRecords(entityName, getOptions)
+        pageCount = (total + getOptions.PageSize - 1) // getOptions.PageSize
+        window = 2 * max_workers
+        fetched = 0
+        codes = set()
+        duplicates = []
+
+        def fetch(executor: concurrent.futures.Executor, pageNumber: int) -> concurrent.futures.Future :
+            pageOptions = copy.copy(getOptions)
+            pageOptions.PageNumber = pageNumber
+            return executor.submit(self.GetPage, entityName, pageOptions)
+
+        def pages() :
+            with concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix = f"IterRecordsParallel-{entityName}") as executor :
+                pending = collections.deque()
+                nextPage = 1
+                try :
+                    while pending or nextPage <= pageCount :
+                        while nextPage <= pageCount and len(pending) < window :
+                            pending.append(fetch(executor, nextPage))
+                            nextPage += 1
+                        if ordered :
+                            future = pending.popleft()
+                        else :
+                            future = next(concurrent.futures.as_completed(pending))
+                            pending.remove(future)
+                        yield future.result()
+                finally :
+                    for future in pending : future.cancel()
+
+        for page in pages() :
+            for record in page :
+                fetched += 1
+                if check_consistency :
+                    code = Common.Get(record, "Code")
+                    if code in codes : duplicates.append(code)
+                    else : codes.add(code)
+                yield record
+
+        if check_consistency :
+            recount = self.CountRecords(entityName, getOptions)
+            if recount != total or fetched != total or duplicates :
+                raise ConsistencyError(f"{entityName} changed during the scan: expected {total} records, fetched {fetched}, "
+                                       f"{recount} at the end and {len(duplicates)} returned twice", total, fetched, duplicates)
+
     @Common.LogFunction
     def CreateRecord(self, entityName, record) :
         """_summary_
@@ -517,7 +1092,7 @@ class API() :
         Returns:
             dictionary: Creation information
         """
-        return self.CallAPI(RequestOperation.Post, f"rest/v1/Records/{entityName}", record)
+        return self.CallAPI(RequestOperation.Post, f"rest/v1/Records/{entityName}", record, endpoint = "CreateRecord")
     
     @Common.LogFunction
     def MergeRecord(self, entityName, record) :
@@ -534,7 +1109,61 @@ class API() :
         Returns:
             dictionary: Merge records information
         """
-        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Records/{entityName}", json=records)
+        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Records/{entityName}", json=records, endpoint = "MergeRecords")
+
+    def MergeRecordsBulk(self, entityName, records, writer: BulkWriter = None) -> BulkReport :
+        """Merges a large list of records in adaptive chunks sent concurrently, isolating the records that fail.
+
+        Args:
+            entityName (string): Entity name
+            records (list): List of records to merge into entity
+            writer (BulkWriter, optional): Writer with the chunking and concurrency settings. Defaults to None, BulkWriter(self).
+
+        Returns:
+            BulkReport: per-record outcomes of the merge
+        """
+        return (writer if writer is not None else BulkWriter(self)).Merge(entityName, records)
+
+    def DiffRecords(self, entityName, records, current: dict[str, Any] = None, attributes: list[dict[str, Any]] = None) -> RecordDiff :
+        """Compares records with the values already in the instance, see RecordDiff.
+
+        Args:
+            entityName (string): Entity name
+            records (list): Records to write, each with its Code
+            current (dictionary, optional): Current records keyed by code, ie from an earlier sync. Defaults to None, they are
+                                            fetched with GetRecordsByCodes limited to the attributes being written.
+            attributes (list, optional): GetAttributes response of the entity, so strings of Number, DateTime and Date
+                                         attributes compare as numbers and dates. Defaults to None, fetched with the current
+                                         records when those are fetched, otherwise every string is compared as exact text.
+
+        Returns:
+            RecordDiff: the records and fields that changed and the counts of what was suppressed
+        """
+        if current is None :
+            codes = [ code for record in records if (code := Common.Get(record, "Code")) is not None ]
+            names = list(dict.fromkeys(name for record in records for name in record if name.lower() != "code"))
+            current = self.GetRecordsByCodes(entityName, codes, names) if codes else {}
+            if attributes is None and codes : attributes = self.GetAttributes(entityName)
+        return RecordDiff.from_Records(records, current, attributes if isinstance(attributes, list) else None)
+
+    def MergeChangedRecords(self, entityName, records, current: dict[str, Any] = None, writer: BulkWriter = None, attributes: list[dict[str, Any]] = None) -> RecordDiff :
+        """Merges only the records and fields that differ from the values already in the instance, so unchanged records
+        do not cause transactions, matching or workflow triggers.
+
+        Args:
+            entityName (string): Entity name
+            records (list): Records to write, each with its Code
+            current (dictionary, optional): Current records keyed by code. Defaults to None, they are fetched.
+            writer (BulkWriter, optional): Writer for the changes. Defaults to None, BulkWriter(self).
+            attributes (list, optional): GetAttributes response of the entity. Defaults to None, see DiffRecords.
+
+        Returns:
+            RecordDiff: the changes with the BulkReport of their merge as Report, and the number of suppressed writes
+        """
+        diff = self.DiffRecords(entityName, records, current, attributes)
+        logging.getLogger().info(f"MergeChangedRecords {entityName}: {len(diff.Changes)} changed, {diff.Suppressed} unchanged records suppressed")
+        if diff.Changes : diff.Report = self.MergeRecordsBulk(entityName, diff.Changes, writer)
+        return diff
 
     @Common.LogFunction
     def DeleteRecord(self, entityName: str, recordCode: str) :
@@ -547,12 +1176,15 @@ class API() :
         Returns:
             dictionary: Delete records information
         """
-        return self.DeleteRecords(entityName, [recordCode])
+        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Records/{entityName}?Record_codes=" + urllib.parse.quote(str(recordCode), safe = ""), endpoint = "DeleteRecords")
     
     @Common.LogFunction
     def DeleteRecords(self, entity_name: str, record_codes: list) :
         """Delete specified records
 
+        The codes are sent URL encoded in the query string of one call, so a long list can go over the roughly 2000
+        character URL limit of the instance. Use DeleteRecordsBulk for those.
+
         Args:
             entityName (string): Entity name
             record_codes (list): List of record codes to remove from entity
@@ -560,8 +1192,56 @@ class API() :
         Returns:
             dictionary: Delete records information
         """
-        # ToDo : If > x RecordCodes sent in batch the operation since we are sending the record codes via the url and it is limited to about 2000 characters
-        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Records/{entity_name}?Record_codes=" + ",".join(record_codes))
+        return self.CallAPI(RequestOperation.Patch, f"rest/v1/Records/{entity_name}?Record_codes=" + ",".join(urllib.parse.quote(str(code), safe = "") for code in record_codes), endpoint = "DeleteRecords")
+
+    @Common.LogFunction
+    def DeleteRecordsBulk(self, entity_name: str, record_codes: list, max_workers: int = 4, max_url_length: int = 2000) -> BulkReport :
+        """Deletes any number of records, reporting the outcome of each code.
+
+        The codes are sent in the query string, so they are URL encoded and split into chunks whose URL stays within
+        max_url_length, and the chunks are sent concurrently.
+
+        Args:
+            entityName (string): Entity name
+            record_codes (list): List of record codes to remove from entity
+            max_workers (int, optional): Chunks sent at once. Defaults to 4.
+            max_url_length (int, optional): Longest URL to send. Defaults to 2000.
+
+        Returns:
+            BulkReport: outcome per code, None when it was deleted otherwise the error reported for it
+        """
+        report = BulkReport(record_codes)
+        if not record_codes : return report
+        started = time.perf_counter()
+
+        def delete(chunk: tuple) -> tuple :
+            indexes, url = chunk
+            return (indexes, self.SendRequest(RequestOperation.Patch, url, endpoint = "DeleteRecords"))
+
+        chunks = self.GetDeleteChunks(entity_name, record_codes, max_url_length)
+        with concurrent.futures.ThreadPoolExecutor(min(max_workers, len(chunks)), thread_name_prefix = f"DeleteRecordsBulk-{entity_name}") as executor :
+            for indexes, result in executor.map(delete, chunks) : API.RecordDeleteOutcomes(report, indexes, result)
+        report.Elapsed = time.perf_counter() - started
+        return report
+
+    def GetDeleteChunks(self, entity_name: str, record_codes: list, max_url_length: int) -> list[tuple[list[int], str]] :
+        """Returns (indexes of the codes, URL) of each DeleteRecordsBulk call, the codes URL encoded and split so each URL
+        stays within max_url_length."""
+        url = f"rest/v1/Records/{entity_name}?Record_codes="
+        encoded = [ urllib.parse.quote(str(code), safe = "") for code in record_codes ]
+        chunks = API.ChunkByLength(list(range(len(encoded))), lambda index : len(encoded[index]), max_url_length - len(urljoin(self.ProfiseeUrl, url)), 1)
+        return [ (indexes, url + ",".join(encoded[index] for index in indexes)) for indexes in chunks ]
+
+    @staticmethod
+    def RecordDeleteOutcomes(report: BulkReport, indexes: list[int], result: APIResult) -> None :
+        """Sets the outcomes of the codes of one DeleteRecords call. An error that names no code is given to the codes of
+        the call that have no outcome yet, keeping the errors reported per code."""
+        report.Requests += 1
+        report.ChunkSizes.append(len(indexes))
+        error = BulkWriter.RecordOutcomes(report, indexes, result)
+        if error is None : return
+        for index in indexes :
+            if report.Outcomes[index] is None : report.Outcomes[index] = error
     
     @Common.LogFunction
     def DeleteAllMembers(self, entity_name:str) -> dict[str, Any]:
@@ -573,7 +1253,7 @@ class API() :
         Returns:
             dict[str, Any]: The response from the API call.
         """
-        return self.CallAPI(RequestOperation.Delete, f"rest/v1/Records/bulk/{entity_name}")
+        return self.CallAPI(RequestOperation.Delete, f"rest/v1/Records/bulk/{entity_name}", endpoint = "DeleteAllMembers")
 
 #############################################################################
 ## Themes
@@ -584,7 +1264,7 @@ class API() :
         Returns:
             dict[str, Any]: The response from the API call.
         """
-        return self.CallAPI(RequestOperation.Get, "rest/v1/Themes")
+        return self.CallAPI(RequestOperation.Get, "rest/v1/Themes", endpoint = "GetThemes")
 
     def GetTheme(self, theme_name:str) -> dict[str, Any]:
         """Retrieves a specific theme.
@@ -595,7 +1275,7 @@ class API() :
         Returns:
             dict[str, Any]: The response from the API call.
         """
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/Themes/{theme_name}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/Themes/{theme_name}", endpoint = "GetTheme")
 
     def UpdateTheme(self, theme_name:str, theme_object:dict[str, Any]) -> dict[str, Any]:
         """Updates a specific theme.
@@ -607,7 +1287,7 @@ class API() :
         Returns:
             dict[str, Any]: The response from the API call.
         """
-        return self.CallAPI(RequestOperation.Put, f"rest/v1/Themes/{theme_name}", json=theme_object)
+        return self.CallAPI(RequestOperation.Put, f"rest/v1/Themes/{theme_name}", json=theme_object, endpoint = "UpdateTheme")
 
 #############################################################################
 ## Transactions
@@ -623,7 +1303,7 @@ class API() :
         Returns:
             dict[str, Any]: The response from the API call.
         """
-        return self.CallAPI(RequestOperation.Get, f"rest/v1/Transactions/{entity_name}?recordCode={record_code}&{get_options.QueryString()}")
+        return self.CallAPI(RequestOperation.Get, f"rest/v1/Transactions/{entity_name}?recordCode={record_code}&{get_options.QueryString()}", endpoint = "GetTransactions")
 
     def ReverseTransaction(self, entity_name:str, transaction_id:int, record_code:str) -> dict[str, Any]:
         """Reverses a specific transaction.
@@ -636,7 +1316,7 @@ class API() :
         Returns:
             dict[str, Any]: The response from the API call.
         """
-        return self.CallAPI(RequestOperation.Put, f"rest/v1/Transactions/{entity_name}/{transaction_id}/reverse", json = { "recordCode": record_code })
+        return self.CallAPI(RequestOperation.Put, f"rest/v1/Transactions/{entity_name}/{transaction_id}/reverse", json = { "recordCode": record_code }, endpoint = "ReverseTransaction")
 
 #############################################################################
 # Workflows
@@ -652,4 +1332,4 @@ class API() :
             dict[str, Any]: The response from the API call.
         """
         instance_status_query_part = f"&InstanceStatus={instance_status.value}" if instance_status != WorkflowInstanceStatus.All else ""
-        return self.CallAPI(RequestOperation.Delete, f"rest/v1/Workflows?WorkflowName={workflow_name}{instance_status_query_part}")
+        return self.CallAPI(RequestOperation.Delete, f"rest/v1/Workflows?WorkflowName={workflow_name}{instance_status_query_part}", endpoint = "DeleteWorkflowInstances")
@@ -0,0 +1,79 @@
+from typing import Any
+
+from Profisee.Restful.Enums import RequestOperation
+from Profisee.Restful.Codec import JsonCodec, default_codec
+
+class APIResult :
+    """Outcome of a single call to the Profisee Restful API.
+
+    Returned by API.SendRequest and kept as API.LastResult for the calling thread or asyncio task, so concurrent callers
+    sharing one API never see each other's status codes.
+    """
+    def __init__(self, endpoint: str, request_operation: RequestOperation, url: str, response: Any, data: Any, errors: Any, elapsed: float, codec: JsonCodec = None) -> None:
+        """Constructor for APIResult.
+
+        Args:
+            endpoint (string): Name of the API method that made the call.
+            request_operation (RequestOperation): HTTP method used.
+            url (string): Full URL of the call.
+            response (Response): Raw response from requests or aiohttp.
+            data (Any): Value returned by the ResponseHandler, this is what the API methods return.
+            errors (Any): Errors reported by the ResponseHandler, None when there were none.
+            elapsed (float): Seconds taken to send the request and handle the response, including any retries.
+            codec (JsonCodec, optional): Codec used to decode the body. Defaults to None, the default codec.
+        """
+        self.Endpoint = endpoint
+        self.RequestOperation = request_operation
+        self.Url = url
+        self.Response = response
+        self.StatusCode = response.status_code if response is not None else None
+        self.Data = data
+        self.Errors = errors
+        self.Elapsed = elapsed
+        self.Retries = 0
+        self.BackoffTime = 0.0
+        self.QueueTime = 0.0
+        self.RequestBytes = 0 # Size of the encoded request body
+        self.RequestWireBytes = 0 # Size of the request body as sent, after any compression
+        self.ResponseBytes = None # Size of the response body after decompression
+        self.ResponseWireBytes = None # Size of the response body as received, before decompression, None when unknown
+        self.Cached = False # Answered from the ResponseCache, either without a request or by a 304
+        self.Codec = codec if codec is not None else default_codec
+        self._Body = None
+        self._BodyDecoded = False
+
+    def __repr__(self) :
+        return f"APIResult(Endpoint={self.Endpoint}, StatusCode={self.StatusCode}, Elapsed={self.Elapsed:.3f}s, Retries={self.Retries})"
+
+    @property
+    def Body(self) -> Any :
+        """Response body decoded from JSON. It is decoded on first use and only once, None for an empty body."""
+        if not self._BodyDecoded :
+            content = self.Response.content if self.Response is not None else None
+            self._Body = self.Codec.Decode(content) if content else None
+            self._BodyDecoded = True
+        return self._Body
+
+    @property
+    def Text(self) -> str :
+        return self.Response.text if self.Response is not None else None
+
+    def IsSuccessStatusCode(self) -> bool :
+        return self.StatusCode is not None and self.StatusCode >= 200 and self.StatusCode < 300
+
+
+class APIError(Exception) :
+    """Raised by the API methods that return iterators, which can not return an error response like the other methods do."""
+    def __init__(self, result: APIResult, message: str = None) -> None:
+        super().__init__(message if message is not None else f"{result.Endpoint} failed with StatusCode {result.StatusCode}: {result.Text}")
+        self.Result = result
+
+
+class ConsistencyError(Exception) :
+    """Raised at the end of a parallel page scan when the records changed during the scan, so pages may have shifted and
+    records may have been skipped or returned twice."""
+    def __init__(self, message: str, expected: int, fetched: int, duplicates: list[str] = None) -> None:
+        super().__init__(message)
+        self.Expected = expected
+        self.Fetched = fetched
+        self.Duplicates = duplicates if duplicates is not None else []
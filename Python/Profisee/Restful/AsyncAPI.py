@@ -0,0 +1,430 @@
+import asyncio, collections, copy, json, time, logging, gzip
+import aiohttp
+from urllib.parse import urljoin
+from typing import Any, Dict
+
+from Profisee.Restful.API import API
+from Profisee.Restful.GetOptions import GetOptions
+from Profisee.Restful.APIResult import APIResult, APIError, ConsistencyError
+from Profisee.Restful.RetryPolicy import RetryPolicy, CircuitBreaker
+from Profisee.Restful.RateLimiter import RateLimiter
+from Profisee.Restful.Codec import JsonCodec
+from Profisee.Restful.ResponseCache import ResponseCache
+from Profisee.Restful.RecordCache import RecordCache
+from Profisee.Restful.BulkWriter import BulkWriter, BulkReport
+from Profisee.Restful.RecordDiff import RecordDiff
+from Profisee.Common import Common
+from Profisee.Restful.Enums import RequestOperation
+
+class AsyncResponse :
+    """Fully read aiohttp response that exposes the parts of a requests.Response that the ResponseHandlers use."""
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str], encoding: str = None, wire_bytes: int = None) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding or "utf-8"
+        self.wire_bytes = wire_bytes # None when the size on the wire is unknown
+
+    @property
+    def text(self) -> str :
+        return self.content.decode(self.encoding, errors = "replace")
+
+    def json(self) -> Any :
+        return json.loads(self.content)
+
+class AsyncAPI(API) :
+    """asyncio version of the Restful API built on aiohttp.
+
+    Every API method is awaitable and has the same arguments and ResponseHandlers semantics as API. All calls share one
+    connector and the number of calls in flight at once is bounded by max_concurrency.
+    """
+    def __init__(self, profisee_url, client_id, verify_ssl = True, pool_connections = 10, pool_maxsize = 10, pool_block = False, keep_alive = True,
+                 retry_policy: RetryPolicy = None, circuit_breaker: CircuitBreaker = None, rate_limiter: RateLimiter = None, codec: JsonCodec = None,
+                 compression: bool = False, compression_threshold: int = 65536, response_cache: ResponseCache = None,
+                 record_cache: RecordCache = None, max_concurrency = 10) -> None:
+        """Constructor for the asyncio Restful API.
+
+        Args:
+            profiseeUrl (string): URL to Profisee instance.
+            clientId (string): Client ID to access Profisee instance.
+            verify_ssl (bool, optional): Verify the SSL certificate of the instance. Defaults to True.
+            pool_connections (int, optional): Number of hosts the connector keeps connections for. Defaults to 10.
+            pool_maxsize (int, optional): Maximum number of connections open per host. Defaults to 10.
+            pool_block (bool, optional): Not used, the connector always waits for a free connection. Defaults to False.
+            keep_alive (bool, optional): Reuse connections between calls. Defaults to True.
+            retry_policy (RetryPolicy, optional): Policy for retrying throttled and failed calls. Defaults to None, no retries.
+            circuit_breaker (CircuitBreaker, optional): Fails calls fast while the instance is down. Defaults to None.
+            rate_limiter (RateLimiter, optional): Client side rate and max-in-flight limits per endpoint family. Defaults to None.
+            codec (JsonCodec, optional): Codec for request and response bodies. Defaults to None, the fastest one installed.
+            compression (bool, optional): Ask for gzip/deflate responses and gzip request bodies. The instance has to accept
+                                          gzip request bodies. Defaults to False.
+            compression_threshold (int, optional): Smallest request body in bytes that is gzipped. Defaults to 65536.
+            response_cache (ResponseCache, optional): Cache for the metadata endpoints. Defaults to None.
+            record_cache (RecordCache, optional): Read-through cache for GetRecord. Defaults to None.
+            max_concurrency (int, optional): Maximum number of calls in flight at once. Defaults to 10.
+        """
+        self.PoolConnections = pool_connections
+        self.PoolMaxSize = pool_maxsize
+        self.MaxConcurrency = max_concurrency
+        self.Semaphore = None
+        super().__init__(profisee_url, client_id, verify_ssl, pool_connections, pool_maxsize, pool_block, keep_alive, retry_policy, circuit_breaker, rate_limiter, codec, compression, compression_threshold, response_cache, record_cache)
+
+    async def __aenter__(self) :
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) :
+        await self.close()
+
+    def CreateSession(self, pool_connections: int, pool_maxsize: int, pool_block: bool) -> aiohttp.ClientSession :
+        """The aiohttp session has to be created inside the running event loop, so it is created on the first call instead."""
+        return None
+
+    def GetSession(self) -> aiohttp.ClientSession :
+        """Returns the shared session, creating it and the concurrency semaphore in the running event loop on first use.
+
+        Returns:
+            aiohttp.ClientSession: Session with the shared connector.
+        """
+        if self.Session is None or self.Session.closed :
+            connector = aiohttp.TCPConnector(limit = self.PoolConnections * self.PoolMaxSize, limit_per_host = self.PoolMaxSize,
+                                             ssl = None if self.VerifySSL else False, force_close = not self.KeepAlive)
+            # Without compression ask for plain bodies, aiohttp otherwise asks for gzip and deflate on its own.
+            self.Session = aiohttp.ClientSession(connector = connector, headers = None if self.Compression else { "Accept-Encoding" : "identity" })
+            self.Semaphore = asyncio.Semaphore(self.MaxConcurrency)
+        return self.Session
+
+    async def close(self) -> None :
+        """Closes the session and the shared connector."""
+        if self.Session is not None : await self.Session.close()
+
+    def GetHeaders(self) :
+        headers = super().GetHeaders()
+        del headers["Connection"] # The connector manages keep-alive through force_close
+        return headers
+
+    @Common.LogFunction
+    async def CallAPI(self, requestOperation : RequestOperation, url: str, json: dict[str, Any] = None, endpoint: str = None) -> dict[str, Any]:
+        """Sends the request and returns what the ResponseHandler made of the response. The full result is available as LastResult.
+
+        Args:
+            requestOperation (RequestOperation): HTTP method to use.
+            url (string): URL relative to the Profisee instance.
+            json (dictionary, optional): Body to send as JSON. Defaults to None.
+            endpoint (string, optional): Name of the calling API method, used to select the ResponseHandlers. Defaults to None.
+
+        Returns:
+            dictionary : modified response object based on call to CheckResponse().
+        """
+        return (await self.SendRequest(requestOperation, url, json, endpoint)).Data
+
+    async def SendRequest(self, requestOperation : RequestOperation, url: str, json: dict[str, Any] = None, endpoint: str = None) -> APIResult:
+        """Sends the request through the shared session, retrying as allowed by the RetryPolicy, and checks the final
+        response against the ResponseHandlers.
+
+        Args:
+            requestOperation (RequestOperation): HTTP method to use.
+            url (string): URL relative to the Profisee instance.
+            json (dictionary, optional): Body to send as JSON. Defaults to None.
+            endpoint (string, optional): Name of the calling API method, used to select the ResponseHandlers. Defaults to None.
+
+        Returns:
+            APIResult : status, data, errors, timing, retries and queueing delay of this call.
+        """
+        path = url
+        url = urljoin(self.ProfiseeUrl, url)
+        started = time.perf_counter()
+        body = self.Codec.Encode(json) if json is not None else None # Encoded and compressed once and reused by any retries
+        request_bytes = len(body) if body is not None else 0
+        headers = self.GetHeaders()
+        if self.Compression and body is not None and len(body) >= self.CompressionThreshold :
+            body = gzip.compress(body, compresslevel = 6)
+            headers["Content-Encoding"] = "gzip"
+        cache_entry = None
+        if self.ResponseCache is not None and requestOperation == RequestOperation.Get and self.ResponseCache.IsCacheable(endpoint) :
+            cache_entry, fresh = self.ResponseCache.Lookup(url, endpoint, self.ClientId)
+            if fresh : return self.CachedResult(cache_entry, endpoint, requestOperation, started)
+            if cache_entry is not None : headers.update(cache_entry.ValidationHeaders())
+        attempt = 0
+        backoff_time = 0.0
+        queue_time = 0.0
+
+        while True :
+            if self.CircuitBreaker is not None : self.CircuitBreaker.BeforeCall()
+            try :
+                if self.RateLimiter is not None : queue_time += await self.RateLimiter.AcquireAsync(path)
+            except BaseException :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.CancelCall()
+                raise
+            try :
+                response = await self.Send(requestOperation, url, body, headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exception :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.RecordResult(None)
+                if self.RetryPolicy is None or not self.RetryPolicy.ShouldRetry(requestOperation, endpoint, attempt) : raise
+                delay = self.RetryPolicy.GetBackoff(attempt)
+                logging.getLogger().warning(f"{endpoint} failed with '{exception}', retry {attempt + 1} in {delay:.2f}s")
+            except aiohttp.ClientError :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.RecordResult(None)
+                raise
+            except BaseException : # Cancelled or not an outcome of the instance, the circuit must still not wait on this call
+                if self.CircuitBreaker is not None : self.CircuitBreaker.CancelCall()
+                raise
+            else :
+                if self.CircuitBreaker is not None : self.CircuitBreaker.RecordResult(response.status_code)
+                if self.RetryPolicy is None or not self.RetryPolicy.ShouldRetry(requestOperation, endpoint, attempt, response.status_code) : break
+                delay = self.RetryPolicy.GetBackoff(attempt, response.headers.get("Retry-After"))
+                logging.getLogger().warning(f"{endpoint} returned {response.status_code}, retry {attempt + 1} in {delay:.2f}s")
+            finally :
+                if self.RateLimiter is not None : self.RateLimiter.Release(path)
+            await asyncio.sleep(delay)
+            backoff_time += delay
+            attempt += 1
+
+        handled = self.ResponseCache.Update(url, endpoint, response, cache_entry, self.ClientId) if self.ResponseCache is not None else response
+        self.CheckResponse(handled, endpoint, started, requestOperation)
+        result = self.LastResult
+        result.Cached = handled is not response
+        result.Retries = attempt
+        result.BackoffTime = backoff_time
+        result.QueueTime = queue_time
+        result.RequestBytes = request_bytes
+        result.RequestWireBytes = len(body) if body is not None else 0
+        result.ResponseBytes = len(handled.content)
+        result.ResponseWireBytes = response.wire_bytes
+        if self.RecordCache is not None and requestOperation != RequestOperation.Get : self.RecordCache.InvalidateFor(endpoint, path, json)
+        return result
+
+    async def Send(self, requestOperation : RequestOperation, url: str, body: bytes = None, headers: Dict[str, str] = None) -> AsyncResponse:
+        """Sends a single request through the shared session and reads the whole response.
+
+        Args:
+            requestOperation (RequestOperation): HTTP method to use.
+            url (string): Full URL of the request.
+            body (bytes, optional): JSON body already encoded by the codec. Defaults to None.
+            headers (dictionary, optional): Headers to send. Defaults to None, GetHeaders().
+
+        Returns:
+            AsyncResponse: Response from the instance.
+        """
+        session = self.GetSession()
+        if headers is None : headers = self.GetHeaders()
+        async with self.Semaphore :
+            async with session.request(requestOperation.name.upper(), url, data = body, headers = headers) as response :
+                content = await response.read()
+                wire_bytes = getattr(response.content, "total_raw_bytes", None) # Only counted by newer aiohttp versions
+                if wire_bytes is None : wire_bytes = AsyncAPI.GetWireBytes(response.headers, content)
+                return AsyncResponse(url, response.status, content, response.headers.copy(), response.charset, wire_bytes)
+
+    @staticmethod
+    def GetWireBytes(headers: Dict[str, str], content: bytes) -> int :
+        """Returns the size of a response body before decompression from its headers, for aiohttp versions that do not count
+        it: the decoded size when the body was not encoded, else Content-Length, or None when neither tells."""
+        if headers.get("Content-Encoding", "identity").lower() == "identity" : return len(content)
+        length = headers.get("Content-Length")
+        return int(length) if length is not None and length.isdigit() else None
+
+    # The methods below call other API methods and so have to await them.
+    async def ChangeAttributeName(self, entityName, oldAttributeName, newAttributeName) :
+        attribute = await self.GetAttribute(entityName, oldAttributeName)
+        if self.StatusCode != 404 :
+            attribute['identifier']['name'] = newAttributeName
+            await self.UpdateAttribute(attribute)
+
+    @Common.LogFunction
+    async def CreateAttributes(self, attributes: list[Dict[str, Any]]) -> Dict[str, Any]:
+        for attribute in attributes:
+            await self.CreateAttribute(attribute)
+
+    @Common.LogFunction
+    async def UpdateAttribute(self, attribute) :
+        await self.UpdateAttributes([ attribute ])
+
+    async def CreateEntity(self, entity) :
+        await self.CallAPI(RequestOperation.Post, "rest/v1/Entities", json = [entity], endpoint = "CreateEntity")
+
+    @Common.LogFunction
+    async def GetRecord(self, entityName, recordCode) :
+        cacheable = self.RecordCache is not None and self.RecordCache.IsCacheable(entityName)
+        if cacheable :
+            found, record = self.RecordCache.Get(entityName, recordCode)
+            if found : return record
+            generation = self.RecordCache.Generation(entityName) # Taken before the fetch, a write meanwhile keeps the record out
+        data = await self.GetRecords(entityName, GetOptions(f"[Code] eq '{recordCode}'"))
+        record = data[0] if len(data) > 0 else None
+        if cacheable and self.LastResult.IsSuccessStatusCode() : self.RecordCache.Put(entityName, recordCode, record, generation)
+        return record
+
+    @Common.LogFunction
+    async def GetRecords(self, entityName, getOptions : GetOptions = None, stream: bool = False) :
+        """Gets a page of records from an entity, or with stream an async generator of its records. See API.GetRecords."""
+        if (getOptions is None): getOptions = GetOptions()
+        if stream and not getOptions.CountsOnly : return self.StreamRecords(entityName, getOptions)
+
+        response = await self.CallAPI(RequestOperation.Get, f"rest/v1/Records/{entityName}?{getOptions.QueryString()}", endpoint = "GetRecords")
+        return self.LastResult.Body if getOptions.CountsOnly else response
+
+    async def StreamRecords(self, entityName, getOptions : GetOptions = None, chunk_size: int = 65536) :
+        """Async generator that yields the records of a page. The response is read whole before the first record is yielded,
+        as every AsyncAPI response is, so unlike API.StreamRecords it does not bound memory; chunk_size is not used.
+
+        Raises:
+            APIError: The instance returned an error status code.
+        """
+        page = await self.GetPage(entityName, getOptions if getOptions is not None else GetOptions())
+        for record in page : yield record
+
+    async def GetPage(self, entityName, getOptions : GetOptions) -> list[Dict[str, Any]] :
+        result = await self.SendRequest(RequestOperation.Get, f"rest/v1/Records/{entityName}?{getOptions.QueryString()}", endpoint = "GetRecords")
+        if not result.IsSuccessStatusCode() : raise APIError(result)
+        return result.Data if isinstance(result.Data, list) else []
+
+    async def IterRecords(self, entityName, getOptions : GetOptions = None, prefetch: int = 2) :
+        """Async generator that yields every record matching getOptions, fetching up to prefetch pages ahead in a task. See API.IterRecords."""
+        getOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        if prefetch <= 0 :
+            while True :
+                page = await self.GetPage(entityName, getOptions)
+                for record in page : yield record
+                if len(page) < getOptions.PageSize : return
+                getOptions.PageNumber += 1
+
+        pages = asyncio.Queue(maxsize = prefetch)
+
+        async def fetch() :
+            pageOptions = copy.copy(getOptions)
+            while True :
+                try :
+                    page = await self.GetPage(entityName, pageOptions)
+                except Exception as exception :
+                    await pages.put(exception)
+                    return
+                await pages.put(page)
+                if len(page) < pageOptions.PageSize :
+                    await pages.put(None)
+                    return
+                pageOptions = copy.copy(pageOptions)
+                pageOptions.PageNumber += 1
+
+        worker = asyncio.create_task(fetch())
+        try :
+            while True :
+                page = await pages.get()
+                if page is None : return
+                if isinstance(page, Exception) : raise page
+                for record in page : yield record
+        finally :
+            worker.cancel()
+
+    async def IterRecordsByCode(self, entityName, getOptions : GetOptions = None, after: str = None) :
+        """Async generator that yields every record matching getOptions in [Code] order using keyset pagination. See API.IterRecordsByCode."""
+        getOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        filter = getOptions.Filter
+        getOptions.OrderBy = "[Code]"
+        getOptions.PageNumber = 1
+        if getOptions.Attributes and "Code" not in getOptions.Attributes : getOptions.Attributes = getOptions.Attributes + [ "Code" ] # The cursor
+        while True :
+            if after is not None :
+                getOptions.Filter = f"[Code] gt {GetOptions.Quote(after)}" + (f" and ({filter})" if filter != "" else "")
+            page = await self.GetPage(entityName, getOptions)
+            for record in page : yield record
+            if len(page) < getOptions.PageSize : return
+            after = Common.Get(page[-1], "Code")
+
+    async def CountRecords(self, entityName, getOptions : GetOptions = None) -> int :
+        """Returns the number of records matching the filter of getOptions using a CountsOnly query. See API.CountRecords."""
+        countOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        countOptions.CountsOnly = True
+        countOptions.PageNumber = 1
+        body = await self.GetRecords(entityName, countOptions)
+        if not self.LastResult.IsSuccessStatusCode() : raise APIError(self.LastResult)
+        return int(Common.Get(body, "totalRecords", 0))
+
+    async def IterRecordsParallel(self, entityName, getOptions : GetOptions = None, max_workers: int = 4, ordered: bool = True, check_consistency: bool = True) :
+        """Async generator that yields every record matching getOptions, fetching max_workers pages at once in tasks. See API.IterRecordsParallel."""
+        getOptions = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        if getOptions.OrderBy == "" : getOptions.OrderBy = "[Code]"
+        total = await self.CountRecords(entityName, getOptions)
+        pageCount = (total + getOptions.PageSize - 1) // getOptions.PageSize
+        window = 2 * max_workers
+        limit = asyncio.Semaphore(max_workers)
+        fetched = 0
+        codes = set()
+        duplicates = []
+
+        async def fetch(pageNumber: int) -> list[Dict[str, Any]] :
+            pageOptions = copy.copy(getOptions)
+            pageOptions.PageNumber = pageNumber
+            async with limit :
+                return await self.GetPage(entityName, pageOptions)
+
+        pending = collections.deque()
+        nextPage = 1
+        try :
+            while pending or nextPage <= pageCount :
+                while nextPage <= pageCount and len(pending) < window :
+                    pending.append(asyncio.ensure_future(fetch(nextPage)))
+                    nextPage += 1
+                if ordered :
+                    task = pending.popleft()
+                else :
+                    done, _ = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                    task = done.pop()
+                    pending.remove(task)
+                for record in await task :
+                    fetched += 1
+                    if check_consistency :
+                        code = Common.Get(record, "Code")
+                        if code in codes : duplicates.append(code)
+                        else : codes.add(code)
+                    yield record
+        finally :
+            for task in pending : task.cancel()
+
+        if check_consistency :
+            recount = await self.CountRecords(entityName, getOptions)
+            if recount != total or fetched != total or duplicates :
+                raise ConsistencyError(f"{entityName} changed during the scan: expected {total} records, fetched {fetched}, "
+                                       f"{recount} at the end and {len(duplicates)} returned twice", total, fetched, duplicates)
+
+    async def GetRecordsByCodes(self, entityName, codes: list[str], attributes: list[str] = None, max_url_length: int = 2000) -> Dict[str, Any] :
+        """Gets many records by Code, fetching the chunks of codes concurrently within max_concurrency. See API.GetRecordsByCodes."""
+        chunks = self.GetCodeFilters(entityName, codes, attributes, max_url_length)
+        pages = await asyncio.gather(*(self.GetPage(entityName, getOptions) for getOptions in chunks))
+        return API.CollectByCode(codes, pages)
+
+    async def MergeRecordsBulk(self, entityName, records, writer: BulkWriter = None) -> BulkReport :
+        """Merges a large list of records in adaptive chunks sent concurrently as tasks. See API.MergeRecordsBulk."""
+        return await (writer if writer is not None else BulkWriter(self)).MergeAsync(entityName, records)
+
+    async def DiffRecords(self, entityName, records, current: Dict[str, Any] = None, attributes: list[Dict[str, Any]] = None) -> RecordDiff :
+        """Compares records with the values already in the instance, fetching the current records and the attributes
+        concurrently. See API.DiffRecords."""
+        if current is None :
+            codes = [ code for record in records if (code := Common.Get(record, "Code")) is not None ]
+            names = list(dict.fromkeys(name for record in records for name in record if name.lower() != "code"))
+            current = {}
+            if codes :
+                reads = [ self.GetRecordsByCodes(entityName, codes, names) ]
+                if attributes is None : reads.append(self.GetAttributes(entityName))
+                current, *fetched = await asyncio.gather(*reads)
+                if fetched : attributes = fetched[0]
+        return RecordDiff.from_Records(records, current, attributes if isinstance(attributes, list) else None)
+
+    async def MergeChangedRecords(self, entityName, records, current: Dict[str, Any] = None, writer: BulkWriter = None, attributes: list[Dict[str, Any]] = None) -> RecordDiff :
+        """Merges only the records and fields that differ from the values already in the instance. See API.MergeChangedRecords."""
+        diff = await self.DiffRecords(entityName, records, current, attributes)
+        logging.getLogger().info(f"MergeChangedRecords {entityName}: {len(diff.Changes)} changed, {diff.Suppressed} unchanged records suppressed")
+        if diff.Changes : diff.Report = await self.MergeRecordsBulk(entityName, diff.Changes, writer)
+        return diff
+
+    @Common.LogFunction
+    async def DeleteRecordsBulk(self, entity_name: str, record_codes: list, max_workers: int = 4, max_url_length: int = 2000) -> BulkReport :
+        """Deletes the codes in URL-length chunks sent concurrently within max_concurrency, max_workers is not used. See API.DeleteRecordsBulk."""
+        report = BulkReport(record_codes)
+        if not record_codes : return report
+        started = time.perf_counter()
+        chunks = self.GetDeleteChunks(entity_name, record_codes, max_url_length)
+        results = await asyncio.gather(*(self.SendRequest(RequestOperation.Patch, url, endpoint = "DeleteRecords") for _, url in chunks))
+        for (indexes, _), result in zip(chunks, results) : API.RecordDeleteOutcomes(report, indexes, result)
+        report.Elapsed = time.perf_counter() - started
+        return report
@@ -0,0 +1,253 @@
+import asyncio, collections, collections.abc, concurrent.futures, contextlib, threading, time
+from typing import Any
+
+import requests
+
+from Profisee.Common import Common
+from Profisee.Restful.APIResult import APIResult
+from Profisee.Restful.Enums import RequestOperation
+
+class BulkReport :
+    """Outcome of a bulk write with one entry per record, or per code for deletes, in the order they were given."""
+    def __init__(self, records: list[Any]) -> None:
+        self.Records = records
+        self.Outcomes = [ None ] * len(records) # None when the record was written, otherwise the error reported for it
+        self.Requests = 0
+        self.Bisections = 0
+        self.ChunkSizes = []
+        self.Elapsed = 0.0
+
+    def __repr__(self) :
+        return f"BulkReport(Succeeded={self.Succeeded}, Failed={self.Failed}, Requests={self.Requests}, Bisections={self.Bisections}, Elapsed={self.Elapsed:.3f}s)"
+
+    @property
+    def Succeeded(self) -> int :
+        return sum(1 for outcome in self.Outcomes if outcome is None)
+
+    @property
+    def Failed(self) -> int :
+        return len(self.Outcomes) - self.Succeeded
+
+    @property
+    def Failures(self) -> list[tuple[Any, Any]] :
+        """Returns (record, error) for every record that was not written."""
+        return [ (record, outcome) for record, outcome in zip(self.Records, self.Outcomes) if outcome is not None ]
+
+class BulkWriter :
+    """Writes large record sets with MergeRecords in chunks that are sent concurrently.
+
+    Chunks are limited by record count and by encoded size. The record count adapts to the instance: it grows while
+    chunks succeed within target_latency and halves when a chunk is slow or fails (additive increase, multiplicative
+    decrease). A chunk that times out or is rejected with a status code that blames its payload is split in half and each
+    half resent until the records that cause the failure are isolated, so one bad record does not fail the rest. Merges
+    are upserts, so resending a half is safe.
+
+    Any other failure, ie a connection error, an open circuit or a 401, fails the records of its chunk without resending
+    them and the other chunks carry on. Records the codec cannot encode fail before anything is sent. Use MergeAsync with
+    an AsyncAPI.
+    """
+    # Status codes that blame the payload, where splitting the chunk can help. The others (401, 403, 404, 502, 503...) say
+    # nothing about the records and fail every record of the chunk.
+    BISECT_STATUS_CODES = (400, 408, 413, 422, 500, 504)
+    # Exceptions where a smaller chunk may get through in time. Connection errors are not split, halves would only fail
+    # again one connection attempt each.
+    TIMEOUT_ERRORS = (TimeoutError, asyncio.TimeoutError, requests.Timeout)
+
+    def __init__(self, api, max_workers: int = 4, chunk_size: int = 500, min_chunk_size: int = 10, max_chunk_size: int = 5000,
+                 max_chunk_bytes: int = 4_000_000, target_latency: float = 10.0, increase: int = None) -> None:
+        """Constructor for BulkWriter.
+
+        Args:
+            api (API): API to send the chunks through.
+            max_workers (int, optional): Chunks sent at once. Defaults to 4.
+            chunk_size (int, optional): Records in the first chunks. Defaults to 500.
+            min_chunk_size (int, optional): Smallest chunk the adaptation shrinks to. Defaults to 10.
+            max_chunk_size (int, optional): Largest chunk the adaptation grows to. Defaults to 5000.
+            max_chunk_bytes (int, optional): Largest encoded chunk. Defaults to 4,000,000.
+            target_latency (float, optional): Seconds a chunk may take before the chunk size is halved. Defaults to 10.0.
+            increase (int, optional): Records added to the chunk size after each fast success. Defaults to None, a tenth of chunk_size.
+        """
+        self.API = api
+        self.MaxWorkers = max_workers
+        self.ChunkSize = float(chunk_size)
+        self.MinChunkSize = min_chunk_size
+        self.MaxChunkSize = max_chunk_size
+        self.MaxChunkBytes = max_chunk_bytes
+        self.TargetLatency = target_latency
+        self.Increase = increase if increase is not None else max(1, chunk_size // 10)
+        self.Lock = threading.Lock()
+
+    def Merge(self, entityName: str, records: list[dict[str, Any]], sequential: bool = False) -> BulkReport :
+        """Merges the records into the entity.
+
+        Args:
+            entityName (string): Entity name.
+            records (list): Records to merge.
+            sequential (bool, optional): Send the chunks one at a time from the calling thread, without a thread pool. Used at
+                                         interpreter exit, when no new futures can be scheduled. Defaults to False.
+
+        Raises:
+            TypeError: The API is an AsyncAPI, use MergeAsync.
+
+        Returns:
+            BulkReport: per-record outcomes, requests, bisections and chunk sizes.
+        """
+        if asyncio.iscoroutinefunction(self.API.SendRequest) : raise TypeError("BulkWriter.Merge needs a synchronous API, await MergeAsync with an AsyncAPI")
+        started = time.perf_counter()
+        report = BulkReport(records)
+        sizes, order = self.Measure(report)
+        halves = collections.deque()
+        position = 0
+
+        workers = 1 if sequential else self.MaxWorkers
+        with contextlib.nullcontext() if sequential else concurrent.futures.ThreadPoolExecutor(self.MaxWorkers, thread_name_prefix = f"BulkWriter-{entityName}") as executor :
+            pending = set()
+            while position < len(order) or halves or pending :
+                while len(pending) < workers and (halves or position < len(order)) :
+                    if halves :
+                        indexes = halves.popleft()
+                    else :
+                        indexes = self.NextChunk(sizes, order, position)
+                        position += len(indexes)
+                    pending.add(executor.submit(self.Send, entityName, records, indexes) if executor is not None else BulkWriter.Completed(self.Send(entityName, records, indexes)))
+                done, pending = concurrent.futures.wait(pending, return_when = concurrent.futures.FIRST_COMPLETED)
+                for future in done : self.Complete(report, halves, *future.result())
+
+        report.Elapsed = time.perf_counter() - started
+        return report
+
+    async def MergeAsync(self, entityName: str, records: list[dict[str, Any]]) -> BulkReport :
+        """Merges the records into the entity through an AsyncAPI, max_workers chunks at once as tasks. See Merge."""
+        started = time.perf_counter()
+        report = BulkReport(records)
+        sizes, order = self.Measure(report)
+        halves = collections.deque()
+        position = 0
+        pending = set()
+        try :
+            while position < len(order) or halves or pending :
+                while len(pending) < self.MaxWorkers and (halves or position < len(order)) :
+                    if halves :
+                        indexes = halves.popleft()
+                    else :
+                        indexes = self.NextChunk(sizes, order, position)
+                        position += len(indexes)
+                    pending.add(asyncio.ensure_future(self.SendAsync(entityName, records, indexes)))
+                done, pending = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                for task in done : self.Complete(report, halves, *task.result())
+        finally :
+            for task in pending : task.cancel()
+        report.Elapsed = time.perf_counter() - started
+        return report
+
+    def Complete(self, report: BulkReport, halves: collections.deque, indexes: list[int], result: APIResult, exception: Exception, elapsed: float) -> None :
+        """Records the outcome of a chunk, adapts the chunk size and queues the halves of a chunk whose failure blames its
+        payload."""
+        report.Requests += 1
+        report.ChunkSizes.append(len(indexes))
+        self.Adjust(result is not None and result.IsSuccessStatusCode() and elapsed <= self.TargetLatency)
+        error = self.RecordOutcomes(report, indexes, result, exception)
+        if error is None : return
+        if len(indexes) > 1 and BulkWriter.IsSplittable(result, exception) :
+            middle = len(indexes) // 2
+            halves.extend([ indexes[:middle], indexes[middle:] ])
+            report.Bisections += 1
+        else : # A 2xx keeps the outcomes its errors named, the records they do not name may have been written and are not resent
+            for index in indexes :
+                if report.Outcomes[index] is None : report.Outcomes[index] = error
+
+    @staticmethod
+    def IsSplittable(result: APIResult, exception: Exception) -> bool :
+        """Returns True when resending the chunk in halves can isolate the records that made it fail."""
+        if result is None : return isinstance(exception, BulkWriter.TIMEOUT_ERRORS)
+        return result.StatusCode in BulkWriter.BISECT_STATUS_CODES
+
+    @staticmethod
+    def Completed(value: Any) -> concurrent.futures.Future :
+        """Returns a future already holding value, for chunks sent on the calling thread."""
+        future = concurrent.futures.Future()
+        future.set_result(value)
+        return future
+
+    def Measure(self, report: BulkReport) -> tuple[list[int], list[int]] :
+        """Returns (encoded size of each record, indexes of the records to send). A record the codec cannot encode gets the
+        exception as its outcome and is not sent, so it cannot fail the chunk it would be in."""
+        sizes = [ None ] * len(report.Records)
+        order = []
+        for index, record in enumerate(report.Records) :
+            try :
+                sizes[index] = len(self.API.Codec.Encode(record)) + 1
+                order.append(index)
+            except Exception as exception :
+                report.Outcomes[index] = str(exception)
+        return (sizes, order)
+
+    def NextChunk(self, sizes: list[int], order: list[int], position: int) -> list[int] :
+        """Returns the indexes of the next chunk from order, limited by the current chunk size and max_chunk_bytes."""
+        with self.Lock :
+            count = int(self.ChunkSize)
+        end = position
+        used = 0
+        while end < len(order) and end - position < count and (end == position or used + sizes[order[end]] <= self.MaxChunkBytes) :
+            used += sizes[order[end]]
+            end += 1
+        return order[position:end]
+
+    def Adjust(self, healthy: bool) -> None :
+        with self.Lock :
+            if healthy : self.ChunkSize = min(self.MaxChunkSize, self.ChunkSize + self.Increase)
+            else : self.ChunkSize = max(self.MinChunkSize, self.ChunkSize / 2)
+
+    def Send(self, entityName: str, records: list[dict[str, Any]], indexes: list[int]) -> tuple :
+        started = time.perf_counter()
+        try :
+            result = self.API.SendRequest(RequestOperation.Patch, f"rest/v1/Records/{entityName}", [ records[index] for index in indexes ], endpoint = "MergeRecords")
+            return (indexes, result, None, time.perf_counter() - started)
+        except Exception as exception : # Connection errors, timeouts, CircuitOpenError...
+            return (indexes, None, exception, time.perf_counter() - started)
+
+    async def SendAsync(self, entityName: str, records: list[dict[str, Any]], indexes: list[int]) -> tuple :
+        started = time.perf_counter()
+        try :
+            result = await self.API.SendRequest(RequestOperation.Patch, f"rest/v1/Records/{entityName}", [ records[index] for index in indexes ], endpoint = "MergeRecords")
+            return (indexes, result, None, time.perf_counter() - started)
+        except Exception as exception :
+            return (indexes, None, exception, time.perf_counter() - started)
+
+    @staticmethod
+    def RecordOutcomes(report: BulkReport, indexes: list[int], result: APIResult, exception: Exception = None) -> Any :
+        """Sets the outcomes of the records in a chunk from the errors of the response.
+
+        Returns:
+            Any: None when every record has its outcome, otherwise the error for the records that are still undecided.
+        """
+        if result is None : return str(exception)
+        if not result.IsSuccessStatusCode() : return result.Data
+        errors = result.Errors
+        if not errors : return None
+        if isinstance(errors, dict) : errors = [ errors ]
+        if len(indexes) == 1 :
+            report.Outcomes[indexes[0]] = errors if len(errors) > 1 else errors[0]
+            return None
+
+        byCode = {}
+        for index in indexes :
+            record = report.Records[index]
+            code = Common.Get(record, "Code") if isinstance(record, collections.abc.Mapping) else record # Records or, for deletes, codes
+            byCode.setdefault(str(code).lower(), []).append(index)
+        unattributed = []
+        for error in errors :
+            code = BulkWriter.GetErrorCode(error)
+            if code is not None and str(code).lower() in byCode :
+                for index in byCode[str(code).lower()] : report.Outcomes[index] = error
+            else :
+                unattributed.append(error)
+        return unattributed if unattributed else None
+
+    @staticmethod
+    def GetErrorCode(error: Any) -> Any :
+        """Returns the record code an entry of the response errors refers to, if it names one."""
+        if not isinstance(error, dict) : return None
+        for key in ("Code", "RecordCode", "MemberCode") :
+            if (code := Common.Get(error, key)) is not None : return code
+        return None
@@ -0,0 +1,61 @@
+import json
+from typing import Any
+
+from Profisee.Common import CaseInsensitiveDict
+
+class JsonCodec :
+    """Encodes request bodies and decodes response bodies.
+
+    Uses orjson or msgspec when one is installed and falls back to the standard library json module otherwise. With
+    case_insensitive, decoded dictionaries are CaseInsensitiveDict, so Common.Get and Common.Set find keys written in any
+    case without scanning them, at the cost of building the index while decoding.
+    """
+    NAMES = ("orjson", "msgspec", "json")
+
+    def __init__(self, name: str = None, case_insensitive: bool = False) -> None:
+        """Constructor for JsonCodec.
+
+        Args:
+            name (string, optional): Codec to use, one of orjson, msgspec or json. Defaults to None, the fastest one installed.
+            case_insensitive (bool, optional): Decode dictionaries into CaseInsensitiveDict. Defaults to False.
+
+        Raises:
+            ImportError: The named codec is not installed.
+        """
+        self.CaseInsensitive = case_insensitive
+        for candidate in ([ name ] if name is not None else JsonCodec.NAMES) :
+            try :
+                self.Encode, decode = JsonCodec.Load(candidate)
+                self.Decode = (lambda content : CaseInsensitiveDict.from_Json(decode(content))) if case_insensitive else decode
+                self.Name = candidate
+                return
+            except ImportError :
+                if name is not None : raise
+
+    def __repr__(self) :
+        return f"JsonCodec({self.Name}{', case_insensitive' if self.CaseInsensitive else ''})"
+
+    @staticmethod
+    def Default(value: Any) -> Any :
+        """Encodes the values the codecs do not know: objects with a ToPayload method, ie CompactRecord, are sent as its result."""
+        if hasattr(value, "ToPayload") : return value.ToPayload()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    @staticmethod
+    def Load(name: str) -> tuple :
+        """Returns the (encode, decode) functions for a codec. encode returns bytes and decode accepts bytes or str."""
+        match name :
+            case "orjson" :
+                import orjson
+                return (lambda value : orjson.dumps(value, default = JsonCodec.Default, option = orjson.OPT_NON_STR_KEYS), orjson.loads)
+            case "msgspec" :
+                import msgspec
+                encoder = msgspec.json.Encoder(enc_hook = JsonCodec.Default)
+                decoder = msgspec.json.Decoder()
+                return (encoder.encode, decoder.decode)
+            case "json" :
+                return (lambda value : json.dumps(value, default = JsonCodec.Default).encode("utf-8"), json.loads)
+            case _ :
+                raise ValueError(f"Unknown codec: {name}")
+
+default_codec = JsonCodec()
@@ -0,0 +1,163 @@
+import collections.abc, copy, threading
+from typing import Any, Iterable
+
+from Profisee.Common import Common
+from Profisee.Restful.Record import Record
+
+class RecordSchema :
+    """Attribute names of an entity, each with the slot its value has in the CompactRecords of that entity.
+
+    One schema is shared by every record of the entity, so the names are held once instead of once per record. Names met in
+    a record that the schema does not have yet are added at the end, records packed before keep their shorter rows.
+
+    With intern_limit set, equal strings of an attribute (domain codes, states, timestamps of a bulk load...) are held once
+    for all records. An attribute stops being interned once it has more than intern_limit distinct values.
+    """
+    def __init__(self, names: Iterable[str] = (), excluded: Iterable[str] = Record.EXCLUDED_ATTRIBUTES, intern_limit: int = 0) -> None:
+        """Constructor for RecordSchema.
+
+        Args:
+            names (list, optional): Attribute names in slot order. Defaults to (), names are added as records are packed.
+            excluded (list, optional): Attributes left out of ToPayload. Defaults to Record.EXCLUDED_ATTRIBUTES.
+            intern_limit (int, optional): Most distinct strings interned per attribute, 0 to not intern. Defaults to 0.
+        """
+        self.Names = [] # slot -> name
+        self.Index = {} # lower-case name -> slot
+        self.Excluded = frozenset(name.lower() for name in excluded)
+        self.InternLimit = intern_limit
+        self.Interned = [] # slot -> { string : string }, None once the attribute has too many distinct values
+        self.Layouts = {} # tuple of record keys -> (slot of each key, keys in slot order), records of one entity have a few layouts
+        self.Lock = threading.Lock()
+        for name in names : self.GetSlot(name, add = True)
+
+    def __repr__(self) :
+        return f"RecordSchema(Names={len(self.Names)})"
+
+    def __len__(self) :
+        return len(self.Names)
+
+    @classmethod
+    def from_Attributes(cls, attributes: list[dict[str, Any]], excluded: Iterable[str] = Record.EXCLUDED_ATTRIBUTES) :
+        """Creates the schema from the response of GetAttributes, Code and Name first."""
+        names = Common.ExtractColumns(attributes, [ "Identifier.Name" ], as_arrays = False)["Identifier.Name"]
+        return cls([ "Code", "Name" ] + [ name for name in names if name is not None ], excluded)
+
+    @classmethod
+    def from_Entity(cls, api, entityName: str, excluded: Iterable[str] = Record.EXCLUDED_ATTRIBUTES) :
+        """Creates the schema of an entity from its attributes in the instance."""
+        return cls.from_Attributes(api.GetAttributes(entityName), excluded)
+
+    def GetSlot(self, name: str, add: bool = False) -> int :
+        """Returns the slot of a name, matched ignoring case, adding it when add is set. None when it is missing."""
+        slot = self.Index.get(name.lower())
+        if slot is None and add :
+            with self.Lock :
+                slot = self.Index.get(name.lower())
+                if slot is None :
+                    slot = len(self.Names)
+                    self.Names.append(name)
+                    self.Index[name.lower()] = slot
+        return slot
+
+    def Pack(self, record: dict[str, Any]) :
+        """Returns the record as a CompactRecord of this schema."""
+        keys = tuple(record)
+        layout = self.Layouts.get(keys)
+        if layout is None :
+            slots = [ self.GetSlot(name, add = True) for name in keys ]
+            layout = (slots, slots == list(range(len(slots))))
+            if len(self.Layouts) < 1024 : self.Layouts[keys] = layout
+        slots, inOrder = layout
+        if inOrder and not self.InternLimit : return CompactRecord(self, tuple(record.values())) # Keys in slot order, the values are the row
+        if inOrder :
+            values = list(record.values())
+        else :
+            values = [ CompactRecord.MISSING ] * (max(slots) + 1 if slots else 0)
+            for slot, value in zip(slots, record.values()) : values[slot] = value
+        if self.InternLimit : self.Intern(values)
+        return CompactRecord(self, tuple(values))
+
+    def Intern(self, values: list) -> None :
+        """Replaces the strings of a row by the equal strings already held for their attribute."""
+        tables = self.Interned
+        if len(tables) < len(values) : tables.extend({} for _ in range(len(values) - len(tables)))
+        for slot, value in enumerate(values) :
+            if type(value) is not str or (table := tables[slot]) is None : continue
+            interned = table.get(value)
+            if interned is not None :
+                values[slot] = interned
+            elif len(table) < self.InternLimit :
+                table[value] = value
+            else :
+                tables[slot] = None # Mostly distinct values, interning would only cost memory
+
+    def PackAll(self, records: Iterable[dict[str, Any]]) -> list :
+        """Returns the records, ie a page of GetRecords, as CompactRecords."""
+        return [ self.Pack(record) for record in records ]
+
+class CompactRecord(collections.abc.MutableMapping) :
+    """Record held as a tuple of values with its attribute names in a shared RecordSchema.
+
+    Takes a fraction of the memory of a dictionary and can be used where one is read: keys are matched ignoring case, so
+    Common.Get and Common.Set look them up directly. The codecs encode it with ToPayload, so lists of CompactRecords can be
+    passed to MergeRecords as they are.
+    """
+    __slots__ = ("Schema", "Values")
+    MISSING = object() # Value of the slots whose attribute the record does not have
+
+    def __init__(self, schema: RecordSchema, values: tuple = ()) -> None:
+        self.Schema = schema
+        self.Values = values
+
+    def __repr__(self) :
+        return f"CompactRecord({self.ToDict()})"
+
+    def GetSlot(self, name) -> int :
+        """Returns the slot of name when the record has a value for it, otherwise None."""
+        slot = self.Schema.Index.get(name.lower()) if isinstance(name, str) else None
+        if slot is None or slot >= len(self.Values) or self.Values[slot] is CompactRecord.MISSING : return None
+        return slot
+
+    def __getitem__(self, name) -> Any :
+        slot = self.GetSlot(name)
+        if slot is None : raise KeyError(name)
+        return self.Values[slot]
+
+    def __contains__(self, name) -> bool :
+        return self.GetSlot(name) is not None
+
+    def __setitem__(self, name, value) -> None :
+        slot = self.Schema.GetSlot(name, add = True)
+        values = list(self.Values)
+        if slot >= len(values) : values.extend([ CompactRecord.MISSING ] * (slot + 1 - len(values)))
+        values[slot] = value
+        self.Values = tuple(values)
+
+    def __delitem__(self, name) -> None :
+        slot = self.GetSlot(name)
+        if slot is None : raise KeyError(name)
+        self.Values = self.Values[:slot] + (CompactRecord.MISSING,) + self.Values[slot + 1:]
+
+    def __iter__(self) :
+        names = self.Schema.Names
+        return (names[slot] for slot, value in enumerate(self.Values) if value is not CompactRecord.MISSING)
+
+    def __len__(self) :
+        return sum(1 for value in self.Values if value is not CompactRecord.MISSING)
+
+    def __copy__(self) :
+        return CompactRecord(self.Schema, self.Values)
+
+    def __deepcopy__(self, memo) :
+        return CompactRecord(self.Schema, copy.deepcopy(self.Values, memo)) # The schema stays shared
+
+    def ToDict(self) -> dict[str, Any] :
+        """Returns every attribute of the record as a dictionary."""
+        names = self.Schema.Names
+        return { names[slot] : value for slot, value in enumerate(self.Values) if value is not CompactRecord.MISSING }
+
+    def ToPayload(self) -> dict[str, Any] :
+        """Returns the record as a dictionary to merge, without the Record.EXCLUDED_ATTRIBUTES the instance maintains."""
+        names = self.Schema.Names
+        excluded = self.Schema.Excluded
+        return { names[slot] : value for slot, value in enumerate(self.Values) if value is not CompactRecord.MISSING and names[slot].lower() not in excluded }
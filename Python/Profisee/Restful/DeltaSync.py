@@ -0,0 +1,214 @@
+import copy, datetime, sqlite3, threading, time
+from typing import Any, Callable
+
+from Profisee.Common import Common
+from Profisee.Restful.GetOptions import GetOptions
+from Profisee.Restful.RecordDiff import RecordDiff
+
+class Watermark :
+    """Newest change seen for an entity: its LastChgDTM and, to order changes made at the same time, its transaction ID."""
+    def __init__(self, last_changed: datetime.datetime, transaction_id: int = None) -> None:
+        self.LastChanged = last_changed
+        self.TransactionID = transaction_id
+
+    def __repr__(self) :
+        return f"Watermark(LastChanged={self.LastChanged.isoformat()}, TransactionID={self.TransactionID})"
+
+    def __eq__(self, other) :
+        return isinstance(other, Watermark) and (self.LastChanged, self.TransactionID) == (other.LastChanged, other.TransactionID)
+
+    def IsAfter(self, other) -> bool :
+        if other is None : return True
+        if self.LastChanged != other.LastChanged : return self.LastChanged > other.LastChanged
+        return (self.TransactionID or 0) > (other.TransactionID or 0)
+
+class SyncState :
+    """SQLite file holding the watermark of each synced entity and the changes already delivered inside its overlap window."""
+    def __init__(self, path: str = ":memory:") -> None:
+        """Constructor for SyncState.
+
+        Args:
+            path (string, optional): SQLite database file, created when missing. Defaults to ":memory:", state kept by this process only.
+        """
+        self.Path = path
+        self.Connection = sqlite3.connect(path, check_same_thread = False)
+        self.Lock = threading.Lock()
+        with self.Lock, self.Connection :
+            self.Connection.execute("CREATE TABLE IF NOT EXISTS Watermarks (Entity TEXT PRIMARY KEY, LastChanged TEXT NOT NULL, TransactionID INTEGER, SyncedAt TEXT NOT NULL)")
+            self.Connection.execute("CREATE TABLE IF NOT EXISTS Delivered (Entity TEXT NOT NULL, Code TEXT NOT NULL, TransactionID TEXT NOT NULL, LastChanged TEXT NOT NULL, PRIMARY KEY (Entity, Code, TransactionID))")
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.Close()
+
+    def Close(self) -> None :
+        self.Connection.close()
+
+    def GetWatermark(self, entityName: str) -> Watermark :
+        """Returns the watermark of the entity, or None if it was never synced."""
+        with self.Lock :
+            row = self.Connection.execute("SELECT LastChanged, TransactionID FROM Watermarks WHERE Entity = ?", (entityName.lower(),)).fetchone()
+        return Watermark(datetime.datetime.fromisoformat(row[0]), row[1]) if row is not None else None
+
+    def GetDelivered(self, entityName: str) -> set[tuple[str, str]] :
+        """Returns (code, transaction ID) of the changes delivered inside the overlap window of the last sync."""
+        with self.Lock :
+            rows = self.Connection.execute("SELECT Code, TransactionID FROM Delivered WHERE Entity = ?", (entityName.lower(),)).fetchall()
+        return { (code, transaction_id) for code, transaction_id in rows }
+
+    def Save(self, entityName: str, watermark: Watermark, delivered: dict[tuple[str, str], datetime.datetime], overlap: float) -> None :
+        """Stores the new watermark and the delivered changes that fall inside its overlap window, in one transaction."""
+        entity = entityName.lower()
+        window = (watermark.LastChanged - datetime.timedelta(seconds = overlap)).isoformat(timespec = "microseconds")
+        with self.Lock, self.Connection :
+            self.Connection.execute("INSERT OR REPLACE INTO Watermarks VALUES (?, ?, ?, ?)", (entity, watermark.LastChanged.isoformat(timespec = "microseconds"), watermark.TransactionID, datetime.datetime.now(datetime.timezone.utc).isoformat(timespec = "microseconds")))
+            self.Connection.executemany("INSERT OR REPLACE INTO Delivered VALUES (?, ?, ?, ?)", [ (entity, code, transaction_id, changed.isoformat(timespec = "microseconds")) for (code, transaction_id), changed in delivered.items() ])
+            self.Connection.execute("DELETE FROM Delivered WHERE Entity = ? AND LastChanged < ?", (entity, window))
+
+    def Reset(self, entityName: str) -> None :
+        """Forgets the entity so its next sync is a full extract."""
+        with self.Lock, self.Connection :
+            self.Connection.execute("DELETE FROM Watermarks WHERE Entity = ?", (entityName.lower(),))
+            self.Connection.execute("DELETE FROM Delivered WHERE Entity = ?", (entityName.lower(),))
+
+class SyncReport :
+    """Outcome of one DeltaSync.Sync."""
+    def __init__(self, entity_name: str, since: datetime.datetime) -> None:
+        self.EntityName = entity_name
+        self.Since = since # None for a full extract
+        self.Pages = 0
+        self.Fetched = 0
+        self.Delivered = 0
+        self.Duplicates = 0
+        self.Watermark = None
+        self.Elapsed = 0.0
+
+    def __repr__(self) :
+        return f"SyncReport(EntityName={self.EntityName}, Delivered={self.Delivered}, Duplicates={self.Duplicates}, Pages={self.Pages}, Watermark={self.Watermark}, Elapsed={self.Elapsed:.3f}s)"
+
+class DeltaSync :
+    """Incremental extract of the records changed since the last sync of each entity.
+
+    The first sync of an entity reads every record, the next ones only ask for records whose LastChgDTM is at or after the
+    stored watermark minus overlap seconds, so changes committed late or stamped by a skewed clock are still picked up.
+    Changes already delivered are recognised by Code and $LastChgDataTransactionID and skipped. Pages are walked by
+    LastChgDTM instead of page number, so records changing during the walk cannot shift others out of it. Deleted records
+    are not reported, they have no LastChgDTM left to find them by.
+    """
+    CHANGED_ATTRIBUTE = "LastChgDTM"
+    TRANSACTION_ATTRIBUTE = "$LastChgDataTransactionID"
+    FILTER_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+    def __init__(self, api, state: SyncState, overlap: float = 300.0, page_size: int = 1000) -> None:
+        """Constructor for DeltaSync.
+
+        Args:
+            api (API): API to read the records through.
+            state (SyncState): Where the watermarks are kept.
+            overlap (float, optional): Seconds before the watermark that are read again. Defaults to 300.0.
+            page_size (int, optional): Records per request. Defaults to 1000.
+        """
+        self.API = api
+        self.State = state
+        self.Overlap = overlap
+        self.PageSize = page_size
+
+    @classmethod
+    def from_Settings(cls, api, settings: dict[str, Any]) :
+        """Creates the DeltaSync from the DeltaSync section of settings.json, or returns None if there is none."""
+        section = Common.Get(settings, "DeltaSync")
+        if not section : return None
+        return cls(api, SyncState(Common.Get(section, "StateFile", "delta_sync.db")), Common.Get(section, "Overlap", 300.0), Common.Get(section, "PageSize", 1000))
+
+    def Sync(self, entityName: str, handler: Callable[[list[dict[str, Any]]], None], getOptions: GetOptions = None, full: bool = False) -> SyncReport :
+        """Passes the records changed since the last sync to handler, a page at a time, then moves the watermark.
+
+        The watermark is only saved once handler has returned for every page, so a sync that fails part way is read again
+        from the old watermark by the next one.
+
+        Args:
+            entityName (string): Entity name.
+            handler (function): Called with each page of changed records, duplicates removed.
+            getOptions (GetOptions, optional): Filter and attributes to apply. Order and paging are set by the sync. Defaults to None.
+            full (bool, optional): Read every record instead of the changes, then move the watermark. Defaults to False.
+
+        Raises:
+            APIError: The instance returned an error status code for a page.
+
+        Returns:
+            SyncReport: counts, the window read and the new watermark.
+        """
+        started = time.perf_counter()
+        watermark = None if full else self.State.GetWatermark(entityName)
+        since = watermark.LastChanged - datetime.timedelta(seconds = self.Overlap) if watermark is not None else None
+        report = SyncReport(entityName, since)
+        already = self.State.GetDelivered(entityName) if watermark is not None else set()
+        delivered = {}
+        newest = watermark
+
+        options = copy.copy(getOptions) if getOptions is not None else GetOptions()
+        userFilter = options.Filter
+        options.OrderBy = f"[{DeltaSync.CHANGED_ATTRIBUTE}], [Code]" # Code breaks ties, so pages inside a tie neither skip nor repeat rows
+        options.PageSize = self.PageSize
+        if options.Attributes :
+            options.Attributes = options.Attributes + [ name for name in ("Code", DeltaSync.CHANGED_ATTRIBUTE, DeltaSync.TRANSACTION_ATTRIBUTE) if name not in options.Attributes ]
+        key = DeltaSync.FilterDate(since) if since is not None else None
+        pageNumber = 1
+
+        while True :
+            conditions = [ f"({userFilter})" ] if userFilter else []
+            if key is not None : conditions.append(f"[{DeltaSync.CHANGED_ATTRIBUTE}] ge {key}")
+            options.Filter = " and ".join(conditions)
+            options.PageNumber = pageNumber
+            page = self.API.GetPage(entityName, options)
+            report.Pages += 1
+            report.Fetched += len(page)
+
+            changes = []
+            for record in page :
+                changed = DeltaSync.GetChanged(record)
+                transactionId = Common.Get(record, DeltaSync.TRANSACTION_ATTRIBUTE)
+                identity = (str(Common.Get(record, "Code")).lower(), str(transactionId))
+                if identity in already or identity in delivered :
+                    report.Duplicates += 1
+                    continue
+                changes.append(record)
+                if changed is None : continue
+                delivered[identity] = changed
+                mark = Watermark(changed, transactionId)
+                if mark.IsAfter(newest) : newest = mark
+            if changes :
+                handler(changes)
+                report.Delivered += len(changes)
+            if len(page) < options.PageSize : break
+
+            # The next page starts at the last LastChgDTM read, unless the whole page shares it, then it goes one page deeper.
+            last = DeltaSync.GetChanged(page[-1])
+            lastKey = DeltaSync.FilterDate(last) if last is not None else None
+            if lastKey is None or lastKey == key :
+                pageNumber += 1
+            else :
+                key = lastKey
+                pageNumber = 1
+
+        if newest is not None and newest is not watermark :
+            self.State.Save(entityName, newest, delivered, self.Overlap)
+        report.Watermark = newest
+        report.Elapsed = time.perf_counter() - started
+        return report
+
+    @staticmethod
+    def FilterDate(value: datetime.datetime) -> str :
+        """Returns a datetime as a quoted UTC literal for a filter, ie '2025-06-15T10:00:00.000Z'. Aware values are converted
+        to UTC first, naive ones are taken as UTC."""
+        if value.tzinfo is not None : value = value.astimezone(datetime.timezone.utc)
+        return GetOptions.Quote(value.strftime(DeltaSync.FILTER_DATE_FORMAT)[:-3] + "Z")
+
+    @staticmethod
+    def GetChanged(record: dict[str, Any]) -> datetime.datetime :
+        """Returns the LastChgDTM of a record as an aware datetime in the offset it was written with, UTC when it has none,
+        or None if it has none."""
+        value = Common.Get(record, DeltaSync.CHANGED_ATTRIBUTE)
+        return RecordDiff.ParseDate(value) if isinstance(value, str) else None
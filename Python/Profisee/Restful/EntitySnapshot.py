@@ -0,0 +1,369 @@
+import bisect, contextlib, datetime, json, os, struct, threading, time
+from typing import Any, Iterable
+
+import numpy
+
+from Profisee.Common import Common
+from Profisee.Restful.DeltaSync import DeltaSync, Watermark
+from Profisee.Restful.Enums import AttributeDataType
+from Profisee.Restful.GetOptions import GetOptions
+from Profisee.Restful.RecordBatch import Column, RecordBatch
+
+class StringTable :
+    """Strings stored as one UTF-8 buffer and the offset where each starts, read one at a time without decoding the others.
+
+    Supports len and indexing, so bisect can binary search a sorted table held in a memory-mapped file.
+    """
+    def __init__(self, offsets: numpy.ndarray, data: numpy.ndarray) -> None:
+        self.Offsets = offsets # int64, one more than the number of strings
+        self.Data = data # uint8
+        self.OffsetView = memoryview(offsets) # Indexed without creating NumPy scalars, for the binary search
+        self.DataView = memoryview(data)
+
+    def __len__(self) :
+        return len(self.Offsets) - 1
+
+    def __getitem__(self, index: int) -> str :
+        return str(self.DataView[self.OffsetView[index]:self.OffsetView[index + 1]], "utf-8")
+
+    @staticmethod
+    def Encode(strings: Iterable[str]) -> tuple[numpy.ndarray, numpy.ndarray] :
+        """Returns (offsets, data) of the strings."""
+        encoded = [ string.encode("utf-8") for string in strings ]
+        offsets = numpy.zeros(len(encoded) + 1, dtype = numpy.int64)
+        numpy.cumsum(numpy.fromiter(map(len, encoded), dtype = numpy.int64, count = len(encoded)), out = offsets[1:])
+        return (offsets, numpy.frombuffer(b"".join(encoded), dtype = numpy.uint8))
+
+    def ToArray(self) -> numpy.ndarray :
+        """Returns every string as an object array."""
+        text = self.Data.tobytes()
+        offsets = self.Offsets.tolist()
+        return numpy.array([ text[start:stop].decode("utf-8") for start, stop in zip(offsets, offsets[1:]) ] + [ None ], dtype = object)[:-1]
+
+class SnapshotWriter :
+    """Writes a RecordBatch to a snapshot file that EntitySnapshot memory-maps.
+
+    Layout: MAGIC, the offset and length of a JSON header, then every array 64-byte aligned, then the header. The header
+    holds the entity's GetAttributes response, the watermark, and the offset, length and dtype of each array. Each column
+    has its values and null mask, Text columns their categories as a StringTable, and the Code column an index of the
+    lower-case codes in sorted order with the row of each.
+    """
+    MAGIC = b"PRFSNAP1"
+    VERSION = 1
+    ALIGNMENT = 64
+    PRELUDE = struct.Struct("<8sQQ")
+    REPLACE_RETRIES = 5
+    REPLACE_BACKOFF = 0.05 # Seconds, doubled on every retry
+
+    @staticmethod
+    def Write(path: str, batch: RecordBatch, attributes: list[dict[str, Any]] = None, watermark: Watermark = None, entity_name: str = None) -> str :
+        """Writes the snapshot, replacing the file at path in one step so readers never see part of it.
+
+        On POSIX, readers that have the previous file open keep reading it until they open the path again. Windows does not
+        let a file that is open be replaced: the replace is retried for about a second, then PermissionError is raised, so
+        close the EntitySnapshot objects on the path before writing it. The temporary file is removed when the write fails.
+
+        Args:
+            path (string): Snapshot file.
+            batch (RecordBatch): Records of the entity.
+            attributes (list, optional): GetAttributes response of the entity, the schema readers get back. Defaults to None.
+            watermark (Watermark, optional): Newest change in the records. Defaults to None, taken from the LastChgDTM and
+                                             $LastChgDataTransactionID columns when the batch has them.
+            entity_name (string, optional): Entity name. Defaults to None.
+
+        Raises:
+            ValueError: The batch has codes that are null or repeated ignoring case.
+            PermissionError: Windows, the path is still open in another process.
+
+        Returns:
+            string: path.
+        """
+        if watermark is None : watermark = SnapshotWriter.GetWatermark(batch)
+        # Unique per process and thread, so concurrent writers of the same path never share a temporary file.
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try :
+            with open(temporary, "wb") as file : SnapshotWriter.WriteContent(file, batch, attributes, watermark, entity_name)
+            SnapshotWriter.Replace(temporary, path)
+        except BaseException :
+            with contextlib.suppress(OSError) : os.remove(temporary)
+            raise
+        return path
+
+    @staticmethod
+    def WriteContent(file, batch: RecordBatch, attributes: list[dict[str, Any]], watermark: Watermark, entity_name: str) -> None :
+        """Writes the prelude, the aligned column arrays and the JSON header of the snapshot to a binary file."""
+        sections = []
+        file.write(SnapshotWriter.PRELUDE.pack(SnapshotWriter.MAGIC, 0, 0))
+
+        def write(array: numpy.ndarray) -> dict[str, Any] :
+            position = file.tell()
+            padding = -position % SnapshotWriter.ALIGNMENT
+            file.write(b"\0" * padding)
+            array = numpy.ascontiguousarray(array)
+            file.write(array.tobytes())
+            return { "Offset" : position + padding, "Count" : len(array), "DType" : array.dtype.str }
+
+        for column in batch.Columns.values() :
+            section = { "Name" : column.Name, "DataType" : column.DataType.value, "Values" : write(column.Values), "Mask" : write(column.Mask) }
+            if column.Categories is not None :
+                offsets, data = StringTable.Encode(column.Categories)
+                section["Categories"] = { "Offsets" : write(offsets), "Data" : write(data) }
+            sections.append(section)
+
+        header = {
+            "Version" : SnapshotWriter.VERSION,
+            "Entity" : entity_name,
+            "Created" : datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "Length" : batch.Length,
+            "Watermark" : { "LastChanged" : watermark.LastChanged.isoformat(), "TransactionID" : watermark.TransactionID } if watermark is not None else None,
+            "Attributes" : attributes or [],
+            "Columns" : sections
+        }
+        if "Code" in batch :
+            keys, rows = SnapshotWriter.BuildCodeIndex(batch["Code"])
+            offsets, data = StringTable.Encode(keys)
+            header["CodeIndex"] = { "Offsets" : write(offsets), "Data" : write(data), "Rows" : write(rows) }
+
+        content = json.dumps(header, default = str).encode("utf-8")
+        position = file.tell()
+        file.write(content)
+        file.seek(0)
+        file.write(SnapshotWriter.PRELUDE.pack(SnapshotWriter.MAGIC, position, len(content)))
+
+    @staticmethod
+    def Replace(temporary: str, path: str) -> None :
+        """Moves the temporary file over path. Windows refuses to replace a file another process has open, ie mapped by an
+        EntitySnapshot, so PermissionError is retried with a short backoff before it is raised."""
+        for attempt in range(SnapshotWriter.REPLACE_RETRIES) :
+            try :
+                os.replace(temporary, path)
+                return
+            except PermissionError :
+                if attempt == SnapshotWriter.REPLACE_RETRIES - 1 : raise
+                time.sleep(SnapshotWriter.REPLACE_BACKOFF * (2 ** attempt))
+
+    @staticmethod
+    def BuildCodeIndex(column: Column) -> tuple[list[str], numpy.ndarray] :
+        """Returns (lower-case codes in sorted order, row of each) for the Code column.
+
+        Raises:
+            ValueError: A code is null or repeated ignoring case.
+        """
+        if column.Mask.any() : raise ValueError(f"{int(column.Mask.sum())} records have no Code")
+        strings = column.Strings() if column.Categories is not None else column.Values.astype(str).astype(object)
+        keys = [ str(code).lower() for code in strings ]
+        rows = numpy.array(sorted(range(len(keys)), key = keys.__getitem__), dtype = numpy.int64)
+        keys = [ keys[row] for row in rows ]
+        repeated = [ key for key, previous in zip(keys[1:], keys) if key == previous ]
+        if repeated : raise ValueError(f"Codes repeated ignoring case: {', '.join(repeated[:10])}")
+        return (keys, rows)
+
+    @staticmethod
+    def GetWatermark(batch: RecordBatch) -> Watermark :
+        """Returns the newest LastChgDTM in the batch with the highest transaction ID at that time, or None."""
+        if DeltaSync.CHANGED_ATTRIBUTE not in batch : return None
+        changed = batch[DeltaSync.CHANGED_ATTRIBUTE]
+        if changed.Values.dtype.kind != "M" or changed.Mask.all() : return None
+        newest = changed.Values[~changed.Mask].max()
+        transactionId = None
+        if DeltaSync.TRANSACTION_ATTRIBUTE in batch :
+            transactions = batch[DeltaSync.TRANSACTION_ATTRIBUTE]
+            if transactions.Values.dtype.kind == "f" :
+                rows = (changed.Values == newest) & ~changed.Mask & ~transactions.Mask
+                if rows.any() : transactionId = int(transactions.Values[rows].max())
+        lastChanged = newest.astype("datetime64[ms]").item()
+        if not isinstance(lastChanged, datetime.datetime) : lastChanged = datetime.datetime.combine(lastChanged, datetime.time())
+        return Watermark(lastChanged.replace(tzinfo = datetime.timezone.utc), transactionId)
+
+class EntitySnapshot :
+    """Reads a snapshot file written by SnapshotWriter through a read-only memory map.
+
+    Opening only reads the header, the arrays are views on the map and are paged in as they are used, and processes that
+    open the same file share those pages. Get finds a record by Code with a binary search of the code index, O(log n),
+    reading only that record's values.
+    """
+    def __init__(self, path: str) -> None:
+        """Constructor for EntitySnapshot.
+
+        Args:
+            path (string): Snapshot file written by SnapshotWriter.Write.
+
+        Raises:
+            ValueError: The file is not a snapshot or has another version.
+        """
+        self.Path = path
+        self.Buffer = numpy.memmap(path, dtype = numpy.uint8, mode = "r")
+        magic, position, length = SnapshotWriter.PRELUDE.unpack(self.Buffer[:SnapshotWriter.PRELUDE.size].tobytes())
+        if magic != SnapshotWriter.MAGIC : raise ValueError(f"{path} is not an entity snapshot")
+        self.Header = json.loads(self.Buffer[position:position + length].tobytes())
+        if self.Header["Version"] != SnapshotWriter.VERSION : raise ValueError(f"{path} has snapshot version {self.Header['Version']}, expected {SnapshotWriter.VERSION}")
+
+        self.EntityName = self.Header["Entity"]
+        self.Length = self.Header["Length"]
+        self.Attributes = self.Header["Attributes"]
+        self.Created = datetime.datetime.fromisoformat(self.Header["Created"])
+        mark = self.Header["Watermark"]
+        self.Watermark = Watermark(datetime.datetime.fromisoformat(mark["LastChanged"]), mark["TransactionID"]) if mark else None
+        self.Sections = { section["Name"].lower() : section for section in self.Header["Columns"] }
+        self.Columns = {} # lower-case name -> Column, built on first use
+        self.Tables = {} # lower-case name -> StringTable of the categories
+        self.Cells = None # (name, values, mask, categories table, is a date) of each column for ReadRow
+        index = self.Header.get("CodeIndex")
+        self.CodeKeys = StringTable(self.Array(index["Offsets"]), self.Array(index["Data"])) if index else None
+        self.CodeRows = self.Array(index["Rows"]) if index else None
+        self.CodeRowView = memoryview(self.CodeRows) if index else None
+
+    def __repr__(self) :
+        return f"EntitySnapshot({self.EntityName}, {self.Length} rows, {self.Path})"
+
+    def __len__(self) :
+        return self.Length
+
+    def __contains__(self, code: str) -> bool :
+        return self.Find(code) is not None
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.Close()
+
+    def Close(self) -> None :
+        """Drops this reader's references to the map, which is unmapped once no array taken from it is left."""
+        self.Buffer = None
+        self.Columns = {}
+        self.Tables = {}
+        self.Cells = None
+        self.CodeKeys = None
+        self.CodeRows = None
+        self.CodeRowView = None
+
+    @property
+    def Names(self) -> list[str] :
+        return [ section["Name"] for section in self.Header["Columns"] ]
+
+    @property
+    def Age(self) -> float :
+        """Seconds since the snapshot was written."""
+        return (datetime.datetime.now(datetime.timezone.utc) - self.Created).total_seconds()
+
+    def IsStale(self, max_age: float, watermark: Watermark = None) -> bool :
+        """Returns True when the snapshot is older than max_age seconds or watermark, ie from a DeltaSync, is after its own."""
+        if self.Age > max_age : return True
+        return watermark is not None and watermark.IsAfter(self.Watermark)
+
+    def Array(self, section: dict[str, Any]) -> numpy.ndarray :
+        """Returns an array of the file as a view on the map."""
+        dtype = numpy.dtype(section["DType"])
+        offset = section["Offset"]
+        return self.Buffer[offset:offset + section["Count"] * dtype.itemsize].view(dtype)
+
+    def GetTable(self, name: str) -> StringTable :
+        table = self.Tables.get(name.lower())
+        if table is None :
+            categories = self.Sections[name.lower()]["Categories"]
+            table = self.Tables[name.lower()] = StringTable(self.Array(categories["Offsets"]), self.Array(categories["Data"]))
+        return table
+
+    def Column(self, name: str) -> Column :
+        """Returns a column, matched ignoring case, its values and mask being views on the map. The categories of a Text
+        column are decoded on first use."""
+        column = self.Columns.get(name.lower())
+        if column is None :
+            section = self.Sections.get(name.lower())
+            if section is None : raise KeyError(name)
+            categories = self.GetTable(name).ToArray() if "Categories" in section else None
+            column = Column(section["Name"], AttributeDataType(section["DataType"]), self.Array(section["Values"]), self.Array(section["Mask"]), categories)
+            self.Columns[name.lower()] = column
+        return column
+
+    def ToBatch(self, names: list[str] = None) -> RecordBatch :
+        """Returns a RecordBatch of the columns, all of them by default, sharing the map."""
+        return RecordBatch(self.Column(name) for name in (names or self.Names))
+
+    def Find(self, code: str) -> int :
+        """Returns the row of the record with code, matched ignoring case, or None."""
+        if self.CodeKeys is None or code is None : return None
+        key = str(code).lower()
+        position = bisect.bisect_left(self.CodeKeys, key)
+        if position < len(self.CodeKeys) and self.CodeKeys[position] == key : return self.CodeRowView[position]
+        return None
+
+    def Get(self, code: str, default: Any = None) -> dict[str, Any] :
+        """Returns the record with code as a dictionary without its null values, or default when there is none."""
+        row = self.Find(code)
+        return self.ReadRow(row) if row is not None else default
+
+    def ReadRow(self, row: int) -> dict[str, Any] :
+        """Returns one row as RecordBatch.ToRecords would, reading only its values."""
+        if self.Cells is None :
+            self.Cells = []
+            for section in self.Header["Columns"] :
+                values = self.Array(section["Values"])
+                table = self.GetTable(section["Name"]) if "Categories" in section else None
+                # memoryviews index to Python values directly, buffers of datetime64 are not supported so dates are converted with item()
+                self.Cells.append((section["Name"], memoryview(values) if values.dtype.kind != "M" else values, memoryview(self.Array(section["Mask"])), table, values.dtype.kind == "M"))
+        record = {}
+        for name, values, mask, table, isDate in self.Cells :
+            if mask[row] : continue
+            record[name] = table[values[row]] if table is not None else values[row].item() if isDate else values[row]
+        return record
+
+class SnapshotStore :
+    """Directory of entity snapshots, one file per entity, pulled from the API only when missing or stale."""
+    def __init__(self, directory: str, max_age: float = 86400.0, check_changes: bool = False) -> None:
+        """Constructor for SnapshotStore.
+
+        Args:
+            directory (string): Directory of the snapshot files, created when missing.
+            max_age (float, optional): Seconds after which a snapshot is pulled again. Defaults to 86400.0.
+            check_changes (bool, optional): Before using a snapshot, ask the API for one record changed after its watermark
+                                            and pull again if there is one. Defaults to False.
+        """
+        self.Directory = directory
+        self.MaxAge = max_age
+        self.CheckChanges = check_changes
+        os.makedirs(directory, exist_ok = True)
+
+    @classmethod
+    def from_Settings(cls, settings: dict[str, Any]) :
+        """Creates the store from the Snapshots section of settings.json, or returns None if there is none."""
+        section = Common.Get(settings, "Snapshots")
+        if not section : return None
+        return cls(Common.Get(section, "Directory", "snapshots"), Common.Get(section, "MaxAge", 86400.0), Common.Get(section, "CheckChanges", False))
+
+    def GetPath(self, entityName: str) -> str :
+        return os.path.join(self.Directory, f"{entityName}.snapshot")
+
+    def Open(self, api, entityName: str, getOptions: GetOptions = None) -> EntitySnapshot :
+        """Returns the snapshot of an entity, pulling it with Refresh when it is missing, unreadable or stale."""
+        path = self.GetPath(entityName)
+        if os.path.exists(path) :
+            try :
+                snapshot = EntitySnapshot(path)
+            except (ValueError, KeyError, OSError, struct.error) :
+                snapshot = None
+            if snapshot is not None :
+                if not snapshot.IsStale(self.MaxAge) and not (self.CheckChanges and self.HasChanges(api, snapshot)) : return snapshot
+                snapshot.Close()
+        return self.Refresh(api, entityName, getOptions)
+
+    def Refresh(self, api, entityName: str, getOptions: GetOptions = None) -> EntitySnapshot :
+        """Pulls every record of the entity matching getOptions, writes its snapshot and opens it.
+
+        Raises:
+            APIError: The instance returned an error status code for a page.
+        """
+        attributes = api.GetAttributes(entityName)
+        if not isinstance(attributes, list) : attributes = []
+        batch = RecordBatch.from_Records(api.IterRecords(entityName, getOptions), attributes)
+        SnapshotWriter.Write(self.GetPath(entityName), batch, attributes, entity_name = entityName)
+        return EntitySnapshot(self.GetPath(entityName))
+
+    def HasChanges(self, api, snapshot: EntitySnapshot) -> bool :
+        """Returns True when the entity has a record changed after the snapshot's watermark, or the snapshot has none."""
+        if snapshot.Watermark is None : return True
+        options = GetOptions(f"[{DeltaSync.CHANGED_ATTRIBUTE}] gt {DeltaSync.FilterDate(snapshot.Watermark.LastChanged)}")
+        options.PageSize = 1
+        options.Attributes = [ "Code" ]
+        return len(api.GetPage(snapshot.EntityName, options)) > 0
@@ -11,6 +11,11 @@ class GetOptions :
         self.PageNumber = 1
         self.PageSize = 50 
         
+    @staticmethod
+    def Quote(value) -> str :
+        """Returns value as a string literal for a Filter, ie O'Brien is 'O''Brien'."""
+        return "'" + str(value).replace("'", "''") + "'"
+
     def __repr__(self) :
         return self.QueryString()
         
@@ -0,0 +1,87 @@
+import codecs, json
+from typing import Any, Iterable, Iterator
+
+class JsonStream :
+    """Incrementally decodes the items of one array in a JSON object as the bytes arrive.
+
+    Only the item being decoded is held in memory, so a GetRecords page can be consumed record by record while it is still
+    downloading. The other top level fields of the object are collected into Envelope, which is complete once iteration ends.
+    """
+    WHITESPACE = " \t\n\r"
+
+    def __init__(self, chunks: Iterable[bytes], key: str = "data", encoding: str = "utf-8") -> None:
+        """Constructor for JsonStream.
+
+        Args:
+            chunks (Iterable[bytes]): Body of the response in chunks, ie response.iter_content().
+            key (string, optional): Top level key of the array to stream, matched case insensitively. Defaults to "data".
+            encoding (string, optional): Encoding of the body. Defaults to "utf-8".
+        """
+        self.Chunks = iter(chunks)
+        self.Key = key.lower()
+        self.Decoder = codecs.getincrementaldecoder(encoding)(errors = "strict")
+        self.JsonDecoder = json.JSONDecoder()
+        self.Buffer = ""
+        self.Position = 0
+        self.Finished = False
+        self.Envelope = {}
+
+    def __iter__(self) -> Iterator[Any] :
+        self.Expect("{")
+        if self.Peek() == "}" : return
+        while True :
+            key = self.DecodeValue()
+            self.Expect(":")
+            if key.lower() == self.Key and self.Peek() == "[" :
+                yield from self.IterArray()
+            else :
+                self.Envelope[key] = self.DecodeValue()
+            if self.Expect(",", "}") == "}" : return
+
+    def IterArray(self) -> Iterator[Any] :
+        self.Expect("[")
+        if self.Peek() == "]" :
+            self.Expect("]")
+            return
+        while True :
+            yield self.DecodeValue()
+            if self.Expect(",", "]") == "]" : return
+
+    def Read(self) -> bool :
+        """Appends the next chunk to the buffer, dropping what has already been consumed. Returns False at the end of the body."""
+        if self.Finished : return False
+        self.Buffer = self.Buffer[self.Position:]
+        self.Position = 0
+        try :
+            self.Buffer += self.Decoder.decode(next(self.Chunks))
+        except StopIteration :
+            self.Buffer += self.Decoder.decode(b"", final = True)
+            self.Finished = True
+        return True
+
+    def Peek(self) -> str :
+        """Returns the next character that is not whitespace without consuming it."""
+        while True :
+            while self.Position < len(self.Buffer) and self.Buffer[self.Position] in JsonStream.WHITESPACE : self.Position += 1
+            if self.Position < len(self.Buffer) : return self.Buffer[self.Position]
+            if not self.Read() : raise ValueError("Unexpected end of JSON stream")
+
+    def Expect(self, *characters: str) -> str :
+        character = self.Peek()
+        if character not in characters : raise ValueError(f"Expected {' or '.join(characters)} but found '{character}' in JSON stream")
+        self.Position += 1
+        return character
+
+    def DecodeValue(self) -> Any :
+        """Decodes the next complete value, reading more chunks until it is all in the buffer."""
+        self.Peek()
+        while True :
+            try :
+                value, end = self.JsonDecoder.raw_decode(self.Buffer, self.Position)
+                # A number is only complete once the character after it has arrived, ie "1." may continue as "1.5"
+                if self.Finished or self.Buffer[self.Position] in "{[\"tfn" or (end < len(self.Buffer) and self.Buffer[end] in ",]} \t\n\r") :
+                    self.Position = end
+                    return value
+            except json.JSONDecodeError :
+                if self.Finished : raise
+            self.Read()
@@ -0,0 +1,117 @@
+import asyncio, threading, time
+from typing import Any
+
+from Profisee.Common import Common
+
+class TokenBucket :
+    """Token bucket that hands out reservations, so callers can wait with either time.sleep or asyncio.sleep."""
+    def __init__(self, requests_per_second: float, burst: int = None) -> None:
+        """Constructor for TokenBucket.
+
+        Args:
+            requests_per_second (float): Rate that tokens are added to the bucket.
+            burst (int, optional): Size of the bucket. Defaults to one second of requests.
+        """
+        self.Rate = float(requests_per_second)
+        self.Burst = float(burst if burst is not None else max(1, requests_per_second))
+        self.Tokens = self.Burst
+        self.Updated = time.monotonic()
+        self.Lock = threading.Lock()
+
+    def Reserve(self) -> float :
+        """Takes a token, going into debt when the bucket is empty.
+
+        Returns:
+            float: Seconds the caller has to wait before sending.
+        """
+        with self.Lock :
+            now = time.monotonic()
+            self.Tokens = min(self.Burst, self.Tokens + (now - self.Updated) * self.Rate)
+            self.Updated = now
+            self.Tokens -= 1
+            return 0.0 if self.Tokens >= 0 else -self.Tokens / self.Rate
+
+class EndpointFamilyLimit :
+    """Rate and max-in-flight limit for one family of endpoints."""
+    def __init__(self, requests_per_second: float = None, burst: int = None, max_in_flight: int = None) -> None:
+        self.Bucket = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.InFlight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+
+    def Acquire(self) -> float :
+        started = time.perf_counter()
+        if self.Bucket is not None and (delay := self.Bucket.Reserve()) > 0 : time.sleep(delay)
+        if self.InFlight is not None : self.InFlight.acquire()
+        return time.perf_counter() - started
+
+    async def AcquireAsync(self, poll_interval: float) -> float :
+        started = time.perf_counter()
+        if self.Bucket is not None and (delay := self.Bucket.Reserve()) > 0 : await asyncio.sleep(delay)
+        if self.InFlight is not None :
+            # The semaphore is shared with threaded callers, so it is polled instead of awaited
+            while not self.InFlight.acquire(blocking = False) : await asyncio.sleep(poll_interval)
+        return time.perf_counter() - started
+
+    def Release(self) -> None :
+        if self.InFlight is not None : self.InFlight.release()
+
+class RateLimiter :
+    """Client side rate limiter and max-in-flight governor for one Profisee instance.
+
+    Limits are set per endpoint family, which is the segment after rest/v1/ in the URL (Records, Monitor, Connect, Matching...).
+    Families without their own limit share the Default limit, if one is given. One RateLimiter can be shared by threads and
+    asyncio tasks, and by several API objects that talk to the same instance.
+    """
+    def __init__(self, limits: dict[str, dict[str, Any]] = None, poll_interval: float = 0.005) -> None:
+        """Constructor for RateLimiter.
+
+        Args:
+            limits (dictionary, optional): Limits keyed by family name, each with optional RequestsPerSecond, Burst and MaxInFlight. Defaults to None.
+            poll_interval (float, optional): Seconds between checks for a free in-flight slot by asyncio callers. Defaults to 0.005.
+        """
+        self.Limits = {}
+        self.PollInterval = poll_interval
+        for family, limit in (limits or {}).items() :
+            self.Limits[family.lower()] = EndpointFamilyLimit(Common.Get(limit, "RequestsPerSecond"), Common.Get(limit, "Burst"), Common.Get(limit, "MaxInFlight"))
+
+    @classmethod
+    def from_Settings(cls, settings: dict[str, Any]) :
+        """Creates the RateLimiter from the RateLimits section of settings.json, or returns None if there is none."""
+        limits = Common.Get(settings, "RateLimits")
+        return cls(limits) if limits else None
+
+    @staticmethod
+    def GetFamily(url: str) -> str :
+        """Returns the endpoint family of a URL relative to the instance, ie 'rest/v1/Records/Customer?PageSize=10' is 'records'."""
+        segments = url.split("?")[0].strip("/").split("/")
+        return segments[2].lower() if len(segments) > 2 else ""
+
+    def GetLimit(self, url: str) -> EndpointFamilyLimit :
+        return self.Limits.get(RateLimiter.GetFamily(url)) or self.Limits.get("default")
+
+    def Acquire(self, url: str) -> float :
+        """Waits until a call to the URL may be sent.
+
+        Args:
+            url (string): URL relative to the instance.
+
+        Returns:
+            float: Seconds spent queueing.
+        """
+        limit = self.GetLimit(url)
+        return limit.Acquire() if limit is not None else 0.0
+
+    async def AcquireAsync(self, url: str) -> float :
+        """Waits, without blocking the event loop, until a call to the URL may be sent.
+
+        Args:
+            url (string): URL relative to the instance.
+
+        Returns:
+            float: Seconds spent queueing.
+        """
+        limit = self.GetLimit(url)
+        return await limit.AcquireAsync(self.PollInterval) if limit is not None else 0.0
+
+    def Release(self, url: str) -> None :
+        """Frees the in-flight slot taken by Acquire or AcquireAsync once the call to the URL is complete."""
+        if (limit := self.GetLimit(url)) is not None : limit.Release()
@@ -0,0 +1,374 @@
+import datetime, itertools, warnings
+from typing import Any, Iterable
+
+import numpy
+
+from Profisee.Common import Common, CaseInsensitiveDict
+from Profisee.Restful.Enums import AttributeDataType
+from Profisee.Restful.GetOptions import GetOptions
+
+class Column :
+    """One attribute of a RecordBatch: a typed NumPy array and a mask that is True where the value is null.
+
+    Number columns are float64, DateTime columns datetime64[ms] in UTC and Date columns datetime64[D]. Text columns, which
+    also hold domain codes and links, are dictionary encoded: Values are int32 codes into Categories, where each distinct
+    string is held once, and -1 for nulls.
+    """
+    __slots__ = ("Name", "DataType", "Values", "Mask", "Categories")
+
+    def __init__(self, name: str, data_type: AttributeDataType, values: numpy.ndarray, mask: numpy.ndarray, categories: numpy.ndarray = None) -> None:
+        self.Name = name
+        self.DataType = data_type
+        self.Values = values
+        self.Mask = mask
+        self.Categories = categories
+
+    def __repr__(self) :
+        return f"Column({self.Name}, {self.DataType.name}, {len(self)} values, {int(self.Mask.sum())} null)"
+
+    def __len__(self) :
+        return len(self.Values)
+
+    @property
+    def NBytes(self) -> int :
+        return self.Values.nbytes + self.Mask.nbytes + (self.Categories.nbytes if self.Categories is not None else 0)
+
+    def With(self, values: numpy.ndarray, mask: numpy.ndarray) :
+        """Returns a column of the same attribute and categories holding other values."""
+        return Column(self.Name, self.DataType, values, mask, self.Categories)
+
+    def Slice(self, start: int, stop: int) :
+        """Returns rows start to stop as views on this column's arrays, nothing is copied."""
+        return self.With(self.Values[start:stop], self.Mask[start:stop])
+
+    def Take(self, rows: numpy.ndarray) :
+        """Returns the rows selected by a boolean mask or an array of row numbers, copied."""
+        return self.With(self.Values[rows], self.Mask[rows])
+
+    def IsNull(self) -> numpy.ndarray :
+        return self.Mask
+
+    def Strings(self) -> numpy.ndarray :
+        """Returns a Text column as an object array of its strings, None for nulls. Equal strings are the same object."""
+        strings = numpy.append(self.Categories, None)
+        return strings[numpy.where(self.Mask, len(self.Categories), self.Values)]
+
+    def Equals(self, value: Any) -> numpy.ndarray :
+        """Returns a boolean mask of the rows equal to value, never True for nulls."""
+        return self.IsIn([ value ])
+
+    def IsIn(self, values: Iterable[Any]) -> numpy.ndarray :
+        """Returns a boolean mask of the rows equal to one of values, never True for nulls."""
+        if self.DataType in RecordBatch.TEXT_TYPES :
+            wanted = set(str(value) for value in values if value is not None)
+            codes = [ code for code, category in enumerate(self.Categories) if category in wanted ]
+            return numpy.isin(self.Values, codes)
+        targets = RecordBatch.ConvertValues(self.DataType, list(values))[0]
+        return numpy.isin(self.Values, targets) & ~self.Mask
+
+    def ToList(self) -> list[Any] :
+        """Returns the values as Python objects: strings, floats, datetimes and dates, None for nulls."""
+        values = self.Strings() if self.DataType in RecordBatch.TEXT_TYPES else self.Values.astype(object)
+        values[self.Mask] = None
+        return values.tolist()
+
+class RecordBatch :
+    """Columnar snapshot of an entity: one typed Column per attribute, all of the same length.
+
+    Types come from the DataType of the attributes returned by GetAttributes. Columns are looked up ignoring case. Slice and
+    Select share the arrays of the batch, Filter copies the selected rows, and GroupBy aggregates with NumPy.
+    """
+    TEXT_TYPES = (AttributeDataType.Text, AttributeDataType.Link, AttributeDataType.NotSpecified)
+    # System attributes, which GetAttributes may not list.
+    SYSTEM_TYPES = {
+        "code" : AttributeDataType.Text,
+        "name" : AttributeDataType.Text,
+        "id" : AttributeDataType.Number,
+        "internalid" : AttributeDataType.Number,
+        "enterusername" : AttributeDataType.Text,
+        "enterdtm" : AttributeDataType.DateTime,
+        "lastchgusername" : AttributeDataType.Text,
+        "lastchgdtm" : AttributeDataType.DateTime,
+        "$lastchgdatatransactionid" : AttributeDataType.Number
+    }
+    AGGREGATIONS = ("count", "sum", "mean", "min", "max")
+
+    def __init__(self, columns: Iterable[Column]) -> None:
+        """Constructor for RecordBatch.
+
+        Args:
+            columns (list): Columns, all of the same length.
+
+        Raises:
+            ValueError: The columns have different lengths.
+        """
+        self.Columns = CaseInsensitiveDict((column.Name, column) for column in columns)
+        lengths = { len(column) for column in self.Columns.values() }
+        if len(lengths) > 1 : raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        self.Length = lengths.pop() if lengths else 0
+
+    def __repr__(self) :
+        return f"RecordBatch({self.Length} rows, {len(self.Columns)} columns, {self.NBytes / 1_000_000:.1f} MB)"
+
+    def __len__(self) :
+        return self.Length
+
+    def __getitem__(self, name: str) -> Column :
+        return self.Columns[name]
+
+    def __contains__(self, name: str) -> bool :
+        return name in self.Columns
+
+    @property
+    def Names(self) -> list[str] :
+        return list(self.Columns.keys())
+
+    @property
+    def NBytes(self) -> int :
+        return sum(column.NBytes for column in self.Columns.values())
+
+    @staticmethod
+    def GetTypes(attributes: list[dict[str, Any]]) -> dict[str, AttributeDataType] :
+        """Returns the AttributeDataType of each attribute in a GetAttributes response, keyed by lower-case name."""
+        columns = Common.ExtractColumns(attributes, [ "Identifier.Name", "DataType" ], as_arrays = False)
+        types = {}
+        for name, dataType in zip(columns["Identifier.Name"], columns["DataType"]) :
+            if name is None : continue
+            try :
+                types[name.lower()] = AttributeDataType(dataType)
+            except ValueError :
+                types[name.lower()] = AttributeDataType.Text
+        return types
+
+    @staticmethod
+    def GetNames(records: list[dict[str, Any]], attributes: list[dict[str, Any]]) -> list[str] :
+        """Returns the keys of the records in the order they are first seen, then the names of the attributes that none of
+        them has, ignoring case. Records may omit keys, ie attributes with no value, so the first record is not enough."""
+        names = {}
+        for record in records :
+            for key in record : names.setdefault(key.lower(), key)
+        for name in Common.ExtractColumns(attributes, [ "Identifier.Name" ], as_arrays = False)["Identifier.Name"] :
+            if name is not None : names.setdefault(name.lower(), name)
+        return list(names.values())
+
+    @classmethod
+    def from_Records(cls, records: Iterable[dict[str, Any]], attributes: list[dict[str, Any]] = None, names: list[str] = None, chunk_size: int = 65536) :
+        """Builds a batch from records, ie a GetRecords page or the IterRecords generator, a chunk at a time.
+
+        Args:
+            records (iterable): Records to load. Only chunk_size of them are held as dictionaries at once.
+            attributes (list, optional): GetAttributes response of the entity, giving the type of each column. Defaults to
+                                         None, system attributes get their known type and the others are Text.
+            names (list, optional): Attributes to load. Defaults to None, every key in the first chunk of records followed by
+                                    the attributes that none of them has.
+            chunk_size (int, optional): Records converted at a time. Defaults to 65536.
+
+        Returns:
+            RecordBatch: the records as columns.
+        """
+        types = { **RecordBatch.SYSTEM_TYPES, **RecordBatch.GetTypes(attributes or []) }
+        iterator = iter(records)
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if names is None : names = RecordBatch.GetNames(chunk, attributes or [])
+        builders = [ ColumnBuilder(name, types.get(name.lower(), AttributeDataType.Text)) for name in names ]
+
+        while chunk :
+            columns = Common.ExtractColumns(chunk, names, as_arrays = False)
+            for builder in builders : builder.Add(columns[builder.Name])
+            chunk = list(itertools.islice(iterator, chunk_size))
+        return cls(builder.Build() for builder in builders)
+
+    @classmethod
+    def from_API(cls, api, entityName: str, getOptions: GetOptions = None, names: list[str] = None) :
+        """Loads the records of an entity matching getOptions, typed by the entity's attributes."""
+        return cls.from_Records(api.IterRecords(entityName, getOptions), api.GetAttributes(entityName), names)
+
+    @staticmethod
+    def ConvertValues(dataType: AttributeDataType, values: list[Any]) -> tuple[numpy.ndarray, numpy.ndarray] :
+        """Returns (array, null mask) of the values of a Number, DateTime or Date column."""
+        match dataType :
+            case AttributeDataType.Number :
+                try :
+                    array = numpy.array(values, dtype = numpy.float64) # None becomes NaN
+                except (TypeError, ValueError) :
+                    array = numpy.array([ RecordBatch.ParseNumber(value) for value in values ], dtype = numpy.float64)
+                return (array, numpy.isnan(array))
+            case AttributeDataType.DateTime | AttributeDataType.Date :
+                unit = "datetime64[ms]" if dataType == AttributeDataType.DateTime else "datetime64[D]"
+                try :
+                    with warnings.catch_warnings() :
+                        warnings.simplefilter("error") # NumPy only warns about offsets other than Z
+                        array = numpy.array([ value[:-1] if isinstance(value, str) and value.endswith("Z") else value for value in values ], dtype = "datetime64[ms]")
+                except (TypeError, ValueError, UserWarning) :
+                    array = numpy.array([ RecordBatch.ParseDateTime(value) for value in values ], dtype = "datetime64[ms]")
+                array = array.astype(unit)
+                return (array, numpy.isnat(array))
+        raise ValueError(f"{dataType.name} values are not converted to arrays")
+
+    @staticmethod
+    def ParseNumber(value: Any) -> float :
+        try :
+            return float(value) if value is not None else numpy.nan
+        except (TypeError, ValueError) :
+            return numpy.nan
+
+    @staticmethod
+    def ParseDateTime(value: Any) -> Any :
+        """Returns a date string with any time zone as a naive UTC datetime, None when it is not one."""
+        if isinstance(value, (datetime.datetime, datetime.date)) : return value
+        if not isinstance(value, str) : return None
+        try :
+            parsed = datetime.datetime.fromisoformat(value)
+        except ValueError :
+            return None
+        return parsed.astimezone(datetime.timezone.utc).replace(tzinfo = None) if parsed.tzinfo is not None else parsed
+
+    def Slice(self, start: int, stop: int = None) :
+        """Returns rows start to stop sharing this batch's arrays, nothing is copied."""
+        stop = self.Length if stop is None else stop
+        return RecordBatch(column.Slice(start, stop) for column in self.Columns.values())
+
+    def Select(self, names: list[str]) :
+        """Returns a batch of some of the columns, sharing them."""
+        return RecordBatch(self.Columns[name] for name in names)
+
+    def Filter(self, rows: numpy.ndarray) :
+        """Returns the rows selected by a boolean mask or an array of row numbers, ie batch.Filter(batch["State"].Equals("NC"))."""
+        return RecordBatch(column.Take(rows) for column in self.Columns.values())
+
+    @staticmethod
+    def GetGroupCodes(column: Column) -> tuple[numpy.ndarray, numpy.ndarray] :
+        """Returns (code of each row's value, value of each code) for grouping by a column, nulls having the last code.
+        Text columns use their own codes and Categories."""
+        if column.DataType in RecordBatch.TEXT_TYPES :
+            return (numpy.where(column.Mask, len(column.Categories), column.Values), column.Categories)
+        valid = ~column.Mask
+        uniques, inverse = numpy.unique(column.Values[valid], return_inverse = True)
+        codes = numpy.full(len(column), len(uniques), dtype = numpy.int64)
+        codes[valid] = inverse
+        return (codes, uniques)
+
+    def GroupBy(self, keys: str | list[str], aggregations: dict[str, str | list[str]] = None) :
+        """Groups the rows by the values of the key columns and aggregates other columns per group.
+
+        Args:
+            keys (string or list): Column or columns to group by. Nulls form their own group.
+            aggregations (dictionary, optional): Functions per column, count, sum, mean, min or max, ie { "CreditLimit" : [ "sum", "mean" ] }.
+                                                 Nulls are skipped. Defaults to None, only the Count of each group.
+
+        Raises:
+            ValueError: An aggregation is unknown or does not apply to the column's type.
+
+        Returns:
+            RecordBatch: the key columns, a Count column and a {column}_{function} column per aggregation, one row per group.
+        """
+        keys = [ keys ] if isinstance(keys, str) else list(keys)
+        keyColumns = [ self.Columns[key] for key in keys ]
+        codes, labels = zip(*(RecordBatch.GetGroupCodes(column) for column in keyColumns)) if keyColumns else ((), ())
+        sizes = tuple(len(values) + 1 for values in labels)
+        if numpy.prod([ float(size) for size in sizes ]) < 2 ** 62 :
+            combined = numpy.ravel_multi_index(codes, sizes) if codes else numpy.zeros(self.Length, dtype = numpy.int64)
+            groups, inverse = numpy.unique(combined, return_inverse = True)
+            groupCodes = numpy.unravel_index(groups, sizes) if codes else ()
+        else :
+            groups, inverse = numpy.unique(numpy.stack(codes, axis = 1), axis = 0, return_inverse = True)
+            groupCodes = tuple(groups.T)
+        inverse = inverse.reshape(-1)
+        count = len(groups)
+
+        columns = []
+        for column, values, groupCode in zip(keyColumns, labels, groupCodes) :
+            columns.append(RecordBatch.GroupKeyColumn(column, values, groupCode))
+        counts = numpy.bincount(inverse, minlength = count).astype(numpy.float64)
+        columns.append(Column("Count", AttributeDataType.Number, counts, numpy.zeros(count, dtype = bool)))
+
+        for name, functions in (aggregations or {}).items() :
+            column = self.Columns[name]
+            for function in ([ functions ] if isinstance(functions, str) else functions) :
+                values, mask = RecordBatch.Aggregate(column, function, inverse, count)
+                resultType = column.DataType if function in ("min", "max") else AttributeDataType.Number
+                columns.append(Column(f"{column.Name}_{function}", resultType, values, mask))
+        return RecordBatch(columns)
+
+    @staticmethod
+    def GroupKeyColumn(column: Column, uniques: numpy.ndarray, groupCode: numpy.ndarray) -> Column :
+        """Returns the key column of a GroupBy result from the codes and values GetGroupCodes gave the groups."""
+        mask = groupCode == len(uniques)
+        if column.DataType in RecordBatch.TEXT_TYPES :
+            return Column(column.Name, column.DataType, numpy.where(mask, -1, groupCode).astype(numpy.int32), mask, column.Categories)
+        values = numpy.append(uniques, numpy.array([ "NaT" if uniques.dtype.kind == "M" else numpy.nan ], dtype = uniques.dtype))[groupCode]
+        return Column(column.Name, column.DataType, values, mask)
+
+    @staticmethod
+    def Aggregate(column: Column, function: str, inverse: numpy.ndarray, count: int) -> tuple[numpy.ndarray, numpy.ndarray] :
+        """Returns (value per group, null mask) of an aggregation of the column's non-null values."""
+        if function not in RecordBatch.AGGREGATIONS : raise ValueError(f"Unknown aggregation {function}, expected one of {', '.join(RecordBatch.AGGREGATIONS)}")
+        valid = ~column.Mask
+        groups = inverse[valid]
+        present = numpy.bincount(groups, minlength = count)
+        if function == "count" : return (present.astype(numpy.float64), numpy.zeros(count, dtype = bool))
+        if column.DataType in RecordBatch.TEXT_TYPES or (column.DataType != AttributeDataType.Number and function in ("sum", "mean")) :
+            raise ValueError(f"{function} does not apply to {column.DataType.name} column {column.Name}")
+
+        values = column.Values[valid]
+        empty = present == 0
+        if function in ("sum", "mean") :
+            sums = numpy.bincount(groups, weights = values, minlength = count)
+            if function == "sum" : return (sums, numpy.zeros(count, dtype = bool))
+            with numpy.errstate(invalid = "ignore", divide = "ignore") :
+                return (sums / present, empty)
+
+        # min and max: sort the values by group and reduce each group's run.
+        isDate = values.dtype.kind == "M"
+        numbers = values.view(numpy.int64) if isDate else values
+        order = numpy.argsort(groups, kind = "stable")
+        sortedGroups = groups[order]
+        starts = numpy.flatnonzero(numpy.r_[True, sortedGroups[1:] != sortedGroups[:-1]]) if len(sortedGroups) else numpy.array([], dtype = numpy.int64)
+        reduce = numpy.minimum if function == "min" else numpy.maximum
+        reduced = reduce.reduceat(numbers[order], starts) if len(starts) else numbers[:0]
+        result = numpy.full(count, numpy.iinfo(numpy.int64).min if isDate else numpy.nan, dtype = numbers.dtype)
+        result[sortedGroups[starts]] = reduced
+        return (result.view(values.dtype) if isDate else result, empty)
+
+    def ToRecords(self) -> list[dict[str, Any]] :
+        """Returns the rows as dictionaries, leaving out null values."""
+        columns = [ (name, column.ToList()) for name, column in self.Columns.items() ]
+        return [ { name : values[row] for name, values in columns if values[row] is not None } for row in range(self.Length) ]
+
+class ColumnBuilder :
+    """Collects the values of one column chunk by chunk for RecordBatch.from_Records."""
+    def __init__(self, name: str, data_type: AttributeDataType) -> None:
+        self.Name = name
+        self.DataType = data_type
+        self.Chunks = [] # (values, mask) arrays
+        self.Lookup = {} # Text: string -> code
+        self.Categories = []
+
+    def Add(self, values: list[Any]) -> None :
+        if self.DataType not in RecordBatch.TEXT_TYPES :
+            self.Chunks.append(RecordBatch.ConvertValues(self.DataType, values))
+            return
+        lookup = self.Lookup
+        categories = self.Categories
+        def encode(value) :
+            if value is None : return -1
+            if not isinstance(value, str) : value = str(Common.Get(value, "Code", value)) if isinstance(value, dict) else str(value)
+            code = lookup.get(value)
+            if code is None :
+                code = lookup[value] = len(categories)
+                categories.append(value)
+            return code
+        codes = numpy.fromiter(map(encode, values), dtype = numpy.int32, count = len(values))
+        self.Chunks.append((codes, codes == -1))
+
+    def Build(self) -> Column :
+        if self.Chunks :
+            values = numpy.concatenate([ values for values, _ in self.Chunks ])
+            mask = numpy.concatenate([ mask for _, mask in self.Chunks ])
+        else :
+            dtype = { AttributeDataType.Number : numpy.float64, AttributeDataType.DateTime : "datetime64[ms]", AttributeDataType.Date : "datetime64[D]" }.get(self.DataType, numpy.int32)
+            values = numpy.array([], dtype = dtype)
+            mask = numpy.array([], dtype = bool)
+        categories = numpy.array(self.Categories, dtype = object) if self.DataType in RecordBatch.TEXT_TYPES else None
+        self.Chunks = []
+        return Column(self.Name, self.DataType, values, mask, categories)
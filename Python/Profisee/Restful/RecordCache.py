@@ -0,0 +1,144 @@
+import collections, collections.abc, copy, re, threading, time
+from typing import Any
+from urllib.parse import unquote
+
+from Profisee.Common import Common
+
+class RecordCache :
+    """Read-through cache for GetRecord, keyed by entity and Code.
+
+    Holds at most max_size records and evicts the least recently used one when full. Each entity has its own TTL, entities
+    without one use default_ttl and are not cached when it is 0. MergeRecords, CreateRecord and DeleteRecords sent through
+    the same API invalidate the records they write, writes by other clients are only seen once the TTL expires. Every
+    invalidation moves the generation of its entity on, so a record fetched while a write was invalidating it is not put
+    in the cache.
+    """
+    # Endpoints that change records, with DeleteAllMembers dropping the whole entity.
+    INVALIDATING_ENDPOINTS = ("MergeRecords", "CreateRecord", "DeleteRecords", "DeleteAllMembers")
+
+    def __init__(self, max_size: int = 10000, ttls: dict[str, float] = None, default_ttl: float = 60.0) -> None:
+        """Constructor for RecordCache.
+
+        Args:
+            max_size (int, optional): Most records kept. Defaults to 10000.
+            ttls (dictionary, optional): Seconds records are kept, keyed by entity name. Defaults to None.
+            default_ttl (float, optional): Seconds records of other entities are kept, 0 to not cache them. Defaults to 60.0.
+        """
+        self.MaxSize = max_size
+        self.TTLs = { name.lower() : ttl for name, ttl in (ttls or {}).items() }
+        self.DefaultTTL = default_ttl
+        self.Entries = collections.OrderedDict() # (entity, code) -> (expires, record), least recently used first
+        self.Generations = collections.Counter() # entity -> invalidations so far
+        self.Clears = 0
+        self.Lock = threading.Lock()
+        self.Hits = 0
+        self.Misses = 0
+        self.Evictions = 0
+        self.Invalidations = 0
+
+    def __len__(self) :
+        return len(self.Entries)
+
+    def __repr__(self) :
+        return f"RecordCache(Size={len(self)}, Hits={self.Hits}, Misses={self.Misses}, HitRatio={self.HitRatio:.2f}, Evictions={self.Evictions})"
+
+    @classmethod
+    def from_Settings(cls, settings: dict[str, Any]) :
+        """Creates the RecordCache from the RecordCache section of settings.json, or returns None if there is none."""
+        section = Common.Get(settings, "RecordCache")
+        if not section : return None
+        return cls(Common.Get(section, "MaxSize", 10000), Common.Get(section, "TTLs"), Common.Get(section, "DefaultTTL", 60.0))
+
+    @property
+    def HitRatio(self) -> float :
+        lookups = self.Hits + self.Misses
+        return self.Hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def GetKey(entityName: str, code: Any) -> tuple[str, str] :
+        return (entityName.lower(), str(code).lower())
+
+    def GetTTL(self, entityName: str) -> float :
+        return self.TTLs.get(entityName.lower(), self.DefaultTTL)
+
+    def IsCacheable(self, entityName: str) -> bool :
+        return bool(self.GetTTL(entityName))
+
+    def Get(self, entityName: str, code: Any) -> tuple[bool, Any] :
+        """Returns (True, a copy of the record) when it is cached, None being a cached not found, or (False, None)."""
+        key = RecordCache.GetKey(entityName, code)
+        with self.Lock :
+            entry = self.Entries.get(key)
+            if entry is None or entry[0] <= time.monotonic() :
+                if entry is not None : del self.Entries[key]
+                self.Misses += 1
+                return (False, None)
+            self.Entries.move_to_end(key)
+            self.Hits += 1
+            record = entry[1]
+        return (True, copy.deepcopy(record)) # Callers may change the record they get
+
+    def Generation(self, entityName: str) -> tuple[int, int] :
+        """Returns the generation of the entity, to take before fetching a record and give to Put."""
+        with self.Lock :
+            return (self.Clears, self.Generations[entityName.lower()])
+
+    def Put(self, entityName: str, code: Any, record: Any, generation: tuple[int, int] = None) -> None :
+        """Caches a record, None for a code that was not found.
+
+        Args:
+            entityName (string): Entity name.
+            code (Any): Record code.
+            record (Any): Record to cache.
+            generation (tuple, optional): Generation taken before the record was fetched. The record is not cached when the
+                                          entity was invalidated since, it may be older than the write. Defaults to None.
+        """
+        ttl = self.GetTTL(entityName)
+        if not ttl : return
+        key = RecordCache.GetKey(entityName, code)
+        with self.Lock :
+            if generation is not None and generation != (self.Clears, self.Generations[key[0]]) : return
+            self.Entries[key] = (time.monotonic() + ttl, copy.deepcopy(record))
+            self.Entries.move_to_end(key)
+            while len(self.Entries) > self.MaxSize :
+                self.Entries.popitem(last = False)
+                self.Evictions += 1
+
+    def Invalidate(self, entityName: str, codes: list = None) -> None :
+        """Drops the cached records of the codes, or of the whole entity when codes is None."""
+        with self.Lock :
+            self.Generations[entityName.lower()] += 1
+            if codes is None :
+                entity = entityName.lower()
+                keys = [ key for key in self.Entries if key[0] == entity ]
+            else :
+                keys = [ RecordCache.GetKey(entityName, code) for code in codes ]
+            for key in keys :
+                if self.Entries.pop(key, None) is not None : self.Invalidations += 1
+
+    def Clear(self) -> None :
+        with self.Lock :
+            self.Entries.clear()
+            self.Clears += 1
+
+    def InvalidateFor(self, endpoint: str, url: str, json: Any) -> None :
+        """Drops the records a call to a record changing endpoint may have written.
+
+        Args:
+            endpoint (string): Name of the API method that made the call.
+            url (string): URL of the call relative to the instance, ie rest/v1/Records/Customer?Record_codes=1,2.
+            json (Any): Body of the call.
+        """
+        if endpoint not in RecordCache.INVALIDATING_ENDPOINTS : return
+        match = re.match(r"rest/v1/Records/(?:bulk/)?([^/?]+)(?:\?(.*))?", url)
+        if match is None : return
+        entityName = unquote(match.group(1))
+        codes = None
+        if endpoint == "DeleteRecords" and match.group(2) :
+            query = re.search(r"(?i)(?:^|&)record_codes=([^&]*)", match.group(2))
+            if query is not None : codes = [ unquote(code) for code in query.group(1).split(",") ]
+        elif endpoint in ("MergeRecords", "CreateRecord") and json is not None :
+            records = json if isinstance(json, list) else [ json ]
+            codes = [ Common.Get(record, "Code") for record in records if isinstance(record, collections.abc.Mapping) ]
+            if None in codes : codes = None # A record without a Code gets one from the instance
+        self.Invalidate(entityName, codes)
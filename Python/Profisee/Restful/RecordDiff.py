@@ -0,0 +1,113 @@
+import datetime, decimal
+from typing import Any
+
+from Profisee.Common import Common
+from Profisee.Restful.Enums import AttributeDataType
+
+class RecordDiff :
+    """Records reduced to the fields that differ from the values already in the instance.
+
+    Changes holds what needs to be merged: records whose Code was not found are kept whole and the others keep their Code
+    and changed fields only. Records where nothing changed are left out and counted in Unchanged.
+    """
+    DATE_TYPES = (AttributeDataType.DateTime, AttributeDataType.Date)
+    TYPED = (AttributeDataType.Number, *DATE_TYPES) # Attribute types whose strings are parsed before comparing
+
+    def __init__(self) -> None:
+        self.Changes = []
+        self.Unchanged = 0
+        self.Created = 0
+        self.FieldsSuppressed = 0
+        self.Report = None # BulkReport of the merge of Changes, set by API.MergeChangedRecords
+
+    def __repr__(self) :
+        return f"RecordDiff(Changes={len(self.Changes)}, Unchanged={self.Unchanged}, Created={self.Created}, FieldsSuppressed={self.FieldsSuppressed})"
+
+    @property
+    def Suppressed(self) -> int :
+        """Number of record writes that were not sent because nothing changed."""
+        return self.Unchanged
+
+    @classmethod
+    def from_Records(cls, records: list[dict[str, Any]], current: dict[str, dict[str, Any]], attributes: list[dict[str, Any]] = None) :
+        """Compares records with the current values.
+
+        Args:
+            records (list): Records to write, each with its Code.
+            current (dictionary): Current record keyed by code, None for codes that do not exist yet.
+            attributes (list, optional): GetAttributes response of the entity. Strings are only compared as numbers for its
+                                         Number attributes and as dates for its DateTime and Date attributes. Defaults to None,
+                                         every string is compared as exact text.
+
+        Returns:
+            RecordDiff: the changes to merge and the counts of what was suppressed.
+        """
+        diff = cls()
+        types = RecordDiff.GetTypes(attributes or [])
+        for record in records :
+            code = Common.Get(record, "Code")
+            existing = current.get(code) if code is not None else None
+            if existing is None :
+                diff.Changes.append(record)
+                diff.Created += code is not None
+                continue
+            changed = { name : value for name, value in record.items() if name.lower() == "code" or not RecordDiff.IsEqual(value, Common.Get(existing, name), types.get(name.lower())) }
+            if len(changed) > 1 :
+                diff.Changes.append(changed)
+                diff.FieldsSuppressed += len(record) - len(changed)
+            else :
+                diff.Unchanged += 1
+        return diff
+
+    @staticmethod
+    def GetTypes(attributes: list[dict[str, Any]]) -> dict[str, AttributeDataType] :
+        """Returns the AttributeDataType of each attribute in a GetAttributes response, keyed by lower-case name."""
+        types = {}
+        for attribute in attributes :
+            if (name := Common.Get(attribute, "Identifier.Name")) is None : continue
+            try :
+                types[str(name).lower()] = AttributeDataType(Common.Get(attribute, "DataType"))
+            except ValueError :
+                types[str(name).lower()] = AttributeDataType.Text
+        return types
+
+    @staticmethod
+    def Normalize(value: Any, dataType: AttributeDataType = None) -> Any :
+        """Returns value in a form that compares equal however the instance or the caller typed it.
+
+        Empty strings are None, numbers are floats, dates and datetimes are aware datetimes and domain based values given as
+        {"Code" : ...} are their code. Strings are floats only for a Number attribute and datetimes only for a DateTime or
+        Date attribute, otherwise they stay text.
+        """
+        if value is None or isinstance(value, bool) : return value
+        if isinstance(value, (int, float, decimal.Decimal)) : return float(value)
+        if isinstance(value, datetime.datetime) : return value if value.tzinfo is not None else value.replace(tzinfo = datetime.timezone.utc)
+        if isinstance(value, datetime.date) : return datetime.datetime(value.year, value.month, value.day, tzinfo = datetime.timezone.utc)
+        if isinstance(value, dict) and (code := Common.Get(value, "Code")) is not None : return RecordDiff.Normalize(code, dataType)
+        if isinstance(value, str) :
+            if value == "" : return None
+            if dataType == AttributeDataType.Number :
+                try :
+                    return float(value)
+                except ValueError :
+                    pass
+            if dataType in RecordDiff.DATE_TYPES and (date := RecordDiff.ParseDate(value)) is not None : return date
+        return value
+
+    @staticmethod
+    def ParseDate(value: str) -> datetime.datetime :
+        """Returns an ISO date or datetime string as an aware datetime, or None if it is not one. The offset of the string is
+        kept, not converted to UTC; a string without one is taken as UTC."""
+        if len(value) < 10 or value[4:5] != "-" or value[7:8] != "-" : return None
+        try :
+            date = datetime.datetime.fromisoformat(value)
+        except ValueError :
+            return None
+        return date if date.tzinfo is not None else date.replace(tzinfo = datetime.timezone.utc)
+
+    @staticmethod
+    def IsEqual(left: Any, right: Any, dataType: AttributeDataType = None) -> bool :
+        """Compares a value to write with the current value. Two strings are compared as exact text unless the attribute is a
+        Number, DateTime or Date, so codes like '007' and '7', or ISO-looking text in a Text attribute, stay different."""
+        if isinstance(left, str) and isinstance(right, str) and dataType not in RecordDiff.TYPED : return left == right
+        return RecordDiff.Normalize(left, dataType) == RecordDiff.Normalize(right, dataType)
@@ -0,0 +1,202 @@
+import base64, hashlib, json, os, threading, time
+from typing import Any
+
+from Profisee.Common import Common
+
+class CachedResponse :
+    """Stored response that exposes the parts of a requests.Response that the ResponseHandlers use."""
+    def __init__(self, url: str, status_code: int, content: bytes, headers: dict[str, str], encoding: str = None) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str :
+        return self.content.decode(self.encoding, errors = "replace")
+
+class CacheEntry :
+    """One cached response with the validators needed to revalidate it."""
+    def __init__(self, url: str, endpoint: str, content: bytes, encoding: str, etag: str = None, last_modified: str = None, stored: float = None,
+                 client: str = None) -> None:
+        self.Url = url
+        self.Client = client # Hash of the client id the response was returned to, the client id itself is never stored
+        self.Endpoint = endpoint
+        self.Content = content
+        self.Encoding = encoding
+        self.ETag = etag
+        self.LastModified = last_modified
+        self.Stored = stored if stored is not None else time.time()
+
+    @property
+    def Key(self) -> str :
+        return ResponseCache.GetKey(self.Url, self.Client)
+
+    def ValidationHeaders(self) -> dict[str, str] :
+        """Returns the If-None-Match and If-Modified-Since headers for the validators the server sent, if any."""
+        headers = {}
+        if self.ETag is not None : headers["If-None-Match"] = self.ETag
+        if self.LastModified is not None : headers["If-Modified-Since"] = self.LastModified
+        return headers
+
+    def Response(self) -> CachedResponse :
+        return CachedResponse(self.Url, 200, self.Content, { "Content-Type" : "application/json" }, self.Encoding)
+
+    def ToJson(self) -> dict[str, Any] :
+        return {
+            "Url" : self.Url,
+            "Endpoint" : self.Endpoint,
+            "Content" : base64.b64encode(self.Content).decode("ascii"),
+            "Encoding" : self.Encoding,
+            "ETag" : self.ETag,
+            "LastModified" : self.LastModified,
+            "Stored" : self.Stored,
+            "Client" : self.Client
+        }
+
+    @classmethod
+    def from_Json(cls, value: dict[str, Any]) :
+        return cls(value["Url"], value["Endpoint"], base64.b64decode(value["Content"]), value["Encoding"], value["ETag"], value["LastModified"], value["Stored"], value.get("Client"))
+
+class ResponseCache :
+    """HTTP response cache for the metadata endpoints of the Profisee Restful API.
+
+    Successful GET responses of the endpoints in TTLs are kept for that many seconds and then revalidated with If-None-Match
+    or If-Modified-Since when the server sent an ETag or Last-Modified, so an unchanged response costs a 304 instead of the
+    full body. Calls that change metadata invalidate the endpoints listed for them in INVALIDATES. Entries are kept apart
+    per client id, since the instance may answer clients differently, and can also be kept on disk so they survive between
+    runs.
+    """
+    DEFAULT_TTLS = {
+        "GetEntities" : 300,
+        "GetEntity" : 300,
+        "GetAttributes" : 300,
+        "GetMatchingStrategies" : 300,
+        "GetAddressVerificationStrategies" : 300,
+        "GetThemes" : 3600
+    }
+
+    INVALIDATES = {
+        "CreateAttribute" : ("GetAttributes", "GetAttribute", "GetEntity", "GetEntities"),
+        "UpdateAttributes" : ("GetAttributes", "GetAttribute", "GetEntity", "GetEntities"),
+        "CreateEntity" : ("GetEntities", "GetEntity", "GetAttributes", "GetAttribute"),
+        "DeleteEntity" : ("GetEntities", "GetEntity", "GetAttributes", "GetAttribute"),
+        "DeleteEntities" : ("GetEntities", "GetEntity", "GetAttributes", "GetAttribute"),
+        "UpdateMatchingStrategy" : ("GetMatchingStrategies",),
+        "UpdateTheme" : ("GetThemes", "GetTheme")
+    }
+
+    def __init__(self, ttls: dict[str, float] = None, directory: str = None) -> None:
+        """Constructor for ResponseCache.
+
+        Args:
+            ttls (dictionary, optional): Seconds each endpoint is served from the cache before it is revalidated, keyed by the
+                                         endpoint name the API methods pass to CallAPI. Defaults to None, DEFAULT_TTLS.
+            directory (string, optional): Directory to keep the entries in between runs. Defaults to None, memory only.
+        """
+        self.TTLs = dict(ttls) if ttls is not None else dict(ResponseCache.DEFAULT_TTLS)
+        self.Directory = directory
+        self.Entries = {}
+        self.Lock = threading.Lock()
+        self.Hits = 0
+        self.Revalidations = 0
+        self.Misses = 0
+        if self.Directory is not None :
+            os.makedirs(self.Directory, exist_ok = True)
+            self.Load()
+
+    @classmethod
+    def from_Settings(cls, settings: dict[str, Any]) :
+        """Creates the ResponseCache from the ResponseCache section of settings.json, or returns None if there is none."""
+        section = Common.Get(settings, "ResponseCache")
+        return cls(Common.Get(section, "TTLs"), Common.Get(section, "Directory")) if section else None
+
+    def IsCacheable(self, endpoint: str) -> bool :
+        return endpoint in self.TTLs
+
+    @staticmethod
+    def HashClient(client_id: str) -> str :
+        """Returns the part of the cache key that identifies the client, without keeping its id in memory or on disk."""
+        return hashlib.sha256(str(client_id).encode("utf-8")).hexdigest()[:32] if client_id is not None else None
+
+    @staticmethod
+    def GetKey(url: str, client: str) -> str :
+        return f"{client} {url}" if client is not None else url
+
+    def Lookup(self, url: str, endpoint: str, client_id: str = None) -> tuple[CacheEntry, bool] :
+        """Returns the entry for the URL and client id, if there is one, and whether it is fresh enough to use without
+        revalidating."""
+        with self.Lock :
+            entry = self.Entries.get(ResponseCache.GetKey(url, ResponseCache.HashClient(client_id)))
+            if entry is None :
+                self.Misses += 1
+                return (None, False)
+            fresh = time.time() - entry.Stored < self.TTLs.get(endpoint, 0)
+            if fresh : self.Hits += 1
+            else : self.Revalidations += 1
+            return (entry, fresh)
+
+    def Update(self, url: str, endpoint: str, response: Any, entry: CacheEntry = None, client_id: str = None) -> Any :
+        """Updates the cache from a response and returns the response the ResponseHandlers should see.
+
+        A 304 refreshes the entry and is answered from it, a 200 for a cacheable endpoint is stored, and a successful call to
+        an endpoint in INVALIDATES drops the entries it makes stale.
+
+        Args:
+            url (string): Full URL of the request.
+            endpoint (string): Name of the API method that made the call.
+            response (Response): Response from requests or aiohttp.
+            entry (CacheEntry, optional): Entry that was revalidated. Defaults to None.
+            client_id (string, optional): Client id the request was sent with. Defaults to None.
+
+        Returns:
+            Response: The response, or the cached response it confirmed.
+        """
+        if response.status_code == 304 and entry is not None :
+            entry.Stored = time.time()
+            self.Save(entry)
+            return entry.Response()
+        if response.status_code == 200 and self.IsCacheable(endpoint) :
+            self.Store(CacheEntry(url, endpoint, response.content, response.encoding, response.headers.get("ETag"), response.headers.get("Last-Modified"), client = ResponseCache.HashClient(client_id)))
+        elif response.status_code >= 200 and response.status_code < 300 and endpoint in ResponseCache.INVALIDATES :
+            self.Invalidate(*ResponseCache.INVALIDATES[endpoint])
+        return response
+
+    def Store(self, entry: CacheEntry) -> None :
+        with self.Lock :
+            self.Entries[entry.Key] = entry
+        self.Save(entry)
+
+    def Invalidate(self, *endpoints: str) -> None :
+        """Drops the entries of the endpoints, or every entry when no endpoint is given."""
+        with self.Lock :
+            keys = [ key for key, entry in self.Entries.items() if not endpoints or entry.Endpoint in endpoints ]
+            for key in keys : del self.Entries[key]
+        if self.Directory is not None :
+            for key in keys :
+                try :
+                    os.remove(self.GetPath(key))
+                except FileNotFoundError :
+                    pass
+
+    def GetPath(self, key: str) -> str :
+        return os.path.join(self.Directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def Save(self, entry: CacheEntry) -> None :
+        if self.Directory is None : return
+        path = self.GetPath(entry.Key)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding = "utf-8") as file :
+            json.dump(entry.ToJson(), file)
+        os.replace(temporary, path) # Readers never see a partly written entry
+
+    def Load(self) -> None :
+        for name in os.listdir(self.Directory) :
+            if not name.endswith(".json") : continue
+            try :
+                with open(os.path.join(self.Directory, name), encoding = "utf-8") as file :
+                    entry = CacheEntry.from_Json(json.load(file))
+            except (OSError, ValueError, KeyError) :
+                continue
+            self.Entries[entry.Key] = entry
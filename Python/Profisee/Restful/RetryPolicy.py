@@ -0,0 +1,149 @@
+import random, threading, time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from Profisee.Restful.Enums import RequestOperation
+
+class RetryPolicy :
+    """Decides which failed calls are sent again and how long to wait before each retry.
+
+    Only idempotent operations (Get and Put) are retried by default. Post and Patch calls can be opted in either for all
+    calls of that operation with retry_operations, or for individual API methods with retry_endpoints.
+    """
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30.0, jitter: bool = True,
+                 retry_status_codes: tuple[int] = (429, 500, 502, 503, 504),
+                 retry_operations: tuple[RequestOperation] = (RequestOperation.Get, RequestOperation.Put),
+                 retry_endpoints: tuple[str] = ()) -> None:
+        """Constructor for RetryPolicy.
+
+        Args:
+            max_retries (int, optional): Maximum number of retries after the first attempt. Defaults to 3.
+            backoff_factor (float, optional): Base delay in seconds, doubled on every retry. Defaults to 0.5.
+            max_backoff (float, optional): Upper bound in seconds of the computed delay. Defaults to 30.0.
+            jitter (bool, optional): Pick a random delay between 0 and the computed delay. Defaults to True.
+            retry_status_codes (tuple, optional): Status codes that are retried. Defaults to (429, 500, 502, 503, 504).
+            retry_operations (tuple, optional): Operations that are retried. Defaults to (RequestOperation.Get, RequestOperation.Put).
+            retry_endpoints (tuple, optional): API method names that are retried whatever their operation, ie "MergeRecords". Defaults to ().
+        """
+        self.MaxRetries = max_retries
+        self.BackoffFactor = backoff_factor
+        self.MaxBackoff = max_backoff
+        self.Jitter = jitter
+        self.RetryStatusCodes = set(retry_status_codes)
+        self.RetryOperations = set(retry_operations)
+        self.RetryEndpoints = set(retry_endpoints)
+
+    def IsRetryable(self, request_operation: RequestOperation, endpoint: str) -> bool :
+        return request_operation in self.RetryOperations or endpoint in self.RetryEndpoints
+
+    def ShouldRetry(self, request_operation: RequestOperation, endpoint: str, attempt: int, status_code: int = None) -> bool :
+        """Returns if the call should be sent again.
+
+        Args:
+            request_operation (RequestOperation): Operation of the call.
+            endpoint (string): Name of the API method that made the call.
+            attempt (int): Number of retries already made.
+            status_code (int, optional): Status code of the response, None when the call failed to connect. Defaults to None.
+
+        Returns:
+            bool: True if the call should be retried.
+        """
+        if attempt >= self.MaxRetries or not self.IsRetryable(request_operation, endpoint) : return False
+        return status_code is None or status_code in self.RetryStatusCodes
+
+    def GetBackoff(self, attempt: int, retry_after: str = None) -> float :
+        """Returns the seconds to wait before the next retry. A Retry-After header from the server takes precedence, capped
+        at max_backoff.
+
+        Args:
+            attempt (int): Number of retries already made.
+            retry_after (string, optional): Value of the Retry-After header. Defaults to None.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        if (delay := RetryPolicy.ParseRetryAfter(retry_after)) is not None : return min(self.MaxBackoff, delay)
+        delay = min(self.MaxBackoff, self.BackoffFactor * (2 ** attempt))
+        return random.uniform(0, delay) if self.Jitter else delay
+
+    @staticmethod
+    def ParseRetryAfter(retry_after: str) -> float :
+        """Parses a Retry-After header that holds either a number of seconds or an HTTP date.
+
+        Args:
+            retry_after (string): Value of the Retry-After header.
+
+        Returns:
+            float: Seconds to wait or None if the header is missing or invalid.
+        """
+        if retry_after is None : return None
+        try :
+            return max(0.0, float(retry_after))
+        except ValueError :
+            pass
+        try :
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError) :
+            return None
+
+class CircuitOpenError(Exception) :
+    """Raised instead of sending a call while the CircuitBreaker is open."""
+    pass
+
+class CircuitBreaker :
+    """Fails calls fast once the Profisee instance looks to be down.
+
+    After failure_threshold consecutive failures (connection errors or 5xx responses) the circuit opens and calls raise
+    CircuitOpenError without being sent. After reset_timeout seconds one trial call is let through; its success closes the
+    circuit again and its failure re-opens it.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """Constructor for CircuitBreaker.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open the circuit. Defaults to 5.
+            reset_timeout (float, optional): Seconds the circuit stays open before a trial call is allowed. Defaults to 30.0.
+        """
+        self.FailureThreshold = failure_threshold
+        self.ResetTimeout = reset_timeout
+        self.State = "Closed"
+        self.Failures = 0
+        self.OpenedAt = None
+        self.Lock = threading.Lock()
+
+    def BeforeCall(self) -> None :
+        """Raises CircuitOpenError if the call must not be sent."""
+        with self.Lock :
+            if self.State == "Open" :
+                if time.monotonic() - self.OpenedAt < self.ResetTimeout :
+                    raise CircuitOpenError(f"Circuit open after {self.Failures} consecutive failures, retrying in {self.ResetTimeout - (time.monotonic() - self.OpenedAt):.1f}s")
+                self.State = "HalfOpen"
+            elif self.State == "HalfOpen" :
+                raise CircuitOpenError("Circuit half open, waiting for the trial call to finish")
+
+    def IsFailure(self, status_code: int) -> bool :
+        return status_code is None or status_code >= 500
+
+    def RecordResult(self, status_code: int = None) -> None :
+        """Records the outcome of a call that was sent.
+
+        Args:
+            status_code (int, optional): Status code of the response, None when the call failed to connect. Defaults to None.
+        """
+        with self.Lock :
+            if not self.IsFailure(status_code) :
+                self.State = "Closed"
+                self.Failures = 0
+                return
+            self.Failures += 1
+            if self.State == "HalfOpen" or self.Failures >= self.FailureThreshold :
+                self.State = "Open"
+                self.OpenedAt = time.monotonic()
+
+    def CancelCall(self) -> None :
+        """Records that a call let through by BeforeCall ended without an outcome, ie it was cancelled or failed before or
+        after the request. A trial call that ends this way re-opens the circuit so the next call is the new trial."""
+        with self.Lock :
+            if self.State == "HalfOpen" :
+                self.State = "Open"
+                self.OpenedAt = time.monotonic() - self.ResetTimeout
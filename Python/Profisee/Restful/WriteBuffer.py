@@ -0,0 +1,139 @@
+import atexit, logging, threading, time
+from typing import Any
+
+from Profisee.Common import Common
+from Profisee.Restful.BulkWriter import BulkWriter, BulkReport
+
+class WriteBuffer :
+    """Write-behind buffer that turns many MergeRecord calls into a few bulk merges.
+
+    Records added for the same entity and Code are coalesced into one record with the latest value of each field. An
+    entity is flushed with BulkWriter when max_records records are pending for it, when its oldest pending change is
+    max_age seconds old, on Flush() and when the buffer is closed, which also happens when the interpreter exits. One buffer
+    can be shared by threads.
+    """
+    def __init__(self, api, max_records: int = 1000, max_age: float = 5.0, writer: BulkWriter = None) -> None:
+        """Constructor for WriteBuffer.
+
+        Args:
+            api (API): API to merge the records through.
+            max_records (int, optional): Pending records for an entity that trigger a flush of that entity. Defaults to 1000.
+            max_age (float, optional): Seconds a change may wait before its entity is flushed. None only flushes on size and
+                                       explicit calls. Defaults to 5.0.
+            writer (BulkWriter, optional): Writer used for the flushes. Defaults to None, BulkWriter(api).
+        """
+        self.API = api
+        self.MaxRecords = max_records
+        self.MaxAge = max_age
+        self.Writer = writer if writer is not None else BulkWriter(api)
+        self.Pending = {} # entity name -> { code -> record }
+        self.Oldest = {} # entity name -> time.monotonic() of its oldest pending change
+        self.Lock = threading.Lock()
+        self.FlushLock = threading.RLock() # Flushes run one at a time so later changes to a Code are never overtaken
+        self.Closed = threading.Event()
+        self.Added = 0
+        self.Flushed = 0
+        self.Thread = None
+        if self.MaxAge is not None :
+            self.Thread = threading.Thread(target = self.FlushAged, name = "WriteBuffer", daemon = True)
+            self.Thread.start()
+        atexit.register(self.Close, sequential = True)
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.Close()
+
+    def __len__(self) :
+        with self.Lock :
+            return sum(len(records) for records in self.Pending.values())
+
+    def Add(self, entityName: str, record: dict[str, Any]) -> None :
+        """Buffers a change to a record, merging its fields into any change already pending for the same Code.
+
+        Args:
+            entityName (string): Entity name.
+            record (dictionary): Record with its Code and the fields to change.
+
+        Raises:
+            ValueError: The record has no Code or the buffer is closed.
+        """
+        code = Common.Get(record, "Code")
+        if code is None : raise ValueError("Records added to a WriteBuffer need a Code")
+        if self.Closed.is_set() : raise ValueError("WriteBuffer is closed")
+        with self.Lock :
+            records = self.Pending.setdefault(entityName, {})
+            if not records : self.Oldest[entityName] = time.monotonic()
+            pending = records.get(code)
+            if pending is None :
+                records[code] = dict(record)
+            else :
+                for name, value in record.items() : Common.Set(pending, name, value)
+            self.Added += 1
+            full = len(records) >= self.MaxRecords
+        if full : self.Flush(entityName)
+
+    def Flush(self, entityName: str = None, sequential: bool = False) -> dict[str, BulkReport] :
+        """Merges the pending records of one entity, or of every entity, and waits for the merges to finish.
+
+        The records of an entity are taken out of the buffer while they are merged, so changes added meanwhile start a new
+        batch. If the merge raises, the records are put back under those newer changes and the exception is raised again.
+
+        Args:
+            entityName (string, optional): Entity to flush. Defaults to None, all entities.
+            sequential (bool, optional): Merge without a thread pool, see BulkWriter.Merge. Defaults to False.
+
+        Returns:
+            dictionary: BulkReport keyed by entity name for the entities that had pending records.
+        """
+        reports = {}
+        with self.FlushLock :
+            with self.Lock :
+                names = [ entityName ] if entityName is not None else list(self.Pending)
+                batches = { name : self.Pending.pop(name) for name in names if self.Pending.get(name) }
+                oldest = { name : self.Oldest.pop(name, None) for name in batches }
+            for name, records in batches.items() :
+                try :
+                    report = self.Writer.Merge(name, list(records.values()), sequential = sequential)
+                except BaseException :
+                    self.Restore(name, records, oldest[name])
+                    for other in batches.keys() - reports.keys() - { name } : self.Restore(other, batches[other], oldest[other])
+                    raise
+                self.Flushed += len(records)
+                if report.Failed : logging.getLogger().warning(f"WriteBuffer failed to merge {report.Failed} of {len(records)} records into {name}")
+                reports[name] = report
+        return reports
+
+    def Restore(self, entityName: str, records: dict[str, dict[str, Any]], oldest: float) -> None :
+        """Puts records that were not merged back in the buffer, under the changes added to the same Codes since."""
+        with self.Lock :
+            newer = self.Pending.get(entityName, {})
+            for code, record in newer.items() :
+                if code in records :
+                    for name, value in record.items() : Common.Set(records[code], name, value)
+            self.Pending[entityName] = { **records, **{ code : record for code, record in newer.items() if code not in records } }
+            if oldest is not None or entityName in self.Oldest :
+                self.Oldest[entityName] = min(value for value in (oldest, self.Oldest.get(entityName)) if value is not None)
+
+    def FlushAged(self) -> None :
+        """Runs on the background thread, flushing each entity once its oldest pending change is max_age old."""
+        while not self.Closed.wait(self.MaxAge / 4) :
+            now = time.monotonic()
+            with self.Lock :
+                aged = [ name for name, oldest in self.Oldest.items() if now - oldest >= self.MaxAge ]
+            for name in aged :
+                try :
+                    self.Flush(name)
+                except Exception :
+                    logging.getLogger().exception(f"WriteBuffer failed to flush {name}")
+
+    def Close(self, sequential: bool = False) -> dict[str, BulkReport] :
+        """Stops the background thread and flushes everything that is pending.
+
+        Called with sequential set at interpreter exit, when the thread pool of BulkWriter can no longer be used.
+        """
+        self.Closed.set()
+        atexit.unregister(self.Close)
+        if self.Thread is not None and self.Thread is not threading.current_thread() : self.Thread.join()
+        return self.Flush(sequential = sequential)
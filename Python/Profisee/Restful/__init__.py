@@ -1,6 +1,10 @@
 from .GetOptions import GetOptions
 from .Record import Record
+from .CompactRecord import CompactRecord, RecordSchema
+from .APIResult import APIResult
+from .ResponseCache import ResponseCache
 from .API import API
+from .AsyncAPI import AsyncAPI
 from .Attribute import Attribute
 from .Entity import Entity
 
@@ -2,12 +2,14 @@ from typing import Any, Dict
 import uvicorn
 import pyodbc
 from fastapi import FastAPI, Request, Body
-from Profisee.Restful import API
+from Profisee.Restful import AsyncAPI
+from Profisee.Restful.RecordCache import RecordCache
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 
-api = API("https://corpltr16.corp.profisee.com/profisee25r2", "0741a8cbebe54c2eae3d3b5cc4f49600", False)
+api = AsyncAPI("https://corpltr16.corp.profisee.com/profisee25r2", "0741a8cbebe54c2eae3d3b5cc4f49600", False,
+               record_cache = RecordCache(ttls = { "Z_Settings" : 300 }, default_ttl = 0))
 app = FastAPI(openapi_url="/Python/openapi.json")
 app.add_middleware(
                     CORSMiddleware,
@@ -20,6 +22,10 @@ app.add_middleware(
 class WorkflowRequest(BaseModel):
     pass
 
+@app.on_event("shutdown")
+async def shutdown():
+    await api.close() # Release the pooled connections to the Profisee instance
+
 @app.post("/TestWorkflowActivity")
 async def TestWorkflowActivity(request: Dict[str, Any]):
     # data = await request.json()
@@ -32,10 +38,10 @@ async def TestWorkflowActivity(request: Dict[str, Any]):
     testFlowMessage = ""
     
     if isTestEntity :
-        connectionStringMember = api.GetRecord("Z_Settings", "SQLCONNECTIONSTRING")
+        connectionStringMember = await api.GetRecord("Z_Settings", "SQLCONNECTIONSTRING")
         
         if connectionStringMember != None :
-            member = api.GetRecord(entityName, memberCode)
+            member = await api.GetRecord(entityName, memberCode)
             input = member["name"] if member != None else "not found"
             
             connection = pyodbc.connect(connectionStringMember["value"])
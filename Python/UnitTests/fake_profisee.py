@@ -0,0 +1,231 @@
+import gzip, hashlib, json, random, re, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+class FakeProfiseeServer :
+    """Small in-process stand-in for the Profisee Restful API used by the offline unit tests and benchmarks.
+
+    Only the endpoints and filter syntax that the tests exercise are implemented. Records are held in memory per entity.
+    """
+    def __init__(self, records: dict[str, list[dict]] = None, latency: float = 0.0) -> None:
+        self.Records = records if records is not None else {}
+        self.Attributes = {} # Entity name -> GetAttributes response
+        self.Latency = latency
+        self.Requests = []
+        self.Connections = 0
+        self.Failures = [] # (status_code, headers) responses returned, in order, before any request is handled
+        self.RequestHeaders = []
+        self.Rejected = set() # Codes that make a MergeRecords call fail as a whole with a 400
+        self.ShuffleTies = False # Return the rows that OrderBy does not fully order in a random order, as a database may
+        self.Lock = threading.Lock()
+
+        server = self
+        class Handler(_Handler) :
+            Server = server
+
+        class Server(ThreadingHTTPServer) :
+            daemon_threads = True
+            def get_request(self) :
+                connection = super().get_request()
+                with server.Lock : server.Connections += 1
+                return connection
+
+        self.HttpServer = Server(("127.0.0.1", 0), Handler)
+        self.Thread = threading.Thread(target=self.HttpServer.serve_forever, daemon=True)
+
+    @property
+    def Url(self) -> str :
+        return f"http://127.0.0.1:{self.HttpServer.server_address[1]}/profisee/"
+
+    def __enter__(self) :
+        self.Thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.HttpServer.shutdown()
+        self.HttpServer.server_close()
+
+class _Handler(BaseHTTPRequestHandler) :
+    protocol_version = "HTTP/1.1"
+    Server = None
+
+    def log_message(self, format, *args) :
+        pass
+
+    def do_GET(self) : self.Dispatch("GET")
+    def do_PUT(self) : self.Dispatch("PUT")
+    def do_POST(self) : self.Dispatch("POST")
+    def do_PATCH(self) : self.Dispatch("PATCH")
+    def do_DELETE(self) : self.Dispatch("DELETE")
+
+    def Dispatch(self, method: str) :
+        server = self.Server
+        parts = urlsplit(self.path)
+        path = unquote(parts.path).removeprefix("/profisee/rest/v1/")
+        query = { key.lower() : values[0] for key, values in parse_qs(parts.query).items() }
+        length = int(self.headers.get("Content-Length", 0))
+        content = self.rfile.read(length) if length > 0 else b""
+        if self.headers.get("Content-Encoding") == "gzip" : content = gzip.decompress(content)
+        body = json.loads(content) if content else None
+
+        with server.Lock :
+            server.Requests.append((method, self.path))
+            server.RequestHeaders.append(dict(self.headers))
+            failure = server.Failures.pop(0) if server.Failures else None
+        if server.Latency : threading.Event().wait(server.Latency)
+        if failure is not None : return self.Send(failure[0], { "message" : "Injected failure" }, failure[1])
+
+        segments = path.split("/")
+        if segments[0] == "Records" and len(segments) == 2 :
+            entity_name = segments[1]
+            match method :
+                case "GET" : return self.GetRecords(entity_name, query)
+                case "PATCH" if "record_codes" in query :
+                    raw = re.search(r"(?i)record_codes=([^&]*)", parts.query).group(1)
+                    return self.DeleteRecords(entity_name, [ unquote(code) for code in raw.split(",") ])
+                case "PATCH" : return self.MergeRecords(entity_name, body)
+        if segments[0] == "Entities" and len(segments) == 3 and segments[2].lower() == "attributes" and method == "GET" :
+            return self.Send(200, { "data" : server.Attributes.get(segments[1], []) })
+        if segments[0] == "Entities" and len(segments) == 1 :
+            match method :
+                case "GET" : return self.SendCacheable({ "data" : [ { "Identifier" : { "Name" : name } } for name in server.Records ] })
+                case "POST" :
+                    with server.Lock :
+                        for entity in body : server.Records.setdefault(entity["Identifier"]["Name"], [])
+                    return self.Send(201, { "data" : [], "errors" : [] })
+        self.Send(404, { "message" : f"Unknown endpoint {method} {path}" })
+
+    def GetRecords(self, entity_name: str, query: dict[str, str]) :
+        if entity_name not in self.Server.Records : return self.Send(404, { "message" : f"Entity {entity_name} not found" })
+        records = self.Server.Records[entity_name]
+        if "filter" in query :
+            predicate = FilterParser(query["filter"]).Parse()
+            records = [ record for record in records if predicate(record) ]
+        if "orderby" in query :
+            if self.Server.ShuffleTies : records = random.sample(records, len(records))
+            for term in reversed(query["orderby"].split(",")) : # Stable sorts, last key first
+                attribute, _, direction = term.strip().partition(" ")
+                records = sorted(records, key=lambda record : record.get(attribute.strip("[]")) or "", reverse=direction.strip().lower() == "desc")
+        if query.get("countsonly", "false") == "true" :
+            return self.Send(200, { "data" : [], "totalRecords" : len(records) })
+        page_number = int(query.get("pagenumber", 1))
+        page_size = int(query.get("pagesize", 50))
+        page = records[(page_number - 1) * page_size : page_number * page_size]
+        if "attributes" in query :
+            attributes = query["attributes"].split(",")
+            page = [ { key : value for key, value in record.items() if key in attributes or key == "Code" } for record in page ]
+        self.Send(200, { "data" : page, "totalRecords" : len(records) })
+
+    def MergeRecords(self, entity_name: str, records: list[dict]) :
+        if any(record.get("Code") in self.Server.Rejected for record in records) :
+            return self.Send(400, { "message" : "One or more validation errors occurred." })
+        existing = self.Server.Records.setdefault(entity_name, [])
+        by_code = { record["Code"] : record for record in existing }
+        errors = []
+        with self.Server.Lock :
+            for record in records :
+                if "Invalid" in record : errors.append({ "Code" : record.get("Code"), "Message" : record["Invalid"] })
+                elif record.get("Code") in by_code : by_code[record["Code"]].update(record)
+                else :
+                    by_code[record.get("Code")] = dict(record)
+                    existing.append(by_code[record.get("Code")])
+        self.Send(207 if errors else 200, { "data" : [], "errors" : errors })
+
+    def DeleteRecords(self, entity_name: str, codes: list[str]) :
+        if entity_name not in self.Server.Records : return self.Send(404, { "message" : f"Entity {entity_name} not found" })
+        with self.Server.Lock :
+            existing = { record["Code"] for record in self.Server.Records[entity_name] }
+            self.Server.Records[entity_name] = [ record for record in self.Server.Records[entity_name] if record["Code"] not in codes ]
+        errors = [ { "Code" : code, "Message" : "Record not found" } for code in codes if code not in existing ]
+        self.Send(207 if errors else 200, { "data" : [], "errors" : errors })
+
+    def SendCacheable(self, payload) :
+        """Sends the payload with an ETag, or a 304 when the client already has it."""
+        etag = '"' + hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag : return self.Send(304, None, { "ETag" : etag })
+        self.Send(200, payload, { "ETag" : etag })
+
+    def Send(self, status_code: int, payload, headers: dict[str, str] = None) :
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        if body and "gzip" in self.headers.get("Accept-Encoding", "") :
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection : self.send_header("Connection", "close") # As servers do, so the client drops the socket instead of reusing it
+        for key, value in (headers or {}).items() : self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+class FilterParser :
+    """Parses the subset of the Profisee filter syntax used by the tests into a predicate over a record.
+
+    Supports [Attribute] eq/ne/gt/ge/lt/le 'value', and, or and parentheses.
+    """
+    TOKENS = re.compile(r"\s*(?:(\[[^\]]+\])|('(?:[^']|'')*')|(-?\d+(?:\.\d+)?)|(\(|\))|([A-Za-z]+))")
+
+    def __init__(self, text: str) -> None:
+        self.Tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text) :
+            match = self.TOKENS.match(text, position)
+            if match is None : raise ValueError(f"Cannot parse filter at '{text[position:]}'")
+            attribute, string, number, paren, word = match.groups()
+            if attribute : self.Tokens.append(("attribute", attribute[1:-1]))
+            elif string : self.Tokens.append(("value", string[1:-1].replace("''", "'")))
+            elif number : self.Tokens.append(("value", float(number)))
+            elif paren : self.Tokens.append((paren, paren))
+            else : self.Tokens.append(("word", word.lower()))
+            position = match.end()
+        self.Position = 0
+
+    def Parse(self) :
+        return self.ParseOr()
+
+    def Next(self) :
+        token = self.Tokens[self.Position]
+        self.Position += 1
+        return token
+
+    def Peek(self) :
+        return self.Tokens[self.Position] if self.Position < len(self.Tokens) else (None, None)
+
+    def ParseOr(self) :
+        predicates = [ self.ParseAnd() ]
+        while self.Peek() == ("word", "or") :
+            self.Next()
+            predicates.append(self.ParseAnd())
+        return lambda record : any(predicate(record) for predicate in predicates)
+
+    def ParseAnd(self) :
+        predicates = [ self.ParseTerm() ]
+        while self.Peek() == ("word", "and") :
+            self.Next()
+            predicates.append(self.ParseTerm())
+        return lambda record : all(predicate(record) for predicate in predicates)
+
+    def ParseTerm(self) :
+        if self.Peek()[0] == "(" :
+            self.Next()
+            predicate = self.ParseOr()
+            self.Next()
+            return predicate
+        _, attribute = self.Next()
+        _, operator = self.Next()
+        _, value = self.Next()
+        compare = {
+            "eq" : lambda left, right : left == right,
+            "ne" : lambda left, right : left != right,
+            "gt" : lambda left, right : left > right,
+            "ge" : lambda left, right : left >= right,
+            "lt" : lambda left, right : left < right,
+            "le" : lambda left, right : left <= right
+        }[operator]
+        def predicate(record) :
+            current = record.get(attribute)
+            if current is None : return operator == "ne"
+            if isinstance(value, float) : current = float(current)
+            return compare(current, value)
+        return predicate
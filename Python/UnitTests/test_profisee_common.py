@@ -1,8 +1,13 @@
 import os, sys
-import unittest
+import copy, json, pickle, unittest
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
-from Profisee.Common import Common
+from Profisee.Common import Common, CaseInsensitiveDict
 
 class unit_tests(unittest.TestCase):
 
@@ -27,6 +32,107 @@ class unit_tests(unittest.TestCase):
     def test_get_with_default(self):
         self.assertEqual(Common.Get(self.node, "nonexistent", default="default_value"), "default_value")
         self.assertEqual(Common.Get(self.node, "key2.nonexistent", default="default_value"), "default_value")
+    def test_get_ignores_case(self):
+        self.assertEqual(Common.Get(self.node, "KEY1"), "value1")
+        self.assertEqual(Common.Get(self.node, "Key2/SubKey1"), "subvalue1")
+        self.assertEqual(Common.Get(self.node, "key2\\SUBKEY1"), "subvalue1")
+        self.assertEqual(Common.Get({ "a.b" : 1 }, "a.b"), 1)
+
+    def test_set_ignores_case(self):
+        node = { "Name" : "One" }
+        Common.Set(node, "name", "Two")
+        Common.Set(node, "City", "Cork")
+        self.assertEqual(node, { "Name" : "Two", "City" : "Cork" })
+        Common.Set(None, "Name", "Three")
+
+class case_insensitive_dict_unit_tests(unittest.TestCase):
+
+    def test_lookup(self):
+        record = CaseInsensitiveDict({ "Code" : "1", "Name" : "One", "Identifier" : CaseInsensitiveDict({ "Name" : "Test" }) })
+        self.assertEqual(record["code"], "1")
+        self.assertEqual(record.get("NAME"), "One")
+        self.assertIsNone(record.get("Missing"))
+        self.assertIn("CODE", record)
+        self.assertEqual(Common.Get(record, "identifier.name"), "Test")
+        with self.assertRaises(KeyError) : record["Missing"]
+
+    def test_keeps_first_case(self):
+        record = CaseInsensitiveDict({ "Name" : "One" })
+        record["NAME"] = "Two"
+        Common.Set(record, "name", "Three")
+        record |= { "nAmE" : "Four" }
+        self.assertEqual(list(record.keys()), [ "Name" ])
+        self.assertEqual(json.dumps(record), '{"Name": "Four"}')
+
+    def test_remove(self):
+        record = CaseInsensitiveDict(Code = "1", Name = "One", City = "Cork")
+        del record["CODE"]
+        self.assertEqual(record.pop("name"), "One")
+        self.assertEqual(record.pop("name", None), None)
+        self.assertNotIn("code", record)
+        self.assertEqual(record.setdefault("CITY", "Dublin"), "Cork")
+        record.clear()
+        self.assertNotIn("city", record)
+
+    def test_shared_index(self):
+        first = CaseInsensitiveDict({ "Code" : "1", "Name" : "One" })
+        second = CaseInsensitiveDict({ "Code" : "2", "Name" : "Two" })
+        self.assertIs(first.Index, second.Index)
+        first["City"] = "Cork"
+        del first["NAME"]
+        self.assertEqual(second["name"], "Two")
+        self.assertNotIn("city", second)
+        self.assertNotIn("name", first)
+        mixed = CaseInsensitiveDict({ "Name" : "One", "NAME" : "Two" })
+        self.assertEqual(dict(mixed), { "Name" : "Two" })
+
+    def test_copies(self):
+        record = CaseInsensitiveDict.from_Json({ "Code" : "1", "Addresses" : [ { "City" : "Cork" } ] })
+        for other in (record.copy(), copy.deepcopy(record), pickle.loads(pickle.dumps(record))) :
+            self.assertIsInstance(other, CaseInsensitiveDict)
+            self.assertEqual(other, record)
+            self.assertEqual(other["CODE"], "1")
+        self.assertEqual(Common.Get(record["addresses"][0], "CITY"), "Cork")
+class path_accessor_unit_tests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.attributes = [
+            { "Identifier" : { "Name" : "Code" }, "SortOrder" : 1, "DomainEntityId" : None },
+            { "identifier" : { "name" : "Country" }, "sortOrder" : 2, "DomainEntityId" : { "Name" : "Country" } },
+            { "Identifier" : { "Name" : "Rate" }, "SortOrder" : 3 }
+        ]
+
+    def test_matches_common_get(self):
+        for path in ("Identifier.Name", "SortOrder", "DomainEntityId.Name", "domainentityid", "Missing", "Identifier.Missing") :
+            accessor = Common.Accessor(path)
+            for attribute in self.attributes :
+                self.assertEqual(accessor(attribute), Common.Get(attribute, path), path)
+                self.assertEqual(accessor(attribute, "default"), Common.Get(attribute, path, "default"), path)
+        self.assertIs(Common.Accessor("Identifier.Name"), Common.Accessor("Identifier.Name"))
+        self.assertIsNone(Common.Accessor("Identifier.Name")(None))
+        self.assertEqual(Common.Accessor("a.b")({ "a.b" : 1 }), 1)
+
+    def test_extract_columns_lists(self):
+        columns = Common.ExtractColumns(self.attributes, [ "Identifier.Name", "SortOrder", "DomainEntityId.Name" ], as_arrays = False)
+        self.assertEqual(columns, {
+            "Identifier.Name" : [ "Code", "Country", "Rate" ],
+            "SortOrder" : [ 1, 2, 3 ],
+            "DomainEntityId.Name" : [ None, "Country", None ]
+        })
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_extract_columns_arrays(self):
+        records = [ { "Code" : "1", "Rate" : 1.5, "Count" : 2, "IsActive" : True, "Tags" : [ "a" ] }, { "Code" : "2", "Rate" : None, "Count" : 3, "IsActive" : False, "Tags" : [] } ]
+        columns = Common.ExtractColumns(records, [ "Code", "Rate", "Count", "IsActive", "Tags" ])
+        self.assertEqual(columns["Count"].dtype, numpy.int64)
+        self.assertEqual(columns["IsActive"].dtype, numpy.bool_)
+        self.assertEqual(columns["Rate"].dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(columns["Rate"][1]))
+        self.assertEqual(columns["Code"].dtype, object)
+        self.assertEqual(columns["Tags"].shape, (2,))
+        self.assertEqual(columns["Tags"][0], [ "a" ])
+        self.assertEqual(Common.ExtractColumns([], [ "Code" ])["Code"].shape, (0,))
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
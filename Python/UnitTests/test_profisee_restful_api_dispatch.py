@@ -0,0 +1,37 @@
+import os, sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+
+class SimulatedResponse :
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+
+class api_dispatch_unit_tests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.api = API("http://localhost/profisee", "client-id")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.api.close()
+
+    def test_endpoint_specific_handler(self):
+        response = self.api.CheckResponse(SimulatedResponse(204), "UnmatchRecords")
+        self.assertEqual(response, { "StatusCode" : 204, "Message" : "Success - records unmatched" })
+
+    def test_default_handler(self):
+        response = self.api.CheckResponse(SimulatedResponse(404, "missing"), "GetEntity")
+        self.assertEqual(response["StatusCode"], 404)
+        self.assertEqual(response["Error"], "missing")
+        self.assertEqual(self.api.StatusCode, 404)
+
+    def test_unknown_status_code(self):
+        response = self.api.CheckResponse(SimulatedResponse(418), "GetEntity")
+        self.assertEqual(response, { "Error" : "Unknown statusCode '418'" })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os, sys
+import threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.Enums import RequestOperation
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class api_result_unit_tests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeProfiseeServer({ "Test" : [ { "Code" : "1", "Name" : "One" } ] }, latency=0.005).__enter__()
+        cls.api = API(cls.server.Url, "client-id")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.api.close()
+        cls.server.__exit__(None, None, None)
+
+    def test_send_request(self):
+        result = self.api.SendRequest(RequestOperation.Get, "rest/v1/Records/Test", endpoint = "GetRecords")
+        self.assertEqual(result.StatusCode, 200)
+        self.assertEqual(result.Endpoint, "GetRecords")
+        self.assertEqual(result.Data, [ { "Code" : "1", "Name" : "One" } ])
+        self.assertIsNone(result.Errors)
+        self.assertGreater(result.Elapsed, 0)
+        self.assertIs(self.api.LastResult, result)
+        self.assertIs(self.api.LastResponse, result.Response)
+
+    def test_error_result(self):
+        self.api.GetRecords("Missing")
+        result = self.api.LastResult
+        self.assertEqual(result.StatusCode, 404)
+        self.assertFalse(result.IsSuccessStatusCode())
+        self.assertIn(404, result.Errors)
+
+    def test_threads_see_their_own_results(self):
+        mismatches = []
+        def worker(entity_name: str, expected_status_code: int) :
+            for _ in range(10) :
+                self.api.GetRecords(entity_name)
+                if self.api.StatusCode != expected_status_code : mismatches.append((entity_name, self.api.StatusCode))
+        threads = [ threading.Thread(target=worker, args=("Test" if index % 2 == 0 else "Missing", 200 if index % 2 == 0 else 404)) for index in range(8) ]
+        for thread in threads : thread.start()
+        for thread in threads : thread.join()
+        self.assertEqual(mismatches, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import os, sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class api_session_unit_tests(unittest.TestCase):
+
+    def test_connections_are_reused(self):
+        with FakeProfiseeServer({ "Test" : [ { "Code" : "1", "Name" : "One" } ] }) as server :
+            with API(server.Url, "client-id") as api :
+                for _ in range(5) :
+                    api.GetRecords("Test")
+                    self.assertEqual(api.StatusCode, 200)
+            self.assertEqual(len(server.Requests), 5)
+            self.assertEqual(server.Connections, 1)
+
+    def test_keep_alive_disabled(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id", keep_alive=False) as api :
+                for _ in range(3) : api.GetRecords("Test")
+            self.assertEqual(server.Connections, 3)
+
+    def test_pool_settings(self):
+        with API("http://localhost/profisee", "client-id", pool_connections=2, pool_maxsize=4, pool_block=True) as api :
+            adapter = api.Session.get_adapter("http://localhost/profisee/")
+            self.assertEqual(adapter._pool_connections, 2)
+            self.assertEqual(adapter._pool_maxsize, 4)
+            self.assertTrue(adapter._pool_block)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os, sys
+import asyncio
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.GetOptions import GetOptions
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class async_api_unit_tests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeProfiseeServer({ "Test" : [ { "Code" : str(code), "Name" : f"Record {code}" } for code in range(100) ] }, latency=0.01).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__(None, None, None)
+
+    def test_get_records(self):
+        async def run() :
+            async with AsyncAPI(self.server.Url, "client-id") as api :
+                records = await api.GetRecords("Test")
+                self.assertEqual(api.StatusCode, 200)
+                return records
+        self.assertEqual(len(asyncio.run(run())), 50)
+
+    def test_get_record(self):
+        async def run() :
+            async with AsyncAPI(self.server.Url, "client-id") as api :
+                return await api.GetRecord("Test", "42"), await api.GetRecord("Test", "missing")
+        (record, missing) = asyncio.run(run())
+        self.assertEqual(record["Name"], "Record 42")
+        self.assertIsNone(missing)
+
+    def test_counts_only(self):
+        async def run() :
+            async with AsyncAPI(self.server.Url, "client-id") as api :
+                get_options = GetOptions()
+                get_options.CountsOnly = True
+                return await api.GetRecords("Test", get_options)
+        self.assertEqual(asyncio.run(run())["totalRecords"], 100)
+
+    def test_concurrent_calls_share_connector(self):
+        async def run() :
+            async with AsyncAPI(self.server.Url, "client-id", pool_maxsize=4, max_concurrency=4) as api :
+                return await asyncio.gather(*[ api.GetRecord("Test", str(code)) for code in range(20) ])
+        connections = self.server.Connections
+        records = asyncio.run(run())
+        self.assertEqual([ record["Code"] for record in records ], [ str(code) for code in range(20) ])
+        self.assertLessEqual(self.server.Connections - connections, 4)
+
+    def test_error_handler(self):
+        async def run() :
+            async with AsyncAPI(self.server.Url, "client-id") as api :
+                response = await api.GetRecords("Missing")
+                return response, api.StatusCode
+        (response, status_code) = asyncio.run(run())
+        self.assertEqual(status_code, 404)
+        self.assertEqual(response["StatusCode"], 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os, sys
+import asyncio, collections, unittest
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.BulkWriter import BulkReport, BulkWriter
+from Profisee.Restful.RetryPolicy import CircuitBreaker, CircuitOpenError
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records(count) :
+    return [ { "Code" : f"{code:05}", "Name" : f"Customer {code:05}" } for code in range(count) ]
+
+class bulk_writer_unit_tests(unittest.TestCase):
+
+    def test_merges_in_chunks(self):
+        records = make_records(1000)
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                report = api.MergeRecordsBulk("Test", records, BulkWriter(api, chunk_size = 100, increase = 0))
+                self.assertEqual((report.Succeeded, report.Failed), (1000, 0))
+                self.assertEqual(report.Requests, 10)
+                self.assertEqual(sorted(server.Records["Test"], key = lambda record : record["Code"]), records)
+
+    def test_chunk_bytes_limit(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                writer = BulkWriter(api, chunk_size = 1000, max_chunk_bytes = 2000)
+                report = writer.Merge("Test", make_records(200))
+                self.assertEqual(report.Succeeded, 200)
+                record_bytes = len(api.Codec.Encode(make_records(200)[-1])) + 1
+                self.assertTrue(all(size * record_bytes <= 2000 for size in report.ChunkSizes))
+                self.assertGreater(report.Requests, 1)
+
+    def test_adapts_chunk_size(self):
+        writer = BulkWriter(None, chunk_size = 100, min_chunk_size = 10, max_chunk_size = 120, increase = 15)
+        writer.Adjust(True)
+        self.assertEqual(writer.ChunkSize, 115)
+        writer.Adjust(True)
+        self.assertEqual(writer.ChunkSize, 120)
+        writer.Adjust(False)
+        self.assertEqual(writer.ChunkSize, 60)
+        for _ in range(5) : writer.Adjust(False)
+        self.assertEqual(writer.ChunkSize, 10)
+
+    def test_bisects_rejected_records(self):
+        records = make_records(100)
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            server.Rejected = { "00013", "00077" }
+            with API(server.Url, "client-id") as api :
+                report = api.MergeRecordsBulk("Test", records, BulkWriter(api, chunk_size = 50, min_chunk_size = 1))
+                self.assertEqual(report.Failed, 2)
+                self.assertEqual([ record["Code"] for record, _ in report.Failures ], [ "00013", "00077" ])
+                self.assertEqual(report.Failures[0][1]["StatusCode"], 400)
+                self.assertGreater(report.Bisections, 0)
+                self.assertEqual(len(server.Records["Test"]), 98)
+
+    def test_per_record_errors(self):
+        records = make_records(20)
+        records[5]["Invalid"] = "Name is too long"
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                report = api.MergeRecordsBulk("Test", records)
+                self.assertEqual(report.Failures, [ (records[5], { "Code" : "00005", "Message" : "Name is too long" }) ])
+                self.assertEqual(report.Bisections, 0)
+
+    def test_missing_entity_not_bisected(self):
+        with FakeProfiseeServer({}) as server :
+            server.Failures = [ (404, {}) ]
+            with API(server.Url, "client-id") as api :
+                report = api.MergeRecordsBulk("Test", make_records(10))
+                self.assertEqual((report.Failed, report.Requests, report.Bisections), (10, 1, 0))
+
+    def test_circuit_open_recorded_per_chunk(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            server.Failures = [ (500, {}) ]
+            with API(server.Url, "client-id", circuit_breaker = CircuitBreaker(failure_threshold = 1, reset_timeout = 60)) as api :
+                report = api.MergeRecordsBulk("Test", make_records(40), BulkWriter(api, max_workers = 1, chunk_size = 10, increase = 0))
+                self.assertEqual((report.Failed, report.Bisections), (40, 1)) # Only the 500 chunk is split, not the ones refused by the circuit
+                self.assertTrue(all("Circuit open" in outcome for outcome in report.Outcomes))
+
+    def test_connection_error_not_bisected(self):
+        with FakeProfiseeServer({}) as server : url = server.Url # Nothing listens on the port once the server is closed
+        with API(url, "client-id") as api :
+            report = api.MergeRecordsBulk("Test", make_records(40), BulkWriter(api, max_workers = 1, chunk_size = 10, increase = 0))
+        self.assertEqual((report.Failed, report.Requests, report.Bisections), (40, 4, 0))
+
+    def test_split_only_when_payload_is_blamed(self):
+        class Result :
+            def __init__(self, status_code, errors = None) :
+                self.StatusCode = status_code
+                self.Data = { "message" : "failed" }
+                self.Errors = errors
+            def IsSuccessStatusCode(self) :
+                return self.StatusCode >= 200 and self.StatusCode < 300
+        writer = BulkWriter(None)
+        for result, exception, split in ((None, requests.Timeout("Read timed out"), True), (None, requests.ConnectionError("Refused"), False),
+                                         (Result(413), None, True), (Result(503), None, False), (Result(207, [ { "Message" : "No code" } ]), None, False)) :
+            report = BulkReport(make_records(4))
+            halves = collections.deque()
+            writer.Complete(report, halves, [ 0, 1, 2, 3 ], result, exception, 0.1)
+            self.assertEqual((len(halves), report.Bisections), (2, 1) if split else (0, 0))
+            self.assertEqual(report.Failed, 0 if split else 4)
+
+        report = BulkReport(make_records(4))
+        writer.Complete(report, collections.deque(), [ 0, 1, 2, 3 ], Result(207, [ { "Code" : "00001", "Message" : "Bad" }, { "Message" : "No code" } ]), None, 0.1)
+        self.assertEqual(report.Outcomes[1], { "Code" : "00001", "Message" : "Bad" })
+        self.assertEqual(report.Outcomes[0], [ { "Message" : "No code" } ])
+
+    def test_unencodable_record_isolated(self):
+        records = make_records(20)
+        records[7]["Name"] = object()
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                report = api.MergeRecordsBulk("Test", records, BulkWriter(api, chunk_size = 20, min_chunk_size = 1))
+                self.assertEqual([ record["Code"] for record, _ in report.Failures ], [ "00007" ])
+                self.assertEqual((report.Requests, report.Bisections), (1, 0)) # Failed before sending, the other records go in one chunk
+                self.assertEqual(len(server.Records["Test"]), 19)
+
+    def test_async(self):
+        records = make_records(300)
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            server.Rejected = { "00013" }
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id") as api :
+                    with self.assertRaises(TypeError) : BulkWriter(api).Merge("Test", records)
+                    return await api.MergeRecordsBulk("Test", records, BulkWriter(api, chunk_size = 50, min_chunk_size = 1))
+            report = asyncio.run(run())
+            self.assertEqual([ record["Code"] for record, _ in report.Failures ], [ "00013" ])
+            self.assertGreater(report.Bisections, 0)
+            self.assertEqual(len(server.Records["Test"]), 299)
+
+if __name__ == '__main__':
+    unittest.main()
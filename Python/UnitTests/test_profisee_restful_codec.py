@@ -0,0 +1,79 @@
+import os, sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Common import CaseInsensitiveDict
+from Profisee.Restful.API import API
+from Profisee.Restful.Codec import JsonCodec
+from Profisee.Restful.GetOptions import GetOptions
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class CountingCodec(JsonCodec) :
+    def __init__(self) -> None:
+        super().__init__("json")
+        self.Decodes = 0
+        decode = self.Decode
+        def counting_decode(value) :
+            self.Decodes += 1
+            return decode(value)
+        self.Decode = counting_decode
+
+class codec_unit_tests(unittest.TestCase):
+
+    def test_round_trip(self):
+        for name in JsonCodec.NAMES :
+            try :
+                codec = JsonCodec(name)
+            except ImportError :
+                continue
+            payload = [ { "Code" : "1", "Name" : "One", "Amount" : 1.5, "Active" : True, "Parent" : None } ]
+            self.assertIsInstance(codec.Encode(payload), bytes)
+            self.assertEqual(codec.Decode(codec.Encode(payload)), payload)
+
+    def test_default_codec(self):
+        self.assertIn(JsonCodec().Name, JsonCodec.NAMES)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError) : JsonCodec("yaml")
+
+    def test_body_decoded_once(self):
+        codec = CountingCodec()
+        with FakeProfiseeServer({ "Test" : [ { "Code" : str(code) } for code in range(10) ] }) as server :
+            with API(server.Url, "client-id", codec=codec) as api :
+                get_options = GetOptions()
+                get_options.CountsOnly = True
+                self.assertEqual(api.GetRecords("Test", get_options)["totalRecords"], 10)
+                self.assertEqual(codec.Decodes, 1)
+
+                self.assertEqual(len(api.GetRecords("Test")), 10)
+                self.assertEqual(api.LastResult.Body["totalRecords"], 10)
+                self.assertEqual(codec.Decodes, 2)
+
+    def test_request_body_encoded(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id", codec=JsonCodec("json")) as api :
+                api.MergeRecords("Test", [ { "Code" : "1", "Name" : "One" } ])
+                self.assertEqual(server.Records["Test"], [ { "Code" : "1", "Name" : "One" } ])
+
+    def test_case_insensitive_records(self):
+        for name in JsonCodec.NAMES :
+            try :
+                codec = JsonCodec(name, case_insensitive = True)
+            except ImportError :
+                continue
+            decoded = codec.Decode(b'{"data" : [ { "Code" : "1", "Identifier" : { "Name" : "One" } } ]}')
+            self.assertIsInstance(decoded["DATA"][0], CaseInsensitiveDict)
+            self.assertEqual(decoded["data"][0]["identifier"]["name"], "One")
+            self.assertEqual(codec.Decode(codec.Encode(decoded)), decoded)
+
+        with FakeProfiseeServer({ "Test" : [ { "Code" : str(code), "Name" : f"Name {code}" } for code in range(10) ] }) as server :
+            with API(server.Url, "client-id", codec = JsonCodec(case_insensitive = True)) as api :
+                records = api.GetRecords("Test")
+                self.assertTrue(all(isinstance(record, CaseInsensitiveDict) for record in records))
+                self.assertEqual(records[3]["NAME"], "Name 3")
+                streamed = list(api.GetRecords("Test", stream = True))
+                self.assertEqual(streamed[3]["code"], "3")
+                self.assertIsInstance(streamed[3], CaseInsensitiveDict)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os, sys
+import copy, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Common import Common
+from Profisee.Restful.API import API
+from Profisee.Restful.Codec import JsonCodec
+from Profisee.Restful.CompactRecord import CompactRecord, RecordSchema
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_record(code) :
+    return { "Code" : str(code), "Name" : f"Customer {code}", "City" : "Cork", "Identifier" : { "Name" : "Nested" }, "LastChgDTM" : "2025-06-15T12:34:56Z", "$LastChgDataTransactionID" : code }
+
+class compact_record_unit_tests(unittest.TestCase):
+
+    def test_reads_like_a_dict(self):
+        schema = RecordSchema()
+        record = schema.Pack(make_record(1))
+        self.assertEqual(record["Code"], "1")
+        self.assertEqual(record["city"], "Cork")
+        self.assertIn("CITY", record)
+        self.assertNotIn("Missing", record)
+        self.assertEqual(len(record), 6)
+        self.assertEqual(list(record), [ "Code", "Name", "City", "Identifier", "LastChgDTM", "$LastChgDataTransactionID" ])
+        self.assertEqual(record, make_record(1))
+        self.assertEqual(record.get("Missing", "default"), "default")
+        self.assertEqual(Common.Get(record, "identifier.name"), "Nested")
+        self.assertEqual(Common.Accessor("NAME")(record), "Customer 1")
+        with self.assertRaises(KeyError) : record["Missing"]
+
+    def test_schema_is_shared(self):
+        schema = RecordSchema([ "Code", "Name" ])
+        first = schema.Pack({ "Name" : "One", "Code" : "1" })
+        second = schema.Pack({ "Code" : "2", "Country" : "IE" })
+        self.assertIs(first.Schema, second.Schema)
+        self.assertEqual(schema.Names, [ "Code", "Name", "Country" ])
+        self.assertEqual(first.ToDict(), { "Code" : "1", "Name" : "One" })
+        self.assertEqual(second.ToDict(), { "Code" : "2", "Country" : "IE" })
+        self.assertNotIn("Country", first)
+
+    def test_changes(self):
+        schema = RecordSchema()
+        record = schema.Pack({ "Code" : "1", "Name" : "One" })
+        Common.Set(record, "name", "Uno")
+        record["City"] = "Cork"
+        del record["CODE"]
+        self.assertEqual(record.ToDict(), { "Name" : "Uno", "City" : "Cork" })
+        self.assertEqual(record.pop("city"), "Cork")
+        duplicate = copy.deepcopy(record)
+        duplicate["Name"] = "Changed"
+        self.assertEqual(record["Name"], "Uno")
+        self.assertIs(duplicate.Schema, schema)
+
+    def test_payload_excludes_system_attributes(self):
+        record = RecordSchema().Pack(make_record(1))
+        self.assertNotIn("LastChgDTM", record.ToPayload())
+        self.assertNotIn("$LastChgDataTransactionID", record.ToPayload())
+        for name in JsonCodec.NAMES :
+            try :
+                codec = JsonCodec(name)
+            except ImportError :
+                continue
+            self.assertEqual(codec.Decode(codec.Encode([ record ])), [ record.ToPayload() ], name)
+
+    def test_interning(self):
+        schema = RecordSchema(intern_limit = 3)
+        records = schema.PackAll([ { "Code" : str(code), "City" : "".join([ "Co", "rk" ]) } for code in range(10) ])
+        self.assertTrue(all(record["City"] is records[0]["City"] for record in records))
+        self.assertIsNone(schema.Interned[0]) # Codes are distinct, interning them stopped
+        self.assertEqual([ record["Code"] for record in records ], [ str(code) for code in range(10) ])
+
+    def test_from_attributes(self):
+        schema = RecordSchema.from_Attributes([ { "Identifier" : { "Name" : "City" } }, { "identifier" : { "name" : "Country" } } ])
+        self.assertEqual(schema.Names, [ "Code", "Name", "City", "Country" ])
+        record = schema.Pack({ "Country" : "IE", "Code" : "1" })
+        self.assertEqual(record.Values, ("1", CompactRecord.MISSING, CompactRecord.MISSING, "IE"))
+
+    def test_merge_compact_records(self):
+        with FakeProfiseeServer({ "Customer" : [ make_record(code) for code in range(10) ] }) as server :
+            with API(server.Url, "client-id") as api :
+                schema = RecordSchema()
+                records = schema.PackAll(api.GetRecords("Customer"))
+                for record in records : Common.Set(record, "City", "Dublin")
+                report = api.MergeRecordsBulk("Customer", records)
+                self.assertEqual(report.Succeeded, 10)
+                self.assertTrue(all(record["City"] == "Dublin" for record in server.Records["Customer"]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os, sys
+import asyncio, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.GetOptions import GetOptions
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records(count) :
+    return [ { "Code" : str(code), "Name" : f"Customer {code}", "City" : "Toronto" } for code in range(count) ]
+
+class compression_unit_tests(unittest.TestCase):
+
+    def test_response_decompressed(self):
+        with FakeProfiseeServer({ "Test" : make_records(500) }) as server :
+            with API(server.Url, "client-id", compression=True) as api :
+                get_options = GetOptions()
+                get_options.PageSize = 500
+                self.assertEqual(len(api.GetRecords("Test", get_options)), 500)
+                result = api.LastResult
+                self.assertEqual(result.Response.headers["Content-Encoding"], "gzip")
+                self.assertIn("gzip", server.RequestHeaders[-1]["Accept-Encoding"])
+                self.assertEqual(result.ResponseBytes, len(result.Response.content))
+                self.assertLess(result.ResponseWireBytes, result.ResponseBytes)
+
+    def test_streamed_response_counted(self):
+        with FakeProfiseeServer({ "Test" : make_records(500) }) as server :
+            with API(server.Url, "client-id", compression=True) as api :
+                get_options = GetOptions()
+                get_options.PageSize = 500
+                self.assertEqual(len(list(api.GetRecords("Test", get_options, stream=True))), 500)
+                result = api.LastResult
+                self.assertGreater(result.ResponseBytes, 0)
+                self.assertLess(result.ResponseWireBytes, result.ResponseBytes)
+
+    def test_request_compressed_above_threshold(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id", compression=True, compression_threshold=1024) as api :
+                api.MergeRecords("Test", make_records(2))
+                self.assertNotIn("Content-Encoding", server.RequestHeaders[-1])
+                self.assertEqual(api.LastResult.RequestBytes, api.LastResult.RequestWireBytes)
+
+                api.MergeRecords("Test", make_records(200))
+                self.assertEqual(server.RequestHeaders[-1]["Content-Encoding"], "gzip")
+                self.assertLess(api.LastResult.RequestWireBytes, api.LastResult.RequestBytes)
+                self.assertEqual(len(server.Records["Test"]), 200)
+
+    def test_request_not_compressed_by_default(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id", compression_threshold=0) as api :
+                api.MergeRecords("Test", make_records(200))
+                self.assertNotIn("Content-Encoding", server.RequestHeaders[-1])
+
+    def test_identity_without_compression(self):
+        async def run(server) :
+            async with AsyncAPI(server.Url, "client-id") as api :
+                await api.GetRecords("Test")
+                self.assertEqual(server.RequestHeaders[-1]["Accept-Encoding"], "identity")
+                self.assertEqual(api.LastResult.ResponseWireBytes, api.LastResult.ResponseBytes)
+        with FakeProfiseeServer({ "Test" : make_records(50) }) as server :
+            with API(server.Url, "client-id") as api :
+                api.GetRecords("Test")
+                self.assertEqual(server.RequestHeaders[-1]["Accept-Encoding"], "identity")
+                self.assertNotIn("Content-Encoding", api.LastResult.Response.headers)
+            asyncio.run(run(server))
+
+    def test_async_wire_bytes_from_headers(self):
+        self.assertEqual(AsyncAPI.GetWireBytes({}, b"12345"), 5)
+        self.assertEqual(AsyncAPI.GetWireBytes({ "Content-Encoding" : "gzip", "Content-Length" : "3" }, b"12345"), 3)
+        self.assertIsNone(AsyncAPI.GetWireBytes({ "Content-Encoding" : "gzip" }, b"12345"))
+
+    def test_async_compression(self):
+        async def run(server) :
+            async with AsyncAPI(server.Url, "client-id", compression=True, compression_threshold=1024) as api :
+                await api.MergeRecords("Test", make_records(200))
+                self.assertEqual(server.RequestHeaders[-1]["Content-Encoding"], "gzip")
+                self.assertLess(api.LastResult.RequestWireBytes, api.LastResult.RequestBytes)
+                get_options = GetOptions()
+                get_options.PageSize = 200
+                self.assertEqual(len(await api.GetRecords("Test", get_options)), 200)
+                self.assertEqual(api.LastResult.ResponseBytes, len(api.LastResult.Response.content))
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            asyncio.run(run(server))
+
+if __name__ == '__main__':
+    unittest.main()
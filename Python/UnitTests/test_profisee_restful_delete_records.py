@@ -0,0 +1,86 @@
+import os, sys
+import asyncio, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.BulkWriter import BulkReport
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records(count) :
+    return [ { "Code" : f"{code:05}", "Name" : f"Customer {code}" } for code in range(count) ]
+
+class delete_records_unit_tests(unittest.TestCase):
+
+    def test_deletes_in_chunks(self):
+        with FakeProfiseeServer({ "Test" : make_records(1000) }) as server :
+            with API(server.Url, "client-id") as api :
+                codes = [ f"{code:05}" for code in range(0, 1000, 2) ]
+                report = api.DeleteRecordsBulk("Test", codes, max_url_length = 500)
+                self.assertEqual((report.Succeeded, report.Failed), (500, 0))
+                self.assertGreater(report.Requests, 1)
+                self.assertEqual(sum(report.ChunkSizes), 500)
+                host = server.Url.removesuffix("/profisee/")
+                self.assertTrue(all(len(host + path) <= 500 for _, path in server.Requests))
+                self.assertEqual(server.Records["Test"], make_records(1000)[1::2])
+
+    def test_codes_encoded(self):
+        records = [ { "Code" : code } for code in ("A,B", "C&D", "E F", "G%H", "Keep") ]
+        with FakeProfiseeServer({ "Test" : records }) as server :
+            with API(server.Url, "client-id") as api :
+                report = api.DeleteRecordsBulk("Test", [ "A,B", "C&D", "E F", "G%H" ])
+                self.assertEqual(report.Failed, 0)
+                self.assertEqual(server.Records["Test"], [ { "Code" : "Keep" } ])
+
+    def test_per_code_results(self):
+        with FakeProfiseeServer({ "Test" : make_records(10) }) as server :
+            with API(server.Url, "client-id") as api :
+                report = api.DeleteRecordsBulk("Test", [ "00001", "99999", "00002" ])
+                self.assertEqual(report.Outcomes, [ None, { "Code" : "99999", "Message" : "Record not found" }, None ])
+
+    def test_failed_chunk(self):
+        with FakeProfiseeServer({}) as server :
+            with API(server.Url, "client-id") as api :
+                report = api.DeleteRecordsBulk("Missing", [ "1", "2" ])
+                self.assertEqual(report.Failed, 2)
+                self.assertEqual(report.Outcomes[0]["StatusCode"], 404)
+                self.assertEqual(api.DeleteRecordsBulk("Missing", []).Requests, 0)
+
+    def test_delete_records_keeps_its_response(self):
+        records = [ { "Code" : code } for code in ("A,B", "C", "Keep") ]
+        with FakeProfiseeServer({ "Test" : records }) as server :
+            with API(server.Url, "client-id") as api :
+                response = api.DeleteRecords("Test", [ "A,B", "C" ])
+                self.assertNotIsInstance(response, BulkReport)
+                self.assertEqual(api.StatusCode, 200)
+                self.assertEqual(len(server.Requests), 1)
+                self.assertEqual(server.Records["Test"], [ { "Code" : "Keep" } ])
+
+    def test_delete_record(self):
+        with FakeProfiseeServer({ "Test" : make_records(3) }) as server :
+            with API(server.Url, "client-id") as api :
+                api.DeleteRecord("Test", "00001")
+                self.assertEqual(api.StatusCode, 200)
+                self.assertEqual([ record["Code"] for record in server.Records["Test"] ], [ "00000", "00002" ])
+
+    def test_unattributed_error_keeps_code_errors(self):
+        class Result :
+            Errors = [ { "Code" : "B", "Message" : "Record not found" }, { "Message" : "Partial failure" } ]
+            def IsSuccessStatusCode(self) : return True
+        report = BulkReport([ "A", "B", "C" ])
+        API.RecordDeleteOutcomes(report, [ 0, 1, 2 ], Result())
+        self.assertEqual(report.Outcomes, [ [ { "Message" : "Partial failure" } ], { "Code" : "B", "Message" : "Record not found" }, [ { "Message" : "Partial failure" } ] ])
+
+    def test_async_deletes_in_chunks(self):
+        with FakeProfiseeServer({ "Test" : make_records(200) }) as server :
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id") as api :
+                    return await api.DeleteRecordsBulk("Test", [ f"{code:05}" for code in range(0, 200, 2) ] + [ "99999" ], max_url_length = 300)
+            report = asyncio.run(run())
+            self.assertGreater(report.Requests, 1)
+            self.assertEqual(report.Failed, 1)
+            self.assertEqual(report.Outcomes[-1], { "Code" : "99999", "Message" : "Record not found" })
+            self.assertEqual(server.Records["Test"], make_records(200)[1::2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os, sys
+import tempfile, unittest, urllib.parse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.DeltaSync import DeltaSync, SyncState
+from Profisee.Restful.GetOptions import GetOptions
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_record(code, second, transaction_id, **fields) :
+    return { "Code" : str(code), "LastChgDTM" : f"2025-06-15T12:{second // 60:02}:{second % 60:02}.000Z", "$LastChgDataTransactionID" : transaction_id, **fields }
+
+def make_records() :
+    return { "Customer" : [ make_record(code, code * 10, code) for code in range(1, 31) ] }
+
+class delta_sync_unit_tests(unittest.TestCase):
+
+    def run_sync(self, sync, entity_name = "Customer", **kwargs) :
+        received = []
+        report = sync.Sync(entity_name, received.extend, **kwargs)
+        return (report, received)
+
+    def test_full_then_incremental(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id") as api, SyncState() as state :
+                sync = DeltaSync(api, state, overlap = 60, page_size = 10)
+                report, received = self.run_sync(sync)
+                self.assertIsNone(report.Since)
+                self.assertEqual(sorted(int(record["Code"]) for record in received), list(range(1, 31)))
+                self.assertEqual(report.Watermark.TransactionID, 30)
+
+                report, received = self.run_sync(sync)
+                self.assertEqual(received, [])
+                self.assertEqual(report.Fetched, report.Duplicates)
+                self.assertLessEqual(report.Fetched, 7) # Only the overlap window is read again
+
+                server.Records["Customer"][4].update(make_record(5, 400, 31, Name = "Changed"))
+                report, received = self.run_sync(sync)
+                self.assertEqual([ record["Code"] for record in received ], [ "5" ])
+                self.assertEqual(report.Watermark.TransactionID, 31)
+
+    def test_late_commit_inside_overlap(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id") as api, SyncState() as state :
+                sync = DeltaSync(api, state, overlap = 60, page_size = 10)
+                self.run_sync(sync)
+                server.Records["Customer"].append(make_record(31, 280, 32)) # Stamped before the watermark
+                report, received = self.run_sync(sync)
+                self.assertEqual([ record["Code"] for record in received ], [ "31" ])
+                self.assertEqual(report.Watermark.TransactionID, 30)
+
+    def test_ties_larger_than_page(self):
+        records = { "Customer" : [ make_record(code, 10, 1) for code in range(25) ] + [ make_record(99, 20, 2) ] }
+        with FakeProfiseeServer(records) as server :
+            server.ShuffleTies = True # Pages of a tie only line up when the order is total
+            with API(server.Url, "client-id") as api, SyncState() as state :
+                for _ in range(5) :
+                    state.Reset("Customer")
+                    report, received = self.run_sync(DeltaSync(api, state, page_size = 10))
+                    self.assertEqual(len(received), 26)
+                    self.assertEqual(len({ record["Code"] for record in received }), 26)
+                self.assertIn("OrderBy=[LastChgDTM], [Code]", urllib.parse.unquote(server.Requests[-1][1]))
+
+    def test_watermark_with_offset(self):
+        records = { "Customer" : [ { "Code" : "1", "LastChgDTM" : "2025-06-15T14:00:00.000+02:00", "$LastChgDataTransactionID" : 1 } ] }
+        with FakeProfiseeServer(records) as server :
+            with API(server.Url, "client-id") as api, SyncState() as state :
+                sync = DeltaSync(api, state, overlap = 60, page_size = 10)
+                self.run_sync(sync)
+                self.run_sync(sync)
+                self.assertIn("[LastChgDTM] ge '2025-06-15T11:59:00.000Z'", urllib.parse.unquote_plus(server.Requests[-1][1]))
+
+    def test_failed_handler_keeps_watermark(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id") as api, SyncState() as state :
+                sync = DeltaSync(api, state, overlap = 60, page_size = 10)
+                self.run_sync(sync)
+                watermark = state.GetWatermark("Customer")
+                server.Records["Customer"].append(make_record(31, 400, 31))
+                def fail(records) : raise RuntimeError("Target is down")
+                with self.assertRaises(RuntimeError) : sync.Sync("Customer", fail)
+                self.assertEqual(state.GetWatermark("Customer"), watermark)
+                report, received = self.run_sync(sync)
+                self.assertEqual([ record["Code"] for record in received ], [ "31" ])
+
+    def test_filter_and_attributes(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id") as api, SyncState() as state :
+                options = GetOptions("[Code] ge '3'")
+                options.Attributes = [ "Name" ]
+                report, received = self.run_sync(DeltaSync(api, state, page_size = 10), getOptions = options)
+                self.assertTrue(all(record["Code"] >= "3" for record in received))
+                self.assertTrue(all("LastChgDTM" in record for record in received))
+                self.assertEqual(options.Filter, "[Code] ge '3'")
+
+    def test_state_file(self):
+        with tempfile.TemporaryDirectory() as directory :
+            path = os.path.join(directory, "sync.db")
+            with FakeProfiseeServer(make_records()) as server :
+                with API(server.Url, "client-id") as api :
+                    with SyncState(path) as state : self.run_sync(DeltaSync(api, state, overlap = 60, page_size = 10))
+                    with SyncState(path) as state :
+                        self.assertEqual(state.GetWatermark("customer").TransactionID, 30)
+                        report, received = self.run_sync(DeltaSync(api, state, overlap = 60, page_size = 10))
+                        self.assertEqual(received, [])
+                        state.Reset("Customer")
+                        report, received = self.run_sync(DeltaSync(api, state, page_size = 10))
+                        self.assertEqual(len(received), 30)
+
+if __name__ == '__main__':
+    unittest.main()
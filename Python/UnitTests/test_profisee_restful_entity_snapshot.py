@@ -0,0 +1,144 @@
+import os, sys
+import datetime, tempfile, threading, unittest, unittest.mock
+
+import numpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.DeltaSync import Watermark
+from Profisee.Restful.EntitySnapshot import EntitySnapshot, SnapshotStore, SnapshotWriter
+from Profisee.Restful.RecordBatch import RecordBatch
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+ATTRIBUTES = [
+    { "Identifier" : { "Name" : "City" }, "DataType" : 1 },
+    { "Identifier" : { "Name" : "CreditLimit" }, "DataType" : 2 }
+]
+
+def make_records(count) :
+    return [ {
+        "Code" : f"C{code:04}",
+        "City" : [ "Cork", "Dublin", None ][code % 3],
+        "CreditLimit" : None if code % 4 == 0 else code * 1.5,
+        "LastChgDTM" : f"2025-06-{code % 28 + 1:02}T12:34:56.000Z",
+        "$LastChgDataTransactionID" : code
+    } for code in range(count) ]
+
+class entity_snapshot_unit_tests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "Customer.snapshot")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_read(self):
+        batch = RecordBatch.from_Records(make_records(100), ATTRIBUTES)
+        SnapshotWriter.Write(self.path, batch, ATTRIBUTES, entity_name = "Customer")
+        with EntitySnapshot(self.path) as snapshot :
+            self.assertEqual(len(snapshot), 100)
+            self.assertEqual(snapshot.EntityName, "Customer")
+            self.assertEqual(snapshot.Attributes, ATTRIBUTES)
+            self.assertEqual(snapshot.Names, batch.Names)
+            self.assertEqual(snapshot.Watermark, Watermark(datetime.datetime(2025, 6, 28, 12, 34, 56, tzinfo = datetime.timezone.utc), 83))
+            self.assertIsInstance(snapshot.Column("creditlimit").Values, numpy.memmap)
+            self.assertEqual(snapshot.ToBatch().ToRecords(), batch.ToRecords())
+            self.assertEqual(snapshot.Get("C0001"), { "Code" : "C0001", "City" : "Dublin", "CreditLimit" : 1.5, "LastChgDTM" : datetime.datetime(2025, 6, 2, 12, 34, 56), "$LastChgDataTransactionID" : 1.0 })
+            self.assertEqual(snapshot.Get("c0004"), { "Code" : "C0004", "City" : "Dublin", "LastChgDTM" : datetime.datetime(2025, 6, 5, 12, 34, 56), "$LastChgDataTransactionID" : 4.0 })
+            self.assertIsNone(snapshot.Get("C0100"))
+            self.assertNotIn("", snapshot)
+            self.assertTrue(all(snapshot.Find(f"C{code:04}") == code for code in range(100)))
+
+    def test_point_lookup_reads_few_codes(self):
+        SnapshotWriter.Write(self.path, RecordBatch.from_Records(make_records(1000)))
+        with EntitySnapshot(self.path) as snapshot :
+            read = []
+            keys = snapshot.CodeKeys
+            class Counting :
+                def __len__(self) : return len(keys)
+                def __getitem__(self, index) :
+                    read.append(index)
+                    return keys[index]
+            snapshot.CodeKeys = Counting()
+            self.assertEqual(snapshot.Find("C0777"), 777)
+            self.assertLessEqual(len(read), 12)
+
+    def test_rejects_bad_files(self):
+        batch = RecordBatch.from_Records([ { "Code" : "A" }, { "Code" : "a" } ])
+        with self.assertRaises(ValueError) : SnapshotWriter.Write(self.path, batch)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(os.listdir(self.directory.name), []) # No temporary file left behind
+        with open(self.path, "wb") as file : file.write(b"not a snapshot" * 4)
+        with self.assertRaises(ValueError) : EntitySnapshot(self.path)
+
+    def test_concurrent_writers(self):
+        errors = []
+        def write(count) :
+            try :
+                SnapshotWriter.Write(self.path, RecordBatch.from_Records(make_records(count), ATTRIBUTES))
+            except Exception as exception :
+                errors.append(exception)
+        threads = [ threading.Thread(target = write, args = (count,)) for count in range(100, 108) ]
+        for thread in threads : thread.start()
+        for thread in threads : thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(os.listdir(self.directory.name), [ "Customer.snapshot" ])
+        with EntitySnapshot(self.path) as snapshot : self.assertIn(len(snapshot), range(100, 108))
+
+    def test_replace_retries_while_file_is_open(self):
+        replace = os.replace
+        calls = []
+        def locked(source, destination) :
+            calls.append(source)
+            if len(calls) < 3 : raise PermissionError(13, "The process cannot access the file because it is being used by another process")
+            replace(source, destination)
+        with unittest.mock.patch("os.replace", locked), unittest.mock.patch("time.sleep") :
+            SnapshotWriter.Write(self.path, RecordBatch.from_Records(make_records(10), ATTRIBUTES))
+        self.assertEqual(len(calls), 3)
+        with EntitySnapshot(self.path) as snapshot : self.assertEqual(len(snapshot), 10)
+
+        def always(source, destination) : raise PermissionError(13, "The process cannot access the file because it is being used by another process")
+        with unittest.mock.patch("os.replace", always), unittest.mock.patch("time.sleep") :
+            with self.assertRaises(PermissionError) : SnapshotWriter.Write(self.path, RecordBatch.from_Records(make_records(5), ATTRIBUTES))
+        self.assertEqual(os.listdir(self.directory.name), [ "Customer.snapshot" ])
+
+    def test_empty_snapshot(self):
+        SnapshotWriter.Write(self.path, RecordBatch.from_Records([], names = [ "Code", "City" ]))
+        with EntitySnapshot(self.path) as snapshot :
+            self.assertEqual(len(snapshot), 0)
+            self.assertIsNone(snapshot.Watermark)
+            self.assertIsNone(snapshot.Get("C0001"))
+            self.assertEqual(len(snapshot.ToBatch()), 0)
+
+    def test_store_pulls_only_when_stale(self):
+        with FakeProfiseeServer({ "Customer" : make_records(120) }) as server :
+            server.Attributes["Customer"] = ATTRIBUTES
+            with API(server.Url, "client-id") as api :
+                store = SnapshotStore(self.directory.name, max_age = 3600, check_changes = True)
+                with store.Open(api, "Customer") as snapshot :
+                    self.assertEqual(len(snapshot), 120)
+                    self.assertEqual(snapshot.Column("CreditLimit").Values.dtype, numpy.float64)
+                pulls = len(server.Requests)
+                with store.Open(api, "Customer") as snapshot :
+                    self.assertEqual(len(snapshot), 120)
+                self.assertEqual(len(server.Requests), pulls + 1) # Only the check for changes
+
+                server.Records["Customer"].append({ "Code" : "C9999", "City" : "Cork", "LastChgDTM" : "2025-07-01T00:00:00.000Z", "$LastChgDataTransactionID" : 999 })
+                with store.Open(api, "Customer") as snapshot :
+                    self.assertEqual(snapshot.Get("C9999")["City"], "Cork")
+
+                store.MaxAge = -1
+                store.CheckChanges = False
+                requests = len(server.Requests)
+                with store.Open(api, "Customer") as snapshot :
+                    self.assertEqual(len(snapshot), 121)
+                self.assertGreater(len(server.Requests), requests + 1)
+
+    def test_from_settings(self):
+        self.assertIsNone(SnapshotStore.from_Settings({}))
+        store = SnapshotStore.from_Settings({ "Snapshots" : { "Directory" : self.directory.name, "MaxAge" : 60 } })
+        self.assertEqual((store.Directory, store.MaxAge, store.CheckChanges), (self.directory.name, 60, False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os, sys
+import asyncio, threading, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.APIResult import APIError
+from Profisee.Restful.GetOptions import GetOptions
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records(count) :
+    return [ { "Code" : f"{code:05}", "Name" : f"Customer {code}" } for code in range(count) ]
+
+def page_options(page_size) :
+    get_options = GetOptions()
+    get_options.PageSize = page_size
+    return get_options
+
+class iter_records_unit_tests(unittest.TestCase):
+
+    def test_walks_all_pages(self):
+        with FakeProfiseeServer({ "Test" : make_records(230) }) as server :
+            with API(server.Url, "client-id") as api :
+                get_options = page_options(50)
+                for prefetch in (0, 1, 3) :
+                    server.Requests.clear()
+                    self.assertEqual(list(api.IterRecords("Test", get_options, prefetch)), make_records(230))
+                    self.assertEqual(len(server.Requests), 5) # The short fifth page ends the walk
+                self.assertEqual(get_options.PageNumber, 1)
+
+    def test_stops_on_empty_page(self):
+        with FakeProfiseeServer({ "Test" : make_records(100) }) as server :
+            with API(server.Url, "client-id") as api :
+                self.assertEqual(len(list(api.IterRecords("Test", page_options(50)))), 100)
+                self.assertEqual(len(server.Requests), 3)
+
+    def test_filter_and_start_page(self):
+        with FakeProfiseeServer({ "Test" : make_records(100) }) as server :
+            with API(server.Url, "client-id") as api :
+                get_options = GetOptions("[Code] ge '00050'")
+                get_options.PageSize = 20
+                get_options.PageNumber = 2
+                self.assertEqual(list(api.IterRecords("Test", get_options)), make_records(100)[70:])
+
+    def test_error_raises(self):
+        with FakeProfiseeServer({}) as server :
+            with API(server.Url, "client-id") as api :
+                with self.assertRaises(APIError) as context :
+                    list(api.IterRecords("Missing"))
+                self.assertEqual(context.exception.Result.StatusCode, 404)
+
+    def test_abandoned_iterator_stops_worker(self):
+        with FakeProfiseeServer({ "Test" : make_records(1000) }) as server :
+            with API(server.Url, "client-id") as api :
+                records = api.IterRecords("Test", page_options(10), prefetch = 2)
+                next(records)
+                records.close()
+                for thread in threading.enumerate() :
+                    if thread.name == "IterRecords-Test" : thread.join(2)
+                self.assertLessEqual(len(server.Requests), 5)
+
+    def test_async_walks_all_pages(self):
+        async def run(server) :
+            async with AsyncAPI(server.Url, "client-id") as api :
+                return [ record async for record in api.IterRecords("Test", page_options(50)) ]
+        with FakeProfiseeServer({ "Test" : make_records(230) }) as server :
+            self.assertEqual(asyncio.run(run(server)), make_records(230))
+            self.assertEqual(len(server.Requests), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os, sys, json
+import asyncio, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.APIResult import APIError
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.GetOptions import GetOptions
+from Profisee.Restful.JsonStream import JsonStream
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def chunked(payload, size: int) :
+    data = json.dumps(payload).encode("utf-8")
+    return [ data[index:index + size] for index in range(0, len(data), size) ]
+
+class json_stream_unit_tests(unittest.TestCase):
+
+    def test_items_across_chunks(self):
+        payload = { "pageNumber" : 1, "data" : [ { "Code" : str(code), "Name" : f"Ünïcode \"{code}\"", "Amount" : code * 1.25, "Tags" : [ 1, None, True ] } for code in range(25) ], "totalRecords" : 25 }
+        for size in (1, 3, 7, 64, 100000) :
+            stream = JsonStream(chunked(payload, size))
+            self.assertEqual(list(stream), payload["data"])
+            self.assertEqual(stream.Envelope, { "pageNumber" : 1, "totalRecords" : 25 })
+
+    def test_scalar_items(self):
+        self.assertEqual(list(JsonStream(chunked({ "data" : [ 12345, "a", 1.5, False, None ] }, 2))), [ 12345, "a", 1.5, False, None ])
+
+    def test_empty(self):
+        self.assertEqual(list(JsonStream(chunked({ "data" : [] }, 4))), [])
+        self.assertEqual(list(JsonStream(chunked({}, 4))), [])
+
+    def test_key_is_case_insensitive(self):
+        self.assertEqual(list(JsonStream(chunked({ "Data" : [ 1, 2 ] }, 4))), [ 1, 2 ])
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError) : list(JsonStream([ b'{"data": [ {"Code": "1"}, {"Co' ]))
+
+    def test_stream_records(self):
+        records = [ { "Code" : f"{code:04d}", "Name" : f"Record {code}" } for code in range(500) ]
+        with FakeProfiseeServer({ "Test" : records }) as server :
+            with API(server.Url, "client-id") as api :
+                get_options = GetOptions()
+                get_options.PageSize = 1000
+                streamed = api.GetRecords("Test", get_options, stream = True)
+                self.assertEqual(len(server.Requests), 0)
+                self.assertEqual(list(streamed), records)
+                self.assertEqual(api.StatusCode, 200)
+                self.assertEqual(list(api.StreamRecords("Test", GetOptions("[Code] eq '0007'"), chunk_size = 16)), [ records[7] ])
+
+    def test_stream_records_error(self):
+        with FakeProfiseeServer({}) as server :
+            with API(server.Url, "client-id") as api :
+                with self.assertRaises(APIError) as context : list(api.StreamRecords("Missing"))
+                self.assertEqual(context.exception.Result.StatusCode, 404)
+
+    def test_async_stream_records(self):
+        records = [ { "Code" : f"{code:04d}", "Name" : f"Record {code}" } for code in range(50) ]
+        with FakeProfiseeServer({ "Test" : records }) as server :
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id") as api :
+                    streamed = await api.GetRecords("Test", stream = True)
+                    self.assertEqual(len(server.Requests), 0)
+                    found = [ record async for record in streamed ]
+                    with self.assertRaises(APIError) :
+                        async for record in await api.GetRecords("Missing", stream = True) : pass
+                    return found
+            self.assertEqual(asyncio.run(run()), records)
+
+if __name__ == '__main__':
+    unittest.main()
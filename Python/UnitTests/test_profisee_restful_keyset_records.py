@@ -0,0 +1,74 @@
+import os, sys
+import asyncio, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.GetOptions import GetOptions
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records(count) :
+    return [ { "Code" : f"{code:05}", "Name" : f"Customer {code}", "Region" : "East" if code % 2 else "West" } for code in range(count) ]
+
+def page_options(page_size, filter = "") :
+    get_options = GetOptions(filter)
+    get_options.PageSize = page_size
+    return get_options
+
+class keyset_records_unit_tests(unittest.TestCase):
+
+    def test_quote(self):
+        self.assertEqual(GetOptions.Quote("O'Brien"), "'O''Brien'")
+        self.assertEqual(GetOptions.Quote(12), "'12'")
+
+    def test_walks_all_pages(self):
+        records = make_records(230)
+        with FakeProfiseeServer({ "Test" : list(reversed(records)) }) as server :
+            with API(server.Url, "client-id") as api :
+                get_options = page_options(50)
+                self.assertEqual(list(api.IterRecordsByCode("Test", get_options)), records)
+                self.assertEqual(len(server.Requests), 5)
+                self.assertEqual(get_options.Filter, "")
+                self.assertTrue(all("PageNumber" not in path for _, path in server.Requests))
+
+    def test_combined_with_filter(self):
+        with FakeProfiseeServer({ "Test" : make_records(100) }) as server :
+            with API(server.Url, "client-id") as api :
+                records = list(api.IterRecordsByCode("Test", page_options(10, "[Region] eq 'East' or [Code] eq '00000'")))
+                self.assertEqual(records, [ record for record in make_records(100) if record["Region"] == "East" or record["Code"] == "00000" ])
+
+    def test_resume_from_cursor(self):
+        with FakeProfiseeServer({ "Test" : make_records(100) }) as server :
+            with API(server.Url, "client-id") as api :
+                self.assertEqual(list(api.IterRecordsByCode("Test", page_options(30), after = "00059")), make_records(100)[60:])
+
+    def test_quoted_codes(self):
+        records = [ { "Code" : code } for code in ("A", "B'1", "B'2", "C") ]
+        with FakeProfiseeServer({ "Test" : records }) as server :
+            with API(server.Url, "client-id") as api :
+                self.assertEqual(list(api.IterRecordsByCode("Test", page_options(1))), records)
+
+    def test_insert_during_scan(self):
+        records = make_records(100)
+        with FakeProfiseeServer({ "Test" : list(records) }) as server :
+            with API(server.Url, "client-id") as api :
+                iterator = api.IterRecordsByCode("Test", page_options(10))
+                scanned = [ next(iterator) for _ in range(15) ]
+                server.Records["Test"].insert(0, { "Code" : "00001A" }) # Before the cursor, does not shift later pages
+                scanned.extend(iterator)
+                self.assertEqual(scanned, records)
+
+    def test_async(self):
+        records = make_records(230)
+        with FakeProfiseeServer({ "Test" : list(reversed(records)) }) as server :
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id") as api :
+                    walked = [ record async for record in api.IterRecordsByCode("Test", page_options(50)) ]
+                    resumed = [ record async for record in api.IterRecordsByCode("Test", page_options(50, "[Region] eq 'East'"), after = "00199") ]
+                    return walked, resumed
+            walked, resumed = asyncio.run(run())
+        self.assertEqual(walked, records)
+        self.assertEqual(resumed, [ record for record in records[200:] if record["Region"] == "East" ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os, sys
+import asyncio, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.APIResult import APIError, ConsistencyError
+from Profisee.Restful.GetOptions import GetOptions
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records(count) :
+    return [ { "Code" : f"{code:05}", "Name" : f"Customer {code}" } for code in range(count) ]
+
+def page_options(page_size, filter = "") :
+    get_options = GetOptions(filter)
+    get_options.PageSize = page_size
+    return get_options
+
+class parallel_records_unit_tests(unittest.TestCase):
+
+    def test_count_records(self):
+        with FakeProfiseeServer({ "Test" : make_records(230) }) as server :
+            with API(server.Url, "client-id") as api :
+                self.assertEqual(api.CountRecords("Test"), 230)
+                self.assertEqual(api.CountRecords("Test", GetOptions("[Code] lt '00010'")), 10)
+
+    def test_ordered(self):
+        records = make_records(230)
+        with FakeProfiseeServer({ "Test" : list(reversed(records)) }) as server :
+            with API(server.Url, "client-id") as api :
+                get_options = page_options(25)
+                self.assertEqual(list(api.IterRecordsParallel("Test", get_options, max_workers = 3)), records)
+                self.assertEqual(get_options.OrderBy, "")
+                self.assertEqual(len(server.Requests), 12) # Count, 10 pages and the recount
+
+    def test_as_completed(self):
+        with FakeProfiseeServer({ "Test" : make_records(230) }, latency = 0.01) as server :
+            with API(server.Url, "client-id") as api :
+                records = list(api.IterRecordsParallel("Test", page_options(25), max_workers = 4, ordered = False))
+                self.assertCountEqual(records, make_records(230))
+
+    def test_filter(self):
+        with FakeProfiseeServer({ "Test" : make_records(230) }) as server :
+            with API(server.Url, "client-id") as api :
+                records = list(api.IterRecordsParallel("Test", page_options(7, "[Code] ge '00200'")))
+                self.assertEqual(records, make_records(230)[200:])
+
+    def test_empty_entity(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                self.assertEqual(list(api.IterRecordsParallel("Test")), [])
+
+    def test_insert_during_scan(self):
+        with FakeProfiseeServer({ "Test" : make_records(230) }) as server :
+            with API(server.Url, "client-id") as api :
+                records = api.IterRecordsParallel("Test", page_options(10), max_workers = 2)
+                next(records)
+                server.Records["Test"].append({ "Code" : "00000A", "Name" : "Inserted" })
+                with self.assertRaises(ConsistencyError) as context :
+                    list(records)
+                self.assertEqual(context.exception.Expected, 230)
+                self.assertGreater(len(context.exception.Duplicates), 0)
+
+    def test_error_raises(self):
+        with FakeProfiseeServer({}) as server :
+            with API(server.Url, "client-id") as api :
+                with self.assertRaises(APIError) :
+                    list(api.IterRecordsParallel("Missing"))
+
+    def test_async(self):
+        records = make_records(230)
+        with FakeProfiseeServer({ "Test" : list(reversed(records)) }) as server :
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id") as api :
+                    count = await api.CountRecords("Test", GetOptions("[Code] lt '00010'"))
+                    ordered = [ record async for record in api.IterRecordsParallel("Test", page_options(25), max_workers = 3) ]
+                    completed = [ record async for record in api.IterRecordsParallel("Test", page_options(25), ordered = False) ]
+                    return count, ordered, completed
+            count, ordered, completed = asyncio.run(run())
+        self.assertEqual(count, 10)
+        self.assertEqual(ordered, records)
+        self.assertEqual(sorted(completed, key = lambda record : record["Code"]), records)
+
+    def test_async_insert_during_scan(self):
+        with FakeProfiseeServer({ "Test" : make_records(100) }) as server :
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id") as api :
+                    async for record in api.IterRecordsParallel("Test", page_options(10), max_workers = 1) :
+                        if record["Code"] == "00050" : server.Records["Test"].append({ "Code" : "99999" })
+            with self.assertRaises(ConsistencyError) : asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
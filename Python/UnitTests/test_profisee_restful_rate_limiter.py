@@ -0,0 +1,81 @@
+import os, sys, time
+import asyncio, threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.RateLimiter import RateLimiter, TokenBucket
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class rate_limiter_unit_tests(unittest.TestCase):
+
+    def test_get_family(self):
+        self.assertEqual(RateLimiter.GetFamily("rest/v1/Records/Customer?PageSize=10"), "records")
+        self.assertEqual(RateLimiter.GetFamily("rest/v1/Monitor/activities"), "monitor")
+        self.assertEqual(RateLimiter.GetFamily("rest/v1/Matching"), "matching")
+
+    def test_from_settings(self):
+        self.assertIsNone(RateLimiter.from_Settings({}))
+        limiter = RateLimiter.from_Settings({ "RateLimits" : { "Records" : { "MaxInFlight" : 2 }, "Default" : { "RequestsPerSecond" : 5 } } })
+        self.assertIs(limiter.GetLimit("rest/v1/Records/Customer"), limiter.Limits["records"])
+        self.assertIs(limiter.GetLimit("rest/v1/Connect/Strategies/Test/Batch"), limiter.Limits["default"])
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(10, burst=2)
+        self.assertEqual(bucket.Reserve(), 0)
+        self.assertEqual(bucket.Reserve(), 0)
+        self.assertAlmostEqual(bucket.Reserve(), 0.1, delta=0.01)
+        self.assertAlmostEqual(bucket.Reserve(), 0.2, delta=0.01)
+
+    def test_rate_is_limited(self):
+        limiter = RateLimiter({ "Records" : { "RequestsPerSecond" : 50, "Burst" : 1 } })
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id", rate_limiter=limiter) as api :
+                started = time.perf_counter()
+                for _ in range(6) : api.GetRecords("Test")
+                self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+                self.assertGreater(api.LastResult.QueueTime, 0)
+
+    def test_max_in_flight_threads(self):
+        limiter = RateLimiter({ "Records" : { "MaxInFlight" : 2 } })
+        with FakeProfiseeServer({ "Test" : [] }, latency=0.05) as server :
+            with API(server.Url, "client-id", rate_limiter=limiter) as api :
+                started = time.perf_counter()
+                threads = [ threading.Thread(target=api.GetRecords, args=("Test",)) for _ in range(6) ]
+                for thread in threads : thread.start()
+                for thread in threads : thread.join()
+                self.assertGreaterEqual(time.perf_counter() - started, 0.15)
+
+    def test_stream_holds_slot_until_closed(self):
+        limiter = RateLimiter({ "Records" : { "MaxInFlight" : 1 } })
+        with FakeProfiseeServer({ "Test" : [ { "Code" : str(code) } for code in range(5) ] }) as server :
+            with API(server.Url, "client-id", rate_limiter=limiter) as api :
+                streamed = api.GetRecords("Test", stream=True)
+                self.assertEqual(next(streamed), { "Code" : "0" })
+                other = threading.Thread(target=api.GetRecords, args=("Test",))
+                other.start()
+                other.join(0.2)
+                self.assertTrue(other.is_alive()) # Waits for the slot the unread stream holds
+                self.assertEqual(len(list(streamed)), 4)
+                other.join(5)
+                self.assertFalse(other.is_alive())
+
+                streamed = api.GetRecords("Test", stream=True)
+                next(streamed)
+                streamed.close() # Abandoned streams free the slot too
+                api.GetRecords("Test")
+                self.assertEqual(api.StatusCode, 200)
+
+    def test_max_in_flight_asyncio(self):
+        limiter = RateLimiter({ "Default" : { "MaxInFlight" : 2 } })
+        async def run(url) :
+            async with AsyncAPI(url, "client-id", rate_limiter=limiter) as api :
+                await asyncio.gather(*[ api.GetRecords("Test") for _ in range(6) ])
+        with FakeProfiseeServer({ "Test" : [] }, latency=0.05) as server :
+            started = time.perf_counter()
+            asyncio.run(run(server.Url))
+            self.assertGreaterEqual(time.perf_counter() - started, 0.15)
+
+if __name__ == '__main__':
+    unittest.main()
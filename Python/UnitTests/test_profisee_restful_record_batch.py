@@ -0,0 +1,107 @@
+import os, sys
+import datetime, unittest
+
+import numpy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.Enums import AttributeDataType
+from Profisee.Restful.RecordBatch import RecordBatch
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+ATTRIBUTES = [
+    { "Identifier" : { "Name" : "City" }, "DataType" : 1 },
+    { "Identifier" : { "Name" : "CreditLimit" }, "DataType" : 2 },
+    { "Identifier" : { "Name" : "Since" }, "DataType" : 4 }
+]
+
+def make_records(count) :
+    return [ {
+        "Code" : str(code),
+        "City" : [ "Cork", "Dublin", None ][code % 3],
+        "CreditLimit" : None if code % 4 == 0 else code * 1.5,
+        "Since" : f"2024-01-{code % 28 + 1:02}",
+        "LastChgDTM" : "2025-06-15T14:34:56+02:00" if code == 0 else "2025-06-15T12:34:56.000Z"
+    } for code in range(count) ]
+
+class record_batch_unit_tests(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = RecordBatch.from_Records(make_records(20), ATTRIBUTES, chunk_size = 7)
+
+    def test_typed_columns(self):
+        batch = self.batch
+        self.assertEqual(len(batch), 20)
+        self.assertEqual(batch.Names, [ "Code", "City", "CreditLimit", "Since", "LastChgDTM" ])
+        self.assertEqual(batch["creditlimit"].Values.dtype, numpy.float64)
+        self.assertEqual(batch["Since"].Values.dtype, numpy.dtype("datetime64[D]"))
+        self.assertEqual(batch["LastChgDTM"].DataType, AttributeDataType.DateTime)
+        self.assertTrue((batch["LastChgDTM"].Values == numpy.datetime64("2025-06-15T12:34:56")).all())
+        self.assertEqual(batch["City"].Values.dtype, numpy.int32)
+        self.assertEqual(list(batch["City"].Categories), [ "Cork", "Dublin" ])
+        self.assertEqual(batch["City"].Mask.sum(), 6)
+        self.assertEqual(batch["CreditLimit"].Mask.sum(), 5)
+        strings = batch["City"].Strings()
+        self.assertIs(strings[0], strings[3])
+
+    def test_round_trip(self):
+        records = self.batch.ToRecords()
+        self.assertEqual(records[1], { "Code" : "1", "City" : "Dublin", "CreditLimit" : 1.5, "Since" : datetime.date(2024, 1, 2), "LastChgDTM" : datetime.datetime(2025, 6, 15, 12, 34, 56) })
+        self.assertNotIn("CreditLimit", records[0])
+
+    def test_slice_is_a_view(self):
+        part = self.batch.Slice(2, 5)
+        self.assertEqual(len(part), 3)
+        self.assertTrue(numpy.shares_memory(part["CreditLimit"].Values, self.batch["CreditLimit"].Values))
+        self.assertIs(part["City"].Categories, self.batch["City"].Categories)
+        self.assertEqual([ record["Code"] for record in part.ToRecords() ], [ "2", "3", "4" ])
+
+    def test_select_and_filter(self):
+        selected = self.batch.Select([ "code", "City" ])
+        self.assertEqual(selected.Names, [ "Code", "City" ])
+        self.assertIs(selected["City"], self.batch["City"])
+        cork = self.batch.Filter(self.batch["City"].Equals("Cork"))
+        self.assertEqual(len(cork), 7)
+        rich = self.batch.Filter((self.batch["CreditLimit"].Values > 20) & self.batch["City"].IsIn([ "Cork", "Dublin" ]))
+        self.assertEqual([ record["Code"] for record in rich.ToRecords() ], [ "15", "18", "19" ])
+        self.assertEqual(self.batch["Since"].Equals(datetime.date(2024, 1, 2)).sum(), 1)
+
+    def test_group_by(self):
+        groups = { record.get("City") : record for record in self.batch.GroupBy("City", { "CreditLimit" : [ "sum", "mean", "min", "max", "count" ], "Since" : "max" }).ToRecords() }
+        self.assertEqual(set(groups), { "Cork", "Dublin", None })
+        cork = groups["Cork"]
+        limits = [ code * 1.5 for code in range(0, 20, 3) if code % 4 != 0 ]
+        self.assertEqual(cork["Count"], 7)
+        self.assertEqual(cork["CreditLimit_count"], len(limits))
+        self.assertAlmostEqual(cork["CreditLimit_sum"], sum(limits))
+        self.assertAlmostEqual(cork["CreditLimit_mean"], sum(limits) / len(limits))
+        self.assertEqual((cork["CreditLimit_min"], cork["CreditLimit_max"]), (min(limits), max(limits)))
+        self.assertEqual(cork["Since_max"], datetime.date(2024, 1, 19))
+        self.assertEqual(self.batch.GroupBy([ "City", "CreditLimit" ]).Length, 18)
+        with self.assertRaises(ValueError) : self.batch.GroupBy("City", { "Since" : "sum" })
+        with self.assertRaises(ValueError) : self.batch.GroupBy("City", { "City" : "max" })
+
+    def test_from_iter_records(self):
+        with FakeProfiseeServer({ "Customer" : make_records(120) }) as server :
+            with API(server.Url, "client-id") as api :
+                batch = RecordBatch.from_Records(api.IterRecords("Customer"), ATTRIBUTES, chunk_size = 50)
+        self.assertEqual(len(batch), 120)
+        self.assertEqual(batch["CreditLimit"].Mask.sum(), 30)
+
+    def test_default_names(self):
+        batch = RecordBatch.from_Records([ { "Code" : "a" }, { "Code" : "b", "Extra" : 5 } ])
+        self.assertEqual(batch.Names, [ "Code", "Extra" ])
+        self.assertEqual(batch.ToRecords(), [ { "Code" : "a" }, { "Code" : "b", "Extra" : "5" } ])
+        batch = RecordBatch.from_Records([ { "code" : "a" }, { "Code" : "b", "city" : "Cork" } ], ATTRIBUTES)
+        self.assertEqual(batch.Names, [ "code", "city", "CreditLimit", "Since" ])
+        self.assertEqual(batch["Since"].Mask.sum(), 2)
+        self.assertEqual(RecordBatch.from_Records([], ATTRIBUTES).Names, [ "City", "CreditLimit", "Since" ])
+
+    def test_empty(self):
+        batch = RecordBatch.from_Records([], ATTRIBUTES, names = [ "Code", "CreditLimit" ])
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(batch["CreditLimit"].Values.dtype, numpy.float64)
+        self.assertEqual(batch.GroupBy("Code").Length, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os, sys
+import asyncio, time, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.RecordCache import RecordCache
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records() :
+    return { "Settings" : [ { "Code" : "SQLCONNECTIONSTRING", "Value" : "Server=one" }, { "Code" : "Other", "Value" : "x" } ], "Customer" : [ { "Code" : "1", "Name" : "One" } ] }
+
+class record_cache_unit_tests(unittest.TestCase):
+
+    def test_read_through(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id", record_cache = RecordCache(ttls = { "Settings" : 300 }, default_ttl = 0)) as api :
+                for _ in range(5) : self.assertEqual(api.GetRecord("Settings", "SQLCONNECTIONSTRING")["Value"], "Server=one")
+                self.assertEqual(len(server.Requests), 1)
+                self.assertEqual((api.RecordCache.Hits, api.RecordCache.Misses), (4, 1))
+                self.assertEqual(api.GetRecord("settings", "sqlconnectionstring")["Value"], "Server=one")
+                self.assertEqual(len(server.Requests), 1)
+
+                for _ in range(2) : api.GetRecord("Customer", "1")
+                self.assertEqual(len(server.Requests), 3) # default_ttl 0 leaves other entities uncached
+
+    def test_returns_copies(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id", record_cache = RecordCache()) as api :
+                api.GetRecord("Settings", "Other")["Value"] = "changed"
+                self.assertEqual(api.GetRecord("Settings", "Other")["Value"], "x")
+
+    def test_not_found_is_cached(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id", record_cache = RecordCache()) as api :
+                self.assertIsNone(api.GetRecord("Settings", "Missing"))
+                self.assertIsNone(api.GetRecord("Settings", "Missing"))
+                self.assertEqual(len(server.Requests), 1)
+
+    def test_ttl_expires(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id", record_cache = RecordCache(default_ttl = 0.05)) as api :
+                api.GetRecord("Settings", "Other")
+                time.sleep(0.1)
+                api.GetRecord("Settings", "Other")
+                self.assertEqual(len(server.Requests), 2)
+
+    def test_lru_eviction(self):
+        cache = RecordCache(max_size = 2)
+        cache.Put("Test", "1", { "Code" : "1" })
+        cache.Put("Test", "2", { "Code" : "2" })
+        self.assertTrue(cache.Get("Test", "1")[0])
+        cache.Put("Test", "3", { "Code" : "3" })
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.Evictions, 1)
+        self.assertFalse(cache.Get("Test", "2")[0])
+        self.assertTrue(cache.Get("Test", "1")[0])
+        self.assertTrue(cache.Get("Test", "3")[0])
+
+    def test_writes_invalidate(self):
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id", record_cache = RecordCache()) as api :
+                api.GetRecord("Settings", "SQLCONNECTIONSTRING")
+                api.GetRecord("Settings", "Other")
+                api.MergeRecord("Settings", { "Code" : "SQLCONNECTIONSTRING", "Value" : "Server=two" })
+                self.assertEqual(api.GetRecord("Settings", "SQLCONNECTIONSTRING")["Value"], "Server=two")
+                self.assertEqual(len(server.Requests), 4)
+                api.GetRecord("Settings", "Other")
+                self.assertEqual(len(server.Requests), 4) # Other was not written
+
+                api.MergeRecordsBulk("Settings", [ { "Code" : "Other", "Value" : "y" } ])
+                self.assertEqual(api.GetRecord("Settings", "Other")["Value"], "y")
+                api.DeleteRecords("Settings", [ "Other" ])
+                self.assertIsNone(api.GetRecord("Settings", "Other"))
+
+    def test_invalidated_during_fetch(self):
+        cache = RecordCache()
+        generation = cache.Generation("Test")
+        cache.Invalidate("test", [ "2" ])
+        cache.Put("Test", "1", { "Code" : "1" }, generation)
+        self.assertFalse(cache.Get("Test", "1")[0])
+        generation = cache.Generation("Test")
+        cache.Clear()
+        cache.Put("Test", "1", { "Code" : "1" }, generation)
+        self.assertFalse(cache.Get("Test", "1")[0])
+        cache.Put("Test", "1", { "Code" : "1" }, cache.Generation("Test"))
+        self.assertTrue(cache.Get("Test", "1")[0])
+
+        with FakeProfiseeServer(make_records()) as server :
+            with API(server.Url, "client-id", record_cache = RecordCache()) as api :
+                get_records = api.GetRecords
+                def merge_during_fetch(entity_name, get_options) :
+                    records = get_records(entity_name, get_options)
+                    api.MergeRecord("Settings", { "Code" : "Other", "Value" : "Merged" }) # As another thread would
+                    return records
+                api.GetRecords = merge_during_fetch
+                api.GetRecord("Settings", "Other")
+                api.GetRecords = get_records
+                self.assertEqual(api.GetRecord("Settings", "Other")["Value"], "Merged")
+
+    def test_invalidate_for(self):
+        cache = RecordCache()
+        for code in ("a b", "2", "3") : cache.Put("Test", code, { "Code" : code })
+        cache.Put("Other", "1", { "Code" : "1" })
+        cache.InvalidateFor("GetRecords", "rest/v1/Records/Test", None)
+        self.assertEqual(len(cache), 4)
+        cache.InvalidateFor("DeleteRecords", "rest/v1/Records/Test?Record_codes=a%20b", None)
+        self.assertFalse(cache.Get("Test", "a b")[0])
+        cache.InvalidateFor("MergeRecords", "rest/v1/Records/Test", [ { "Name" : "No code" } ])
+        self.assertEqual(len(cache), 1)
+        cache.InvalidateFor("DeleteAllMembers", "rest/v1/Records/bulk/Other", None)
+        self.assertEqual(len(cache), 0)
+
+    def test_from_settings(self):
+        self.assertIsNone(RecordCache.from_Settings({}))
+        cache = RecordCache.from_Settings({ "RecordCache" : { "MaxSize" : 5, "DefaultTTL" : 0, "TTLs" : { "Orchestration" : 60 } } })
+        self.assertEqual(cache.MaxSize, 5)
+        self.assertTrue(cache.IsCacheable("orchestration"))
+        self.assertFalse(cache.IsCacheable("Customer"))
+
+    def test_async(self):
+        async def run(server) :
+            async with AsyncAPI(server.Url, "client-id", record_cache = RecordCache()) as api :
+                for _ in range(3) : await api.GetRecord("Settings", "Other")
+                await api.MergeRecord("Settings", { "Code" : "Other", "Value" : "z" })
+                return await api.GetRecord("Settings", "Other")
+
+        with FakeProfiseeServer(make_records()) as server :
+            self.assertEqual(asyncio.run(run(server))["Value"], "z")
+            self.assertEqual(len(server.Requests), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os, sys
+import asyncio, datetime, decimal, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.Enums import AttributeDataType
+from Profisee.Restful.RecordDiff import RecordDiff
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class record_diff_unit_tests(unittest.TestCase):
+
+    def test_is_equal(self):
+        self.assertTrue(RecordDiff.IsEqual(1.5, "1.5", AttributeDataType.Number))
+        self.assertTrue(RecordDiff.IsEqual("1.50", "1.5", AttributeDataType.Number))
+        self.assertFalse(RecordDiff.IsEqual(1.5, "1.5"))
+        self.assertFalse(RecordDiff.IsEqual("1.50", "1.5"))
+        self.assertTrue(RecordDiff.IsEqual(decimal.Decimal("2.50"), 2.5))
+        self.assertTrue(RecordDiff.IsEqual(3, 3.0))
+        self.assertTrue(RecordDiff.IsEqual("", None))
+        self.assertTrue(RecordDiff.IsEqual(datetime.date(2025, 1, 2), "2025-01-02T00:00:00", AttributeDataType.Date))
+        self.assertTrue(RecordDiff.IsEqual("2025-01-02T03:04:05Z", "2025-01-02T03:04:05+00:00", AttributeDataType.DateTime))
+        self.assertTrue(RecordDiff.IsEqual({ "Code" : "CA" }, "CA"))
+        self.assertTrue(RecordDiff.IsEqual(True, True))
+        self.assertFalse(RecordDiff.IsEqual("007", "7"))
+        self.assertFalse(RecordDiff.IsEqual("Cork", "cork"))
+        self.assertFalse(RecordDiff.IsEqual(1, "one"))
+
+    def test_text_that_looks_like_dates(self):
+        for left, right in (("2025-01-01", "2025-01-01T00:00:00"), ("2025-01-02T03:04:05Z", "2025-01-02T03:04:05+00:00"), ("2025-01-02T05:04:05+02:00", "2025-01-02T03:04:05Z")) :
+            self.assertFalse(RecordDiff.IsEqual(left, right, AttributeDataType.Text))
+            self.assertFalse(RecordDiff.IsEqual(left, right))
+            self.assertTrue(RecordDiff.IsEqual(left, right, AttributeDataType.DateTime))
+        attributes = [ { "Identifier" : { "Name" : "Reference" }, "DataType" : 1 }, { "Identifier" : { "Name" : "Since" }, "DataType" : 3 } ]
+        current = { "1" : { "Code" : "1", "Reference" : "2025-01-01", "Since" : "2025-01-01T00:00:00Z" } }
+        diff = RecordDiff.from_Records([ { "Code" : "1", "Reference" : "2025-01-01T00:00:00", "Since" : "2025-01-01T02:00:00+02:00" } ], current, attributes)
+        self.assertEqual(diff.Changes, [ { "Code" : "1", "Reference" : "2025-01-01T00:00:00" } ])
+
+    def test_from_records(self):
+        current = { "1" : { "Code" : "1", "Name" : "One", "Amount" : 1.5 }, "2" : { "Code" : "2", "Name" : "Two", "Amount" : 2 }, "3" : None }
+        records = [
+            { "Code" : "1", "Name" : "One", "Amount" : "1.50" },
+            { "Code" : "2", "Name" : "Deux", "Amount" : 2 },
+            { "Code" : "3", "Name" : "Three" }
+        ]
+        diff = RecordDiff.from_Records(records, current, [ { "Identifier" : { "Name" : "amount" }, "DataType" : 2 } ])
+        self.assertEqual(diff.Changes, [ { "Code" : "2", "Name" : "Deux" }, { "Code" : "3", "Name" : "Three" } ])
+        self.assertEqual((diff.Suppressed, diff.Created, diff.FieldsSuppressed), (1, 1, 1))
+        diff = RecordDiff.from_Records(records, current) # Types unknown, "1.50" is text
+        self.assertEqual(diff.Changes[0], { "Code" : "1", "Amount" : "1.50" })
+
+    def test_merge_changed_records(self):
+        existing = [ { "Code" : f"{code:03}", "Name" : f"Customer {code}", "City" : "Cork", "Notes" : "Not written" } for code in range(50) ]
+        with FakeProfiseeServer({ "Test" : existing }) as server :
+            with API(server.Url, "client-id") as api :
+                records = [ { "Code" : f"{code:03}", "Name" : f"Customer {code}", "City" : "Cork" if code % 10 else "Leeds" } for code in range(55) ]
+                diff = api.MergeChangedRecords("Test", records)
+                self.assertEqual((len(diff.Changes), diff.Suppressed, diff.Created), (10, 45, 5))
+                self.assertEqual(diff.Report.Succeeded, 10)
+                self.assertTrue(all("Attributes=Name,City,Code" in path for method, path in server.Requests if method == "GET" and "/attributes" not in path))
+                merged = [ path for method, path in server.Requests if method == "PATCH" ]
+                self.assertEqual(len(merged), 1)
+                self.assertEqual(server.Records["Test"][10], { "Code" : "010", "Name" : "Customer 10", "City" : "Leeds", "Notes" : "Not written" })
+                self.assertEqual(len(server.Records["Test"]), 55)
+
+                server.Requests.clear()
+                diff = api.MergeChangedRecords("Test", records)
+                self.assertEqual((len(diff.Changes), diff.Suppressed, diff.Report), (0, 55, None))
+                self.assertTrue(all(method == "GET" for method, _ in server.Requests))
+
+    def test_current_given(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                diff = api.DiffRecords("Test", [ { "Code" : "1", "Name" : "One" } ], { "1" : { "code" : "1", "name" : "One" } })
+                self.assertEqual(diff.Suppressed, 1)
+                self.assertEqual(server.Requests, [])
+
+    def test_number_attributes(self):
+        with FakeProfiseeServer({ "Test" : [ { "Code" : "1", "Amount" : "1.5", "Reference" : "1.5" } ] }) as server :
+            server.Attributes["Test"] = [ { "Identifier" : { "Name" : "Amount" }, "DataType" : 2 }, { "Identifier" : { "Name" : "Reference" }, "DataType" : 1 } ]
+            with API(server.Url, "client-id") as api :
+                diff = api.DiffRecords("Test", [ { "Code" : "1", "Amount" : "1.50", "Reference" : "1.50" } ])
+                self.assertEqual(diff.Changes, [ { "Code" : "1", "Reference" : "1.50" } ])
+
+    def test_async_merge_changed_records(self):
+        existing = [ { "Code" : f"{code:03}", "Name" : f"Customer {code}" } for code in range(20) ]
+        with FakeProfiseeServer({ "Test" : existing }) as server :
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id") as api :
+                    records = [ { "Code" : f"{code:03}", "Name" : f"Customer {code}" if code % 5 else "Renamed" } for code in range(22) ]
+                    return await api.MergeChangedRecords("Test", records)
+            diff = asyncio.run(run())
+            self.assertEqual((len(diff.Changes), diff.Suppressed, diff.Created), (6, 16, 2))
+            self.assertEqual(diff.Report.Succeeded, 6)
+            self.assertEqual(server.Records["Test"][5]["Name"], "Renamed")
+
+if __name__ == '__main__':
+    unittest.main()
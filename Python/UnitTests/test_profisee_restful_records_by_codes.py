@@ -0,0 +1,63 @@
+import os, sys
+import asyncio, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.APIResult import APIError
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def make_records(count) :
+    return [ { "Code" : f"{code:05}", "Name" : f"Customer {code}" } for code in range(count) ]
+
+class records_by_codes_unit_tests(unittest.TestCase):
+
+    def test_chunk_by_length(self):
+        self.assertEqual(API.ChunkByLength([ "aa", "bb", "cc", "dddddd" ], len, 5, 1), [ [ "aa", "bb" ], [ "cc" ], [ "dddddd" ] ])
+        self.assertEqual(API.ChunkByLength([], len, 5), [])
+
+    def test_found_and_missing(self):
+        records = make_records(500)
+        with FakeProfiseeServer({ "Test" : records }) as server :
+            with API(server.Url, "client-id") as api :
+                codes = [ f"{code:05}" for code in range(0, 1000, 3) ]
+                result = api.GetRecordsByCodes("Test", codes)
+                self.assertEqual(list(result), codes)
+                for code in codes :
+                    self.assertEqual(result[code], records[int(code)] if int(code) < 500 else None)
+
+    def test_urls_within_limit(self):
+        with FakeProfiseeServer({ "Test" : make_records(500) }) as server :
+            with API(server.Url, "client-id") as api :
+                codes = [ f"{code:05}" for code in range(500) ]
+                result = api.GetRecordsByCodes("Test", codes, max_url_length = 1000)
+                self.assertTrue(all(value is not None for value in result.values()))
+                self.assertGreater(len(server.Requests), 1)
+                host = server.Url.removesuffix("/profisee/")
+                self.assertTrue(all(len(host + path) <= 1000 for _, path in server.Requests))
+
+    def test_attributes_and_quotes(self):
+        records = [ { "Code" : "O'Brien", "Name" : "One", "City" : "Cork" }, { "Code" : "B&Q", "Name" : "Two", "City" : "Leeds" } ]
+        with FakeProfiseeServer({ "Test" : records }) as server :
+            with API(server.Url, "client-id") as api :
+                result = api.GetRecordsByCodes("Test", [ "O'Brien", "B&Q", "o'brien" ], attributes = [ "Name" ])
+                self.assertEqual(result["O'Brien"], { "Code" : "O'Brien", "Name" : "One" })
+                self.assertEqual(result["B&Q"], { "Code" : "B&Q", "Name" : "Two" })
+
+    def test_error_raises(self):
+        with FakeProfiseeServer({}) as server :
+            with API(server.Url, "client-id") as api :
+                with self.assertRaises(APIError) :
+                    api.GetRecordsByCodes("Missing", [ "1" ])
+                self.assertEqual(api.GetRecordsByCodes("Missing", []), {})
+
+    def test_async(self):
+        async def run(server) :
+            async with AsyncAPI(server.Url, "client-id") as api :
+                return await api.GetRecordsByCodes("Test", [ "00001", "00002", "99999" ], max_url_length = 200)
+        with FakeProfiseeServer({ "Test" : make_records(10) }) as server :
+            result = asyncio.run(run(server))
+            self.assertEqual(result, { "00001" : make_records(10)[1], "00002" : make_records(10)[2], "99999" : None })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os, sys
+import asyncio, tempfile, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.ResponseCache import CachedResponse, ResponseCache
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+def entity(name) :
+    return { "Identifier" : { "Name" : name } }
+
+class response_cache_unit_tests(unittest.TestCase):
+
+    def test_fresh_entry_served_without_request(self):
+        with FakeProfiseeServer({ "Customer" : [] }) as server :
+            with API(server.Url, "client-id", response_cache=ResponseCache()) as api :
+                first = api.GetEntities()
+                self.assertFalse(api.LastResult.Cached)
+                second = api.GetEntities()
+                self.assertTrue(api.LastResult.Cached)
+                self.assertEqual(first, second)
+                self.assertEqual(len(server.Requests), 1)
+                self.assertEqual(api.ResponseCache.Hits, 1)
+
+    def test_cached_data_not_shared(self):
+        with FakeProfiseeServer({ "Customer" : [] }) as server :
+            with API(server.Url, "client-id", response_cache=ResponseCache()) as api :
+                api.GetEntities().append(entity("Changed"))
+                self.assertEqual(len(api.GetEntities()), 1)
+
+    def test_stale_entry_revalidated(self):
+        with FakeProfiseeServer({ "Customer" : [] }) as server :
+            with API(server.Url, "client-id", response_cache=ResponseCache({ "GetEntities" : 0 })) as api :
+                api.GetEntities()
+                self.assertEqual(api.GetEntities(), [ entity("Customer") ])
+                self.assertTrue(api.LastResult.Cached)
+                self.assertEqual(api.LastResult.StatusCode, 200)
+                self.assertEqual(len(server.Requests), 2)
+                self.assertIn("If-None-Match", server.RequestHeaders[-1])
+
+                server.Records["Product"] = []
+                self.assertEqual(len(api.GetEntities()), 2)
+                self.assertFalse(api.LastResult.Cached)
+
+    def test_invalidated_by_create_entity(self):
+        with FakeProfiseeServer({ "Customer" : [] }) as server :
+            with API(server.Url, "client-id", response_cache=ResponseCache()) as api :
+                api.GetEntities()
+                api.CreateEntity(entity("Product"))
+                self.assertEqual(len(api.GetEntities()), 2)
+                self.assertEqual(len(server.Requests), 3)
+
+    def test_invalidated_by_update_theme(self):
+        cache = ResponseCache()
+        url = "https://profisee/rest/v1/Themes"
+        cache.Update(url, "GetThemes", CachedResponse(url, 200, b"[]", {}), client_id = "client-id")
+        self.assertIsNotNone(cache.Lookup(url, "GetThemes", "client-id")[0])
+        cache.Update(f"{url}/Dark", "UpdateTheme", CachedResponse(f"{url}/Dark", 204, b"", {}), client_id = "client-id")
+        self.assertIsNone(cache.Lookup(url, "GetThemes", "client-id")[0])
+
+    def test_entries_kept_per_client(self):
+        cache = ResponseCache()
+        with FakeProfiseeServer({ "Customer" : [] }) as server :
+            with API(server.Url, "client-one", response_cache=cache) as one, API(server.Url, "client-two", response_cache=cache) as two :
+                one.GetEntities()
+                two.GetEntities()
+                self.assertFalse(two.LastResult.Cached)
+                one.GetEntities()
+                self.assertTrue(one.LastResult.Cached)
+                self.assertEqual(len(server.Requests), 2)
+        self.assertFalse(any("client-one" in key or "client-two" in key for key in cache.Entries))
+
+    def test_uncached_endpoint(self):
+        with FakeProfiseeServer({ "Customer" : [ { "Code" : "1" } ] }) as server :
+            with API(server.Url, "client-id", response_cache=ResponseCache()) as api :
+                api.GetRecords("Customer")
+                api.GetRecords("Customer")
+                self.assertEqual(len(server.Requests), 2)
+
+    def test_disk_store(self):
+        with tempfile.TemporaryDirectory() as directory :
+            with FakeProfiseeServer({ "Customer" : [] }) as server :
+                with API(server.Url, "client-id", response_cache=ResponseCache(directory=directory)) as api :
+                    api.GetEntities()
+                with API(server.Url, "client-id", response_cache=ResponseCache(directory=directory)) as api :
+                    self.assertEqual(api.GetEntities(), [ entity("Customer") ])
+                    self.assertTrue(api.LastResult.Cached)
+                    api.ResponseCache.Invalidate()
+                self.assertEqual(os.listdir(directory), [])
+                self.assertEqual(len(server.Requests), 1)
+
+    def test_from_settings(self):
+        self.assertIsNone(ResponseCache.from_Settings({}))
+        cache = ResponseCache.from_Settings({ "ResponseCache" : { "TTLs" : { "GetThemes" : 60 } } })
+        self.assertEqual(cache.TTLs, { "GetThemes" : 60 })
+
+    def test_async_cache(self):
+        async def run(server) :
+            async with AsyncAPI(server.Url, "client-id", response_cache=ResponseCache({ "GetEntities" : 0 })) as api :
+                await api.GetEntities()
+                self.assertEqual(await api.GetEntities(), [ entity("Customer") ])
+                self.assertTrue(api.LastResult.Cached)
+        with FakeProfiseeServer({ "Customer" : [] }) as server :
+            asyncio.run(run(server))
+            self.assertIn("If-None-Match", server.RequestHeaders[-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os, sys, time, asyncio
+import unittest
+import requests
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.AsyncAPI import AsyncAPI
+from Profisee.Restful.Enums import RequestOperation
+from Profisee.Restful.RetryPolicy import RetryPolicy, CircuitBreaker, CircuitOpenError
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class retry_policy_unit_tests(unittest.TestCase):
+
+    def test_idempotent_operations_by_default(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.ShouldRetry(RequestOperation.Get, "GetRecords", 0, 503))
+        self.assertTrue(policy.ShouldRetry(RequestOperation.Put, "UpdateAttributes", 0, 429))
+        self.assertFalse(policy.ShouldRetry(RequestOperation.Post, "RunConnectBatch", 0, 503))
+        self.assertFalse(policy.ShouldRetry(RequestOperation.Patch, "MergeRecords", 0, 503))
+        self.assertFalse(policy.ShouldRetry(RequestOperation.Get, "GetRecords", 0, 404))
+        self.assertFalse(policy.ShouldRetry(RequestOperation.Get, "GetRecords", 3, 503))
+
+    def test_opt_in(self):
+        policy = RetryPolicy(retry_endpoints=("MergeRecords",))
+        self.assertTrue(policy.ShouldRetry(RequestOperation.Patch, "MergeRecords", 0, 503))
+        self.assertFalse(policy.ShouldRetry(RequestOperation.Patch, "DeleteRecords", 0, 503))
+        policy = RetryPolicy(retry_operations=(RequestOperation.Post,))
+        self.assertTrue(policy.ShouldRetry(RequestOperation.Post, "RunConnectBatch", 0, None))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        self.assertEqual([ policy.GetBackoff(attempt) for attempt in range(4) ], [ 1, 2, 4, 5 ])
+        self.assertLessEqual(RetryPolicy(backoff_factor=1).GetBackoff(2), 4)
+        self.assertEqual(policy.GetBackoff(0, "3"), 3)
+        self.assertEqual(policy.GetBackoff(0, "7"), 5) # Capped at max_backoff
+        retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertAlmostEqual(RetryPolicy(max_backoff=120).GetBackoff(0, retry_at), 60, delta=2)
+        self.assertEqual(policy.GetBackoff(0, retry_at), 5)
+        self.assertEqual(policy.GetBackoff(0, "soon"), 1)
+
+    def test_retries_throttled_calls(self):
+        with FakeProfiseeServer({ "Test" : [ { "Code" : "1" } ] }) as server :
+            server.Failures = [ (429, { "Retry-After" : "0" }), (503, {}) ]
+            with API(server.Url, "client-id", retry_policy=RetryPolicy(backoff_factor=0.01)) as api :
+                records = api.GetRecords("Test")
+                self.assertEqual(records, [ { "Code" : "1" } ])
+                self.assertEqual(api.LastResult.Retries, 2)
+                self.assertGreater(api.LastResult.BackoffTime, 0)
+                self.assertEqual(len(server.Requests), 3)
+
+    def test_does_not_retry_patch(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            server.Failures = [ (503, {}) ]
+            with API(server.Url, "client-id", retry_policy=RetryPolicy(backoff_factor=0.01)) as api :
+                api.MergeRecords("Test", [ { "Code" : "1" } ])
+                self.assertEqual(api.StatusCode, 503)
+                self.assertEqual(api.LastResult.Retries, 0)
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            server.Failures = [ (500, {}), (500, {}) ]
+            with API(server.Url, "client-id", circuit_breaker=breaker) as api :
+                api.GetRecords("Test")
+                api.GetRecords("Test")
+                self.assertEqual(breaker.State, "Open")
+                with self.assertRaises(CircuitOpenError) : api.GetRecords("Test")
+                self.assertEqual(len(server.Requests), 2)
+
+                time.sleep(0.06)
+                api.GetRecords("Test")
+                self.assertEqual(breaker.State, "Closed")
+
+    def test_circuit_breaker_trial_raises(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            server.Failures = [ (500, {}) ]
+            with API(server.Url, "client-id", circuit_breaker=breaker) as api :
+                api.GetRecords("Test")
+                self.assertEqual(breaker.State, "Open")
+                time.sleep(0.06)
+                send = api.Send
+                api.Send = lambda *args : (_ for _ in ()).throw(ValueError("Not a response"))
+                with self.assertRaises(ValueError) : api.GetRecords("Test")
+                self.assertEqual(breaker.State, "Open")
+                api.Send = lambda *args : (_ for _ in ()).throw(requests.exceptions.ChunkedEncodingError("Truncated"))
+                with self.assertRaises(requests.exceptions.ChunkedEncodingError) : api.GetRecords("Test")
+                self.assertEqual(breaker.State, "Open")
+                time.sleep(0.06)
+                api.Send = send
+                self.assertEqual(api.GetRecords("Test"), [])
+                self.assertEqual(breaker.State, "Closed")
+
+    def test_circuit_breaker_trial_cancelled(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        with FakeProfiseeServer({ "Test" : [] }, latency=0.2) as server :
+            server.Failures = [ (500, {}) ]
+            async def run() :
+                async with AsyncAPI(server.Url, "client-id", circuit_breaker=breaker) as api :
+                    await api.GetRecords("Test")
+                    await asyncio.sleep(0.06)
+                    with self.assertRaises(asyncio.TimeoutError) : await asyncio.wait_for(api.GetRecords("Test"), 0.05)
+                    self.assertEqual(breaker.State, "Open")
+                    return await api.GetRecords("Test")
+            self.assertEqual(asyncio.run(run()), [])
+            self.assertEqual(breaker.State, "Closed")
+
+if __name__ == '__main__':
+    unittest.main()
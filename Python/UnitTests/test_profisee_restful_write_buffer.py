@@ -0,0 +1,94 @@
+import os, sys
+import subprocess, threading, time, unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+from Profisee.Restful.API import API
+from Profisee.Restful.WriteBuffer import WriteBuffer
+from UnitTests.fake_profisee import FakeProfiseeServer
+
+class write_buffer_unit_tests(unittest.TestCase):
+
+    def test_coalesces_by_code(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                with WriteBuffer(api, max_age = None) as buffer :
+                    buffer.Add("Test", { "Code" : "1", "Name" : "One" })
+                    buffer.Add("Test", { "Code" : "1", "City" : "Cork" })
+                    buffer.Add("Test", { "Code" : "2", "Name" : "Two" })
+                    buffer.Add("Test", { "code" : "1", "name" : "Uno" })
+                    self.assertEqual(len(buffer), 2)
+                    self.assertEqual(server.Requests, [])
+                    reports = buffer.Flush()
+                    self.assertEqual(reports["Test"].Succeeded, 2)
+                self.assertEqual(len(server.Requests), 1)
+                self.assertEqual(server.Records["Test"], [ { "Code" : "1", "Name" : "Uno", "City" : "Cork" }, { "Code" : "2", "Name" : "Two" } ])
+
+    def test_flush_on_size(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                with WriteBuffer(api, max_records = 10, max_age = None) as buffer :
+                    for code in range(25) : buffer.Add("Test", { "Code" : str(code) })
+                    self.assertEqual(len(server.Records["Test"]), 20)
+                    self.assertEqual(len(buffer), 5)
+                self.assertEqual(len(server.Records["Test"]), 25)
+
+    def test_flush_on_age(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                with WriteBuffer(api, max_age = 0.1) as buffer :
+                    buffer.Add("Test", { "Code" : "1" })
+                    deadline = time.monotonic() + 5
+                    while not server.Records["Test"] and time.monotonic() < deadline : time.sleep(0.02)
+                    self.assertEqual(server.Records["Test"], [ { "Code" : "1" } ])
+
+    def test_concurrent_writers(self):
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            with API(server.Url, "client-id") as api :
+                buffer = WriteBuffer(api, max_records = 50, max_age = 0.05)
+                def write(worker) :
+                    for code in range(200) : buffer.Add("Test", { "Code" : str(code), f"Field{worker}" : worker })
+                threads = [ threading.Thread(target = write, args = (worker,)) for worker in range(4) ]
+                for thread in threads : thread.start()
+                for thread in threads : thread.join()
+                buffer.Close()
+                self.assertEqual(buffer.Added, 800)
+                records = { record["Code"] : record for record in server.Records["Test"] }
+                self.assertEqual(len(records), 200)
+                self.assertTrue(all(record[f"Field{worker}"] == worker for record in records.values() for worker in range(4)))
+
+    def test_requires_code_and_open(self):
+        buffer = WriteBuffer(None, max_age = None)
+        with self.assertRaises(ValueError) : buffer.Add("Test", { "Name" : "No code" })
+        buffer.Close()
+        with self.assertRaises(ValueError) : buffer.Add("Test", { "Code" : "1" })
+
+    def test_flush_at_exit(self):
+        script = "\n".join([
+            "import sys",
+            f"sys.path.append({os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))!r})",
+            "from Profisee.Restful.API import API",
+            "from Profisee.Restful.WriteBuffer import WriteBuffer",
+            "buffer = WriteBuffer(API(sys.argv[1], 'client-id'), max_age = 60)",
+            "for code in range(3) : buffer.Add('Test', { 'Code' : str(code) })"
+        ])
+        with FakeProfiseeServer({ "Test" : [] }) as server :
+            process = subprocess.run([ sys.executable, "-c", script, server.Url ], capture_output = True, text = True, timeout = 60)
+            self.assertEqual(process.returncode, 0, process.stderr)
+            self.assertNotIn("Traceback", process.stderr)
+            self.assertEqual(server.Records["Test"], [ { "Code" : "0" }, { "Code" : "1" }, { "Code" : "2" } ])
+
+    def test_restores_records_when_merge_raises(self):
+        class FailingWriter :
+            def Merge(self, entityName, records, sequential = False) :
+                raise RuntimeError("Merge failed")
+        buffer = WriteBuffer(None, max_age = None, writer = FailingWriter())
+        buffer.Add("Test", { "Code" : "1", "Name" : "One" })
+        with self.assertRaises(RuntimeError) : buffer.Flush()
+        self.assertEqual(buffer.Pending, { "Test" : { "1" : { "Code" : "1", "Name" : "One" } } })
+        self.assertIn("Test", buffer.Oldest)
+        buffer.Writer = None
+        buffer.Pending.clear()
+        buffer.Close()
+
+if __name__ == '__main__':
+    unittest.main()